@@ -47,6 +47,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "channels",
     "rest_framework",
     "corsheaders",
@@ -70,6 +71,7 @@ MIDDLEWARE = [
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
+    "common.middleware.PerformanceMonitoringMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "common.middleware.DynamicCSRFDomainMiddleware",  # Add before CSRF middleware
     "django.middleware.common.CommonMiddleware",
@@ -160,6 +162,10 @@ REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
     ],
+    "DEFAULT_RENDERER_CLASSES": [
+        "common.profiling.ProfiledJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 20,
     "DEFAULT_PARSER_CLASSES": [
@@ -266,6 +272,10 @@ RABBITMQ_VHOST = os.environ.get("RABBITMQ_VHOST", "/")
 RABBITMQ_USE_SSL = os.environ.get("RABBITMQ_USE_SSL", "False").lower() == "true"
 RABBITMQ_EMAIL_QUEUE = os.environ.get("RABBITMQ_EMAIL_QUEUE", "email_notifications")
 RABBITMQ_WHATSAPP_QUEUE = os.environ.get("RABBITMQ_WHATSAPP_QUEUE", "whatsapp_notifications")
+# Channels (one connection each) the web/Celery publisher pool keeps per process
+RABBITMQ_PUBLISHER_POOL_SIZE = int(os.environ.get("RABBITMQ_PUBLISHER_POOL_SIZE", "4"))
+# Wait for broker acks on publish (slower, but a returned message_id is durable)
+RABBITMQ_PUBLISHER_CONFIRMS = os.environ.get("RABBITMQ_PUBLISHER_CONFIRMS", "False").lower() == "true"
 
 # Frontend URL for email links
 FRONTEND_URL = os.environ.get("FRONTEND_URL", "http://localhost:3000")
@@ -349,7 +359,7 @@ SESSION_ENGINE = 'django.contrib.sessions.backends.db'
 # Cache Configuration
 CACHES = {
     "default": {
-        "BACKEND": "django_redis.cache.RedisCache",
+        "BACKEND": "common.cache_backends.ProfiledRedisCache",
         "LOCATION": os.environ.get("REDIS_URL", "redis://localhost:6379/2"),
         "OPTIONS": {
             "CLIENT_CLASS": "django_redis.client.DefaultClient",
@@ -365,8 +375,20 @@ CACHE_TIMEOUTS = {
     "DEAL_LIST": 180,  # 3 minutes
     "PROFILE_DATA": 600,  # 10 minutes
     "SOCIAL_ACCOUNTS": 900,  # 15 minutes
+    "INFLUENCER_SEARCH_COUNT": 120,  # 2 minutes
+    "INFLUENCER_SEARCH_RESULTS": 300,  # 5 minutes
+    "SCRAPE_REQUEST_PENDING": 3600,  # 1 hour
+    "SCRAPE_REQUEST_COMPLETED": 900,  # 15 minutes
+    "WS_PRESENCE": 86400,  # 1 day, refreshed on connect; sockets decrement on disconnect
+    "ENDPOINT_METRICS": 86400,  # 1 day of per-endpoint request histograms
+    "BRAND_ANALYTICS": 300,  # 5 minutes, versioned per brand on deal/campaign changes
+    "COMMUNICATION_IDEMPOTENCY": 172800,  # 2 days, outlives the 24h queue TTL plus retries
+    "CAMPAIGN_INVITATION_PROGRESS": 86400,  # 1 day of bulk invitation job progress
 }
 
+# Influencer text search backend: "postgres" (tsvector + pg_trgm) or "basic" (icontains)
+INFLUENCER_SEARCH_BACKEND = os.environ.get("INFLUENCER_SEARCH_BACKEND", "postgres")
+
 # File Upload Security
 FILE_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024  # 10MB
 DATA_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024  # 10MB
@@ -450,6 +472,35 @@ PERFORMANCE_MONITORING = {
     "SLOW_QUERY_THRESHOLD": 0.5,  # Log queries slower than 500ms
     "ENABLE_QUERY_LOGGING": DEBUG,
     "MAX_QUERY_COUNT": 50,  # Alert if more than 50 queries per request
+    # Fraction of requests run under cProfile; stats are saved only for slow requests
+    "PROFILE_SAMPLE_RATE": float(os.environ.get("PROFILE_SAMPLE_RATE", "0")),
+    "PROFILE_DIR": os.environ.get("PROFILE_DIR", str(BASE_DIR / "logs" / "profiles")),
+    # Log SQL shapes repeated this many times in one request, with the call site
+    "DETECT_N_PLUS_ONE": os.environ.get("DETECT_N_PLUS_ONE", str(DEBUG)).lower() == "true",
+    "N_PLUS_ONE_THRESHOLD": 10,
+    # Raise QueryBudgetExceeded instead of logging (enabled by the test suite)
+    "ENFORCE_QUERY_BUDGETS": False,
+}
+
+# Maximum queries per request by URL name; @query_budget on a view takes precedence.
+# Checked by PerformanceMonitoringMiddleware, see common/query_budget.py.
+# Current values are what each endpoint runs against the URL sweep dataset in
+# core/tests/test_query_budgets.py; lower them as endpoints are fixed.
+QUERY_BUDGETS = {
+    "brands:brand-dashboard": 207,
+    "brands:brand-deals-by-campaigns": 146,
+    "brands:brand-deals": 73,
+    "brands:brand-analytics-campaigns": 1,
+    "brands:brand-analytics-overview": 1,
+    "campaigns:campaigns_list": 164,
+    "campaigns:brand_campaigns": 164,
+    "dashboard:analytics_earnings": 2,
+    "dashboard:dashboard_stats": 6,
+    "dashboard:performance_metrics": 3,
+    "deals:deals_list": 32,
+    "deals:earnings_tracking": 2,
+    "influencers:influencer_search": 4,
+    "messaging:conversation_messages": 10,  # GET marks read; POST creates and broadcasts
 }
 
 # Site URL for absolute URL generation
@@ -0,0 +1,132 @@
+"""
+Brand analytics queries.
+
+Per-campaign deal status counts, investment and rating totals come from one
+grouped query over the brand's campaigns (conditional Count(filter=Q(...))
+aggregates over the deals join); brand totals are summed from those rows, so
+the dashboard and analytics views cost one query however many campaigns a
+brand has.
+
+Rows are cached per brand and time range under a per-brand version counter,
+bumped when the brand's deals or campaigns change (see brands.signals).
+"""
+
+from datetime import timedelta
+from typing import Dict, List, Optional
+
+from campaigns.models import Campaign
+from common.cache_utils import CacheManager
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+TIME_RANGE_DAYS = {
+    'last_7_days': 7,
+    'last_30_days': 30,
+    'last_90_days': 90,
+    'last_6_months': 180,
+    'last_year': 365,
+}
+DEFAULT_TIME_RANGE = 'last_30_days'
+ALL_TIME = 'all_time'
+
+VERSION_KEY = 'brand_analytics_version'
+
+# Stat name -> deal statuses it counts
+DEAL_STATUS_COUNTS = {
+    'pending_deals': ('invited',),
+    'active_deals': ('accepted',),
+    'pending_content': ('content_submitted',),
+    'completed_deals': ('completed',),
+}
+
+
+class BrandAnalyticsService:
+    """Grouped deal and campaign aggregates for brand dashboards and analytics."""
+
+    @staticmethod
+    def normalize_time_range(time_range: Optional[str]) -> str:
+        return time_range if time_range in TIME_RANGE_DAYS else DEFAULT_TIME_RANGE
+
+    @staticmethod
+    def get_start_date(time_range: str):
+        """Start of a time range, or None for ALL_TIME."""
+        if time_range == ALL_TIME:
+            return None
+        return timezone.now() - timedelta(days=TIME_RANGE_DAYS[time_range])
+
+    @staticmethod
+    def _version_key(brand_id: int) -> str:
+        return CacheManager.get_cache_key(VERSION_KEY, brand_id)
+
+    @staticmethod
+    def invalidate(brand_id: int) -> None:
+        """Invalidate a brand's cached analytics once the current transaction commits."""
+        if not brand_id:
+            return
+        key = BrandAnalyticsService._version_key(brand_id)
+        transaction.on_commit(lambda: CacheManager.bump_version(key))
+
+    @staticmethod
+    def _query_campaign_stats(brand_id: int, start_date=None) -> List[Dict]:
+        campaigns = Campaign.objects.filter(brand_id=brand_id)
+        deals_in_range = Q()
+        if start_date is not None:
+            campaigns = campaigns.filter(created_at__gte=start_date)
+            deals_in_range = Q(deals__invited_at__gte=start_date)
+
+        status_counts = {
+            name: Count('deals', filter=deals_in_range & Q(deals__status__in=statuses))
+            for name, statuses in DEAL_STATUS_COUNTS.items()
+        }
+        return list(
+            campaigns.annotate(
+                influencers_count=Count('deals', filter=deals_in_range),
+                rating_total=Sum('deals__brand_rating', filter=deals_in_range),
+                rating_count=Count('deals__brand_rating', filter=deals_in_range),
+                **status_counts,
+            ).values(
+                'id', 'title', 'is_active', 'cash_amount', 'application_deadline', 'created_at',
+                'influencers_count', 'rating_total', 'rating_count', *DEAL_STATUS_COUNTS,
+            ).order_by('-created_at', '-id')
+        )
+
+    @staticmethod
+    def get_campaign_stats(brand_id: int, time_range: str = ALL_TIME) -> List[Dict]:
+        """
+        One row per campaign, newest first, with deal counts (influencers_count
+        and DEAL_STATUS_COUNTS), rating_total/rating_count and cash_amount.
+
+        For a time range, only campaigns created and deals invited within it count.
+        """
+        version = CacheManager.get_version(BrandAnalyticsService._version_key(brand_id))
+        cache_key = CacheManager.get_cache_key('brand_analytics', brand_id, version, time_range)
+        rows = cache.get(cache_key)
+        if rows is None:
+            rows = BrandAnalyticsService._query_campaign_stats(
+                brand_id, BrandAnalyticsService.get_start_date(time_range)
+            )
+            timeout = getattr(settings, 'CACHE_TIMEOUTS', {}).get('BRAND_ANALYTICS', 300)
+            cache.set(cache_key, rows, timeout)
+        return rows
+
+    @staticmethod
+    def summarize(rows: List[Dict]) -> Dict:
+        """Brand totals over get_campaign_stats rows."""
+        now = timezone.now()
+        rating_count = sum(row['rating_count'] for row in rows)
+        rating_total = sum(row['rating_total'] or 0 for row in rows)
+        summary = {
+            'total_campaigns': len(rows),
+            'active_campaigns': sum(
+                1 for row in rows if row['application_deadline'] and row['application_deadline'] >= now
+            ),
+            'total_investment': sum(row['cash_amount'] for row in rows),
+            'total_deals': sum(row['influencers_count'] for row in rows),
+            'avg_rating': rating_total / rating_count if rating_count else 0,
+        }
+        for name in DEAL_STATUS_COUNTS:
+            summary[name] = sum(row[name] for row in rows)
+        return summary
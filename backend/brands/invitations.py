@@ -0,0 +1,230 @@
+"""
+Bulk campaign invitations.
+
+add_influencers_to_campaign_view used to create, render and publish each
+invitation inside the request, one influencer at a time. It now creates the
+invited deals in a fixed number of queries (one existing-deal lookup and one
+bulk_create) and hands the email and WhatsApp fan-out to the
+send_campaign_invitations Celery task, so the request takes as long for 500
+influencers as for 5.
+
+The task reports its progress in the cache under a job id, which the
+invitation progress endpoint reads:
+
+    job = CampaignInvitationService.start_job(campaign, created_deals)
+    ...
+    progress = CampaignInvitationService.get_progress(job['job_id'])
+"""
+
+import logging
+import uuid
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from common.cache_utils import CacheManager
+from deals.models import Deal
+from deals.rollups import DealRollupService
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from .analytics import BrandAnalyticsService
+
+logger = logging.getLogger(__name__)
+
+# Invitations published per RabbitMQ batch and per progress update
+INVITATION_CHUNK_SIZE = 100
+
+
+class CampaignInvitationService:
+    """Creates invited deals in bulk and fans their notifications out in the background."""
+
+    @staticmethod
+    def create_deals(campaign, influencers: Iterable) -> Tuple[List[Deal], Dict[int, int]]:
+        """
+        Invite the influencers that don't have a deal on the campaign yet.
+
+        Returns the created deals and {influencer_id: deal_id} of the existing ones.
+        """
+        influencers = list(influencers)
+        existing = dict(
+            Deal.objects.filter(campaign=campaign, influencer_id__in=[influencer.id for influencer in influencers])
+            .values_list('influencer_id', 'id')
+        )
+
+        requires_shipping = campaign.deal_type in ['product', 'hybrid']
+        new_deals = [
+            Deal(
+                campaign=campaign,
+                influencer=influencer,
+                status='invited',
+                payment_status='pending',
+                # Deal.save() initializes this for barter/hybrid deals; bulk_create doesn't call it
+                shipping_address={} if requires_shipping else None,
+            )
+            for influencer in influencers
+            if influencer.id not in existing
+        ]
+        if not new_deals:
+            return [], existing
+
+        from influencers.services.search_cache_service import InfluencerSearchCacheService
+
+        with transaction.atomic():
+            created = Deal.objects.bulk_create(new_deals)
+            # bulk_create skips post_save, which keeps these in sync for single deals
+            BrandAnalyticsService.invalidate(campaign.brand_id)
+            DealRollupService.schedule_refresh(*(deal.influencer_id for deal in created))
+            InfluencerSearchCacheService.invalidate_brand(campaign.brand_id)
+        return created, existing
+
+    @staticmethod
+    def _progress_key(job_id: str) -> str:
+        return CacheManager.get_cache_key('campaign_invitations', job_id)
+
+    @staticmethod
+    def _save_progress(progress: Dict) -> None:
+        timeout = getattr(settings, 'CACHE_TIMEOUTS', {}).get('CAMPAIGN_INVITATION_PROGRESS', 86400)
+        cache.set(CampaignInvitationService._progress_key(progress['job_id']), progress, timeout)
+
+    @staticmethod
+    def get_progress(job_id: str) -> Optional[Dict]:
+        return cache.get(CampaignInvitationService._progress_key(job_id))
+
+    @staticmethod
+    def mark_failed(job_id: str) -> None:
+        progress = CampaignInvitationService.get_progress(job_id)
+        if progress:
+            progress['status'] = 'failed'
+            CampaignInvitationService._save_progress(progress)
+
+    @staticmethod
+    def start_job(campaign, deals: List[Deal]) -> Dict:
+        """Record a queued invitation job and dispatch it once the transaction commits."""
+        from .tasks import send_campaign_invitations
+
+        progress = {
+            'job_id': uuid.uuid4().hex,
+            'campaign_id': campaign.id,
+            'brand_id': campaign.brand_id,
+            'status': 'queued',
+            'total': len(deals),
+            'processed': 0,
+            'emails_queued': 0,
+            'whatsapp_queued': 0,
+            'errors': 0,
+            'created_at': timezone.now().isoformat(),
+            'completed_at': None,
+        }
+        CampaignInvitationService._save_progress(progress)
+        deal_ids = [deal.id for deal in deals]
+
+        def dispatch():
+            try:
+                send_campaign_invitations.delay(progress['job_id'], deal_ids)
+            except Exception as exc:
+                # Without a Celery broker, send them here rather than not at all
+                logger.error(f"Failed to dispatch campaign invitation job {progress['job_id']}: {exc}")
+                try:
+                    CampaignInvitationService.send_invitations(progress['job_id'], deal_ids)
+                except Exception as send_exc:
+                    logger.error(f"Campaign invitation job {progress['job_id']} failed: {send_exc}")
+                    CampaignInvitationService.mark_failed(progress['job_id'])
+
+        transaction.on_commit(dispatch)
+        return progress
+
+    @staticmethod
+    def send_invitations(job_id: str, deal_ids: List[int]) -> Dict:
+        """Render and queue the invitation email and WhatsApp of each deal, updating the job's progress."""
+        from common.models import CountryCode
+        from communications.email_service import get_email_service
+        from communications.rabbitmq_publisher import get_rabbitmq_publisher
+        from communications.whatsapp_service import get_whatsapp_service
+
+        progress = CampaignInvitationService.get_progress(job_id) or {
+            'job_id': job_id, 'total': len(deal_ids), 'processed': 0, 'emails_queued': 0,
+            'whatsapp_queued': 0, 'errors': 0, 'completed_at': None,
+        }
+        progress['status'] = 'running'
+        CampaignInvitationService._save_progress(progress)
+
+        email_service = get_email_service()
+        whatsapp_service = get_whatsapp_service()
+        publisher = get_rabbitmq_publisher()
+        country_codes = set(CountryCode.objects.filter(is_active=True).values_list('code', flat=True))
+
+        deals = list(
+            Deal.objects.filter(id__in=deal_ids)
+            .select_related('campaign__brand', 'influencer__user__user_profile', 'influencer__user_profile')
+            .order_by('id')
+        )
+        for start in range(0, len(deals), INVITATION_CHUNK_SIZE):
+            with publisher.batched() as results:
+                for deal in deals[start:start + INVITATION_CHUNK_SIZE]:
+                    CampaignInvitationService._send_invitation(
+                        deal, email_service, whatsapp_service, country_codes, progress
+                    )
+            # Only the flush knows which of the chunk's messages were published
+            email_ids = results.get(email_service.email_queue, [])
+            whatsapp_ids = results.get(whatsapp_service.whatsapp_queue, [])
+            progress['emails_queued'] += len(email_ids) - email_ids.count(None)
+            progress['whatsapp_queued'] += len(whatsapp_ids) - whatsapp_ids.count(None)
+            progress['errors'] += email_ids.count(None) + whatsapp_ids.count(None)
+            CampaignInvitationService._save_progress(progress)
+
+        progress['status'] = 'completed'
+        progress['completed_at'] = timezone.now().isoformat()
+        CampaignInvitationService._save_progress(progress)
+        logger.info(
+            f"Campaign invitation job {job_id}: {progress['emails_queued']} emails and "
+            f"{progress['whatsapp_queued']} WhatsApp messages queued for {progress['processed']} deals"
+        )
+        return progress
+
+    @staticmethod
+    def _send_invitation(deal: Deal, email_service, whatsapp_service, country_codes, progress: Dict) -> None:
+        influencer = deal.influencer
+        campaign = deal.campaign
+
+        # Automatically send invitation email; it is counted once the batch is flushed
+        try:
+            email_service.send_campaign_notification(
+                influencer=influencer,
+                campaign=campaign,
+                deal=deal,
+                notification_type='invitation'
+            )
+        except Exception as e:
+            progress['errors'] += 1
+            logger.error(f"Failed to send invitation email to {influencer.user.username}: {str(e)}")
+
+        # Automatically send invitation WhatsApp
+        try:
+            # Check if influencer has phone number
+            if influencer.user_profile and influencer.user_profile.phone_number:
+                country_code = (influencer.user_profile.country_code or '+91').strip()
+                if country_code and not country_code.startswith('+'):
+                    country_code = f'+{country_code}'
+
+                if country_code not in country_codes:
+                    logger.warning(
+                        f"Influencer {influencer.user.username} has invalid country_code '{country_code}'. "
+                        f"Using default '+91' instead."
+                    )
+                    country_code = '+91'
+
+                whatsapp_service.send_campaign_notification(
+                    influencer=influencer,
+                    campaign=campaign,
+                    deal=deal,
+                    notification_type='invitation',
+                    phone_number=influencer.user_profile.phone_number,
+                    country_code=country_code,
+                    valid_country_codes=country_codes,
+                )
+        except Exception as e:
+            progress['errors'] += 1
+            logger.error(f"Failed to send invitation WhatsApp to {influencer.user.username}: {str(e)}")
+
+        progress['processed'] += 1
@@ -0,0 +1,22 @@
+"""
+Signal receivers that keep cached brand analytics in sync.
+"""
+
+from campaigns.models import Campaign
+from deals.models import Deal
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .analytics import BrandAnalyticsService
+
+
+@receiver(post_save, sender=Deal)
+@receiver(post_delete, sender=Deal)
+def invalidate_brand_analytics_on_deal_change(sender, instance, **kwargs):
+    BrandAnalyticsService.invalidate(instance.campaign.brand_id)
+
+
+@receiver(post_save, sender=Campaign)
+@receiver(post_delete, sender=Campaign)
+def invalidate_brand_analytics_on_campaign_change(sender, instance, **kwargs):
+    BrandAnalyticsService.invalidate(instance.brand_id)
@@ -0,0 +1,22 @@
+import logging
+
+from celery import shared_task
+
+from .invitations import CampaignInvitationService
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(bind=True)
+def send_campaign_invitations(self, job_id: str, deal_ids: list[int]):
+    """
+    Render and queue the invitation email and WhatsApp message of newly invited deals.
+
+    Progress is kept in the cache under `job_id` (see CampaignInvitationService.get_progress).
+    """
+    try:
+        return CampaignInvitationService.send_invitations(job_id, deal_ids)
+    except Exception as exc:
+        logger.error(f"Campaign invitation job {job_id} failed: {exc}")
+        CampaignInvitationService.mark_failed(job_id)
+        raise
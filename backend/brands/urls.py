@@ -52,6 +52,8 @@ urlpatterns = [
          name='send-message-to-influencer'),
     path('campaigns/<int:campaign_id>/add-influencers/', views.add_influencers_to_campaign_view,
          name='add-influencers-to-campaign'),
+    path('campaigns/<int:campaign_id>/invitations/<str:job_id>/', views.campaign_invitation_progress_view,
+         name='campaign-invitation-progress'),
     path('campaigns/for-influencers/', views.get_campaigns_for_influencer_view, name='get-campaigns-for-influencers'),
 
     # Analytics & Audit
@@ -5,9 +5,10 @@ from campaigns.serializers import CampaignCreateSerializer
 from common.api_response import api_response, format_serializer_errors
 from common.decorators import cache_response
 from deals.models import Deal
+from deals.rollups import DealRollupService
 from django.contrib.auth.models import User
 from django.core.paginator import Paginator
-from django.db.models import Avg, Q, F, ExpressionWrapper, DecimalField
+from django.db.models import Q, F, ExpressionWrapper, DecimalField
 from django.db.models.functions import Coalesce, Greatest
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
@@ -18,6 +19,8 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
+from .analytics import BrandAnalyticsService
+from .invitations import CampaignInvitationService
 from .models import BrandUser, BrandAuditLog, BookmarkedInfluencer
 from .models import Industry
 from .serializers import (
@@ -65,45 +68,25 @@ def brand_dashboard_view(request):
         return api_response(False, error='You do not have permission to view analytics.', status_code=403)
 
     brand = brand_user.brand
-
-    # Campaign statistics
-    campaigns = brand.campaigns.all()
-    total_campaigns = campaigns.count()
-    active_campaigns = campaigns.filter(
-        application_deadline__gte=timezone.now()
-    ).count()
-
-    # Deal statistics
-    deals = Deal.objects.filter(campaign__brand=brand)
-    total_deals = deals.count()
-    pending_deals = deals.filter(status='invited').count()
-    active_deals = deals.filter(status='accepted').count()
-    completed_deals = deals.filter(status='completed').count()
-
-    # Performance metrics
-    avg_brand_rating = deals.filter(brand_rating__isnull=False).aggregate(
-        avg=Avg('brand_rating')
-    )['avg'] or 0
+    stats = BrandAnalyticsService.summarize(BrandAnalyticsService.get_campaign_stats(brand.id))
 
     # Recent activity
-    recent_deals = deals.select_related('influencer', 'campaign').order_by('-invited_at')[:5]
-    recent_campaigns = campaigns.order_by('-created_at')[:5]
+    recent_deals = Deal.objects.filter(campaign__brand=brand).select_related(
+        'campaign__brand', 'influencer__user', 'influencer__user_profile', 'conversation'
+    ).order_by('-invited_at')[:5]
+    recent_campaigns = brand.campaigns.order_by('-created_at')[:5]
 
-    # Content pending approval
-    pending_content = deals.filter(
-        status='content_submitted'
-    ).count()
     serializer = BrandDashboardSerializer({
         'brand': brand,
         'stats': {
-            'total_campaigns': total_campaigns,
-            'active_campaigns': active_campaigns,
-            'total_deals': total_deals,
-            'pending_deals': pending_deals,
-            'active_deals': active_deals,
-            'completed_deals': completed_deals,
-            'pending_content': pending_content,
-            'avg_rating': round(avg_brand_rating, 2)
+            'total_campaigns': stats['total_campaigns'],
+            'active_campaigns': stats['active_campaigns'],
+            'total_deals': stats['total_deals'],
+            'pending_deals': stats['pending_deals'],
+            'active_deals': stats['active_deals'],
+            'completed_deals': stats['completed_deals'],
+            'pending_content': stats['pending_content'],
+            'avg_rating': round(stats['avg_rating'], 2)
         },
         'recent_deals': recent_deals,
         'recent_campaigns': recent_campaigns
@@ -545,7 +528,7 @@ def brand_deals_view(request):
 
     deals = (
         Deal.objects.filter(campaign__brand=brand_user.brand)
-        .select_related('campaign__brand', 'influencer__user')
+        .select_related('campaign__brand', 'influencer__user', 'conversation__last_message__sender_user')
         .prefetch_related('content_submissions')
     )
 
@@ -695,9 +678,13 @@ def bulk_update_deals_status_view(request):
         }, status=status.HTTP_400_BAD_REQUEST)
 
     qs = Deal.objects.filter(id__in=ids, campaign__brand=brand_user.brand)
-    affected_ids = list(qs.values_list('id', flat=True))
+    affected = list(qs.values_list('id', 'influencer_id'))
+    affected_ids = [deal_id for deal_id, _ in affected]
 
     qs.update(status=new_status)
+    # Queryset updates skip post_save, which keeps analytics and rollups in sync for single deals
+    BrandAnalyticsService.invalidate(brand_user.brand_id)
+    DealRollupService.schedule_refresh(*(influencer_id for _, influencer_id in affected))
 
     return api_response(True, {
         'updated_count': len(affected_ids),
@@ -1287,9 +1274,9 @@ def brand_conversations_view(request):
         deal__campaign__brand=brand_user.brand
     ).select_related(
         'deal__campaign__brand',
-        'deal__influencer'
-    ).prefetch_related(
-        'messages'
+        'deal__influencer__user',
+        'deal__influencer__user_profile',
+        'last_message__sender_user'
     ).order_by('-updated_at')
 
     # Apply search filter
@@ -1329,10 +1316,7 @@ def brand_conversations_view(request):
     # Apply unread only filter
     unread_only = request.GET.get('unread_only')
     if unread_only and unread_only.lower() == 'true':
-        conversations = conversations.filter(
-            messages__sender_type='influencer',
-            messages__read_by_brand=False
-        ).distinct()
+        conversations = conversations.filter(unread_count_for_brand__gt=0)
 
     # Pagination
     from deals.views import DealPagination
@@ -1385,21 +1369,24 @@ def brand_conversation_messages_view(request, conversation_id):
     )
 
     if request.method == 'GET':
-        from messaging.models import Message
-        messages = conversation.messages.all().order_by('-created_at')
+        messages = conversation.messages.select_related('sender_user').order_by('-created_at')
 
-        # Apply search filter
-        search_query = request.GET.get('search')
-        if search_query:
-            messages = messages.filter(content__icontains=search_query)
+        # Apply search and other message filters
+        from messaging.history import MessageCursorPagination, apply_message_filters
+        messages, _ = apply_message_filters(messages, request.GET)
 
         # Mark messages as read by brand
-        unread_messages = messages.filter(
-            sender_type='influencer',
-            read_by_brand=False
-        )
-        for message in unread_messages:
-            message.mark_as_read('brand')
+        from messaging.realtime import mark_conversation_read
+        mark_conversation_read(conversation, 'brand')
+
+        # Cursor pagination when before/after/limit is sent; numbered pages stay the default
+        if MessageCursorPagination.is_requested(request):
+            from messaging.serializers import MessageSerializer
+            paginator = MessageCursorPagination(conversation)
+            page = paginator.paginate_queryset(messages, request)
+            serializer = MessageSerializer(page, many=True, context={'request': request})
+            return Response({'status': 'success', 'messages': serializer.data, **paginator.get_cursor_data()},
+                            status=status.HTTP_200_OK)
 
         # Pagination
         from deals.views import DealPagination
@@ -1441,9 +1428,8 @@ def brand_conversation_messages_view(request, conversation_id):
                 sender_user=request.user
             )
 
-            # Update conversation timestamp
-            conversation.updated_at = timezone.now()
-            conversation.save()
+            from messaging.realtime import broadcast_new_message
+            broadcast_new_message(message, conversation.deal)
 
             return Response({
                 'status': 'success',
@@ -1472,35 +1458,11 @@ def brand_analytics_overview_view(request):
         return api_response(False, error='You do not have permission to view analytics.', status_code=403)
 
     brand = brand_user.brand
-    time_range = request.GET.get('time_range', 'last_30_days')
-
-    # Calculate date range based on time_range parameter
-    from datetime import timedelta
-    now = timezone.now()
-
-    if time_range == 'last_7_days':
-        start_date = now - timedelta(days=7)
-    elif time_range == 'last_30_days':
-        start_date = now - timedelta(days=30)
-    elif time_range == 'last_90_days':
-        start_date = now - timedelta(days=90)
-    elif time_range == 'last_6_months':
-        start_date = now - timedelta(days=180)
-    elif time_range == 'last_year':
-        start_date = now - timedelta(days=365)
-    else:
-        start_date = now - timedelta(days=30)
+    time_range = BrandAnalyticsService.normalize_time_range(request.GET.get('time_range'))
 
-    # Get campaigns in date range
-    campaigns = brand.campaigns.filter(created_at__gte=start_date)
-    deals = Deal.objects.filter(
-        campaign__brand=brand,
-        invited_at__gte=start_date
-    )
-
-    # Calculate overall metrics
-    total_campaigns = campaigns.count()
-    total_investment = sum(campaign.cash_amount for campaign in campaigns)
+    # Per-campaign deal counts for campaigns created and deals invited in the range
+    campaign_stats = BrandAnalyticsService.get_campaign_stats(brand.id, time_range)
+    summary = BrandAnalyticsService.summarize(campaign_stats)
 
     # Initialize analytics data - will be populated when real analytics are implemented
     total_reach = 0
@@ -1510,22 +1472,19 @@ def brand_analytics_overview_view(request):
 
     # Get top performing campaigns (real data only)
     top_campaigns = []
-    for campaign in campaigns[:5]:  # Top 5 campaigns
-        campaign_deals = deals.filter(campaign=campaign)
-        completed_deals = campaign_deals.filter(status='completed').count()
-
+    for campaign in campaign_stats[:5]:  # Top 5 campaigns
         top_campaigns.append({
-            'id': campaign.id,
-            'title': campaign.title,
-            'is_active': campaign.is_active,
-            'total_investment': campaign.cash_amount,
+            'id': campaign['id'],
+            'title': campaign['title'],
+            'is_active': campaign['is_active'],
+            'total_investment': campaign['cash_amount'],
             'total_reach': 0,  # Will be populated when real analytics are implemented
             'total_engagement': 0,  # Will be populated when real analytics are implemented
             'engagement_rate': 0,  # Will be populated when real analytics are implemented
             'roi': 0,  # Will be populated when real analytics are implemented
-            'influencers_count': campaign_deals.count(),
-            'completed_deals': completed_deals,
-            'pending_deals': campaign_deals.filter(status='invited').count(),
+            'influencers_count': campaign['influencers_count'],
+            'completed_deals': campaign['completed_deals'],
+            'pending_deals': campaign['pending_deals'],
         })
 
     # Generate monthly trends (empty for now - will be populated when real analytics are implemented)
@@ -1541,8 +1500,8 @@ def brand_analytics_overview_view(request):
     return Response({
         'status': 'success',
         'analytics': {
-            'total_campaigns': total_campaigns,
-            'total_investment': total_investment,
+            'total_campaigns': summary['total_campaigns'],
+            'total_investment': summary['total_investment'],
             'total_reach': total_reach,
             'total_engagement': total_engagement,
             'avg_roi': avg_roi,
@@ -1568,38 +1527,13 @@ def brand_analytics_campaigns_view(request):
         return api_response(False, error='You do not have permission to view analytics.', status_code=403)
 
     brand = brand_user.brand
-    time_range = request.GET.get('time_range', 'last_30_days')
-
-    # Calculate date range based on time_range parameter
-    from datetime import timedelta
-    now = timezone.now()
-
-    if time_range == 'last_7_days':
-        start_date = now - timedelta(days=7)
-    elif time_range == 'last_30_days':
-        start_date = now - timedelta(days=30)
-    elif time_range == 'last_90_days':
-        start_date = now - timedelta(days=90)
-    elif time_range == 'last_6_months':
-        start_date = now - timedelta(days=180)
-    elif time_range == 'last_year':
-        start_date = now - timedelta(days=365)
-    else:
-        start_date = now - timedelta(days=30)
+    time_range = BrandAnalyticsService.normalize_time_range(request.GET.get('time_range'))
 
-    # Get campaigns in date range
-    campaigns = brand.campaigns.filter(created_at__gte=start_date)
-    deals = Deal.objects.filter(
-        campaign__brand=brand,
-        invited_at__gte=start_date
-    )
+    # Per-campaign deal counts for campaigns created and deals invited in the range
+    campaign_stats = BrandAnalyticsService.get_campaign_stats(brand.id, time_range)
 
     campaign_analytics = []
-    for campaign in campaigns:
-        campaign_deals = deals.filter(campaign=campaign)
-        completed_deals = campaign_deals.filter(status='completed').count()
-        pending_deals = campaign_deals.filter(status='invited').count()
-
+    for campaign in campaign_stats:
         # Analytics data for each campaign (will be populated when real analytics are implemented)
         total_reach = 0
         total_impressions = 0
@@ -1631,10 +1565,10 @@ def brand_analytics_campaigns_view(request):
         top_performing_content = []
 
         campaign_analytics.append({
-            'id': campaign.id,
-            'title': campaign.title,
-            'is_active': campaign.is_active,
-            'total_investment': campaign.cash_amount,
+            'id': campaign['id'],
+            'title': campaign['title'],
+            'is_active': campaign['is_active'],
+            'total_investment': campaign['cash_amount'],
             'total_reach': total_reach,
             'total_impressions': total_impressions,
             'total_engagement': total_engagement,
@@ -1645,9 +1579,9 @@ def brand_analytics_campaigns_view(request):
             'conversion_rate': conversion_rate,
             'roi': roi,
             'engagement_rate': engagement_rate,
-            'influencers_count': campaign_deals.count(),
-            'completed_deals': completed_deals,
-            'pending_deals': pending_deals,
+            'influencers_count': campaign['influencers_count'],
+            'completed_deals': campaign['completed_deals'],
+            'pending_deals': campaign['pending_deals'],
             'avg_cpm': avg_cpm,
             'avg_cpe': avg_cpe,
             'demographics': demographics,
@@ -2025,7 +1959,7 @@ def add_influencers_to_campaign_view(request, campaign_id):
 
     # Validate influencer IDs
     try:
-        influencers = InfluencerProfile.objects.filter(id__in=influencer_ids)
+        influencers = list(InfluencerProfile.objects.filter(id__in=influencer_ids).select_related('user'))
         if len(influencers) != len(influencer_ids):
             return Response({
                 'status': 'error',
@@ -2037,79 +1971,23 @@ def add_influencers_to_campaign_view(request, campaign_id):
             'message': 'Invalid influencer IDs.'
         }, status=status.HTTP_400_BAD_REQUEST)
 
-    # Add influencers to campaign (create deals)
+    # Add influencers to campaign (create deals); invitations are sent in the background
+    deals, existing = CampaignInvitationService.create_deals(campaign, influencers)
+    deal_ids = {deal.influencer_id: deal.id for deal in deals}
+
     created_deals = []
     existing_deals = []
-
     for influencer in influencers:
-        # Check if deal already exists
-        existing_deal = Deal.objects.filter(campaign=campaign, influencer=influencer).first()
-        if existing_deal:
-            existing_deals.append({
-                'influencer_id': influencer.id,
-                'influencer_name': (influencer.user.get_full_name() or influencer.user.username),
-                'deal_id': existing_deal.id
-            })
+        entry = {
+            'influencer_id': influencer.id,
+            'influencer_name': (influencer.user.get_full_name() or influencer.user.username),
+        }
+        if influencer.id in existing:
+            existing_deals.append({**entry, 'deal_id': existing[influencer.id]})
         else:
-            # Create new deal
-            deal = Deal.objects.create(
-                campaign=campaign,
-                influencer=influencer,
-                status='invited'
-            )
-            created_deals.append({
-                'influencer_id': influencer.id,
-                'influencer_name': (influencer.user.get_full_name() or influencer.user.username),
-                'deal_id': deal.id
-            })
-
-            # Automatically send invitation email
-            try:
-                from communications.email_service import get_email_service
-                email_service = get_email_service()
-                email_service.send_campaign_notification(
-                    influencer=influencer,
-                    campaign=campaign,
-                    deal=deal,
-                    notification_type='invitation'
-                )
-            except Exception as e:
-                import logging
-                logger = logging.getLogger(__name__)
-                logger.error(f"Failed to send invitation email to {influencer.user.username}: {str(e)}")
+            created_deals.append({**entry, 'deal_id': deal_ids[influencer.id]})
 
-            # Automatically send invitation WhatsApp
-            try:
-                # Check if influencer has phone number
-                if influencer.user_profile and influencer.user_profile.phone_number:
-                    from communications.whatsapp_service import get_whatsapp_service
-                    whatsapp_service = get_whatsapp_service()
-                    country_code = (influencer.user_profile.country_code or '+91').strip()
-                    if country_code and not country_code.startswith('+'):
-                        country_code = f'+{country_code}'
-
-                    from common.models import CountryCode
-                    import logging
-                    logger = logging.getLogger(__name__)
-                    if not CountryCode.objects.filter(code=country_code, is_active=True).exists():
-                        logger.warning(
-                            f"Influencer {influencer.user.username} has invalid country_code '{country_code}'. "
-                            f"Using default '+91' instead."
-                        )
-                        country_code = '+91'
-
-                    whatsapp_service.send_campaign_notification(
-                        influencer=influencer,
-                        campaign=campaign,
-                        deal=deal,
-                        notification_type='invitation',
-                        phone_number=influencer.user_profile.phone_number,
-                        country_code=country_code
-                    )
-            except Exception as e:
-                import logging
-                logger = logging.getLogger(__name__)
-                logger.error(f"Failed to send invitation WhatsApp to {influencer.user.username}: {str(e)}")
+    invitation_job = CampaignInvitationService.start_job(campaign, deals) if deals else None
 
     # Log action
     log_brand_action(
@@ -2129,10 +2007,28 @@ def add_influencers_to_campaign_view(request, campaign_id):
         'status': 'success',
         'message': f'Successfully added {len(created_deals)} influencers to campaign.',
         'created_deals': created_deals,
-        'existing_deals': existing_deals
+        'existing_deals': existing_deals,
+        'invitation_job': invitation_job,
     })
 
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def campaign_invitation_progress_view(request, campaign_id, job_id):
+    """
+    Progress of a campaign's background invitation job.
+    """
+    brand_user = get_brand_user_or_403(request)
+    if not brand_user:
+        return api_response(False, error='Brand profile not found.', status_code=404)
+
+    progress = CampaignInvitationService.get_progress(job_id)
+    if not progress or progress.get('brand_id') != brand_user.brand_id or progress.get('campaign_id') != campaign_id:
+        return api_response(False, error='Invitation job not found.', status_code=404)
+
+    return api_response(True, progress)
+
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def send_message_to_influencer_view(request, influencer_id):
@@ -2193,9 +2089,8 @@ def send_message_to_influencer_view(request, influencer_id):
             sender_user=request.user
         )
 
-        # Update conversation timestamp
-        conversation.updated_at = timezone.now()
-        conversation.save()
+        from messaging.realtime import broadcast_new_message
+        broadcast_new_message(message, existing_deal)
 
         # Log action
         log_brand_action(
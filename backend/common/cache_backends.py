@@ -0,0 +1,7 @@
+from django_redis.cache import RedisCache
+
+from .profiling import ProfiledCacheMixin
+
+
+class ProfiledRedisCache(ProfiledCacheMixin, RedisCache):
+    """django-redis cache that reports hits and misses to the request profile."""
@@ -18,6 +18,32 @@ class CacheManager:
         key_parts = [prefix] + [str(arg) for arg in args]
         return ':'.join(key_parts)
 
+    @staticmethod
+    def get_version(key):
+        """Current value of a version counter (starting at 1) used to scope cache keys."""
+        version = cache.get(key)
+        if version is None:
+            cache.add(key, 1, timeout=None)
+            version = cache.get(key) or 1
+        return version
+
+    @staticmethod
+    def bump_version(key):
+        """Bump a version counter, orphaning the entries cached under its old value."""
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, 2, timeout=None)
+
+    @staticmethod
+    def get_redis_client():
+        """Raw Redis client behind the default cache, or None when it isn't django-redis."""
+        try:
+            from django_redis import get_redis_connection
+            return get_redis_connection('default')
+        except (ImportError, NotImplementedError):
+            return None
+
     @staticmethod
     def get_dashboard_stats(user_id):
         """Get cached dashboard statistics for an influencer."""
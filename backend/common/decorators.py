@@ -4,6 +4,7 @@ import re
 import time
 from typing import Callable, Optional
 
+from common.rate_limiter import RateLimiter
 from django.core.cache import cache
 from django.http import JsonResponse
 from rest_framework import status
@@ -31,18 +32,18 @@ def rate_limit(requests_per_minute=60, key_func=None):
                 client_ip = get_client_ip(request)
                 cache_key = f"rate_limit:{view_func.__name__}:{client_ip}"
 
-            # Check current request count
-            current_requests = cache.get(cache_key, 0)
+            # Check and record the request in one atomic step
+            result = RateLimiter.hit(cache_key, requests_per_minute, 60)
 
-            if current_requests >= requests_per_minute:
+            if not result.allowed:
                 logger.warning(f"Rate limit exceeded for {cache_key}")
-                return JsonResponse({
+                response = JsonResponse({
                     'error': 'Rate limit exceeded',
-                    'message': f'Maximum {requests_per_minute} requests per minute allowed'
+                    'message': f'Maximum {requests_per_minute} requests per minute allowed',
+                    'retry_after_seconds': result.retry_after
                 }, status=429)
-
-            # Increment counter
-            cache.set(cache_key, current_requests + 1, 60)  # 60 seconds TTL
+                response['Retry-After'] = str(result.retry_after)
+                return response
 
             return view_func(request, *args, **kwargs)
 
@@ -225,15 +226,11 @@ def smart_rate_limit(
                 # Fail open - allow request if key builder fails
                 return view_func(request, *args, **kwargs)
 
-            # Get current count
-            current_count = cache.get(cache_key, 0)
+            # Check and record the request in one atomic step
+            result = RateLimiter.hit(cache_key, max_requests, window_seconds)
 
-            # Check if limit exceeded
-            if current_count >= max_requests:
-                # Get remaining TTL
-                retry_after_seconds = _get_cache_ttl(cache_key)
-                if retry_after_seconds is None or retry_after_seconds <= 0:
-                    retry_after_seconds = window_seconds
+            if not result.allowed:
+                retry_after_seconds = result.retry_after or window_seconds
 
                 # Build error message
                 minutes = max(1, int(retry_after_seconds / 60))
@@ -248,14 +245,6 @@ def smart_rate_limit(
                     status=status.HTTP_429_TOO_MANY_REQUESTS,
                 )
 
-            # Increment counter
-            if current_count == 0:
-                # First request - set with TTL
-                cache.set(cache_key, 1, window_seconds)
-            else:
-                # Subsequent request - increment without changing TTL
-                cache.incr(cache_key)
-
             # Call the view
             return view_func(request, *args, **kwargs)
 
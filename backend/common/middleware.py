@@ -1,11 +1,17 @@
 """
 Common middleware for the application.
 """
+import cProfile
 import logging
+import os
+import random
+import re
 import time
 
+from common.profiling import EndpointMetrics, end_profile, start_profile
+from common.query_budget import QueryBudgetExceeded, get_query_budget
+from common.rate_limiter import RateLimiter
 from django.conf import settings
-from django.core.cache import cache
 from django.db import connection
 from django.http import JsonResponse
 from django.utils.deprecation import MiddlewareMixin
@@ -93,11 +99,16 @@ class RateLimitMiddleware:
         rate_limit_key = self.get_rate_limit_key(request.path)
         rate_limit = self.rate_limits.get(rate_limit_key, self.rate_limits.get('DEFAULT'))
 
-        if rate_limit and not self.is_rate_limited(client_ip, rate_limit_key, rate_limit):
-            return JsonResponse({
-                'error': 'Rate limit exceeded',
-                'message': f'Too many requests. Limit: {rate_limit["requests"]} per {rate_limit["window"]} seconds'
-            }, status=429)
+        if rate_limit:
+            result = self.is_rate_limited(client_ip, rate_limit_key, rate_limit)
+            if not result.allowed:
+                response = JsonResponse({
+                    'error': 'Rate limit exceeded',
+                    'message': f'Too many requests. Limit: {rate_limit["requests"]} per {rate_limit["window"]} seconds',
+                    'retry_after_seconds': result.retry_after
+                }, status=429)
+                response['Retry-After'] = str(result.retry_after)
+                return response
 
         response = self.get_response(request)
         return response
@@ -121,25 +132,29 @@ class RateLimitMiddleware:
             return 'DEFAULT'
 
     def is_rate_limited(self, client_ip, rate_limit_key, rate_limit):
-        """Check if the client has exceeded the rate limit."""
-        cache_key = f"rate_limit:{rate_limit_key}:{client_ip}"
-        current_requests = cache.get(cache_key, 0)
+        """Record the request and return the limiter result (`allowed` is False once over the limit)."""
+        result = RateLimiter.hit(
+            f"rate_limit:{rate_limit_key}:{client_ip}", rate_limit['requests'], rate_limit['window']
+        )
 
-        if current_requests >= rate_limit['requests']:
+        if not result.allowed:
             security_logger.warning(
                 f"Rate limit exceeded for IP {client_ip} on {rate_limit_key} endpoint. "
-                f"Requests: {current_requests}/{rate_limit['requests']}"
+                f"Requests: {result.count}/{rate_limit['requests']}"
             )
-            return False
-
-        # Increment the counter
-        cache.set(cache_key, current_requests + 1, rate_limit['window'])
-        return True
+        return result
 
 
 class PerformanceMonitoringMiddleware:
     """
-    Middleware to monitor performance and log slow requests.
+    Middleware to profile every request and log slow requests.
+
+    Query count and DB time come from a connection.execute_wrapper, so they
+    are recorded with DEBUG off. Each request's profile is added to the
+    per-endpoint histograms served by the ops performance view and checked
+    against the endpoint's query budget (see common.query_budget). With
+    PROFILE_SAMPLE_RATE set, a sample of requests also runs under cProfile and
+    the stats are dumped to PROFILE_DIR when the request was slow.
     """
 
     def __init__(self, get_response):
@@ -147,38 +162,95 @@ class PerformanceMonitoringMiddleware:
         self.monitoring_config = getattr(settings, 'PERFORMANCE_MONITORING', {})
 
     def __call__(self, request):
-        start_time = time.time()
-        initial_queries = len(connection.queries)
+        n_plus_one_threshold = self.monitoring_config.get('N_PLUS_ONE_THRESHOLD', 0)
+        profile, token = start_profile(
+            n_plus_one_threshold if self.monitoring_config.get('DETECT_N_PLUS_ONE') else 0
+        )
+        profiler = self.start_profiler()
+        start_time = time.perf_counter()
 
-        response = self.get_response(request)
+        try:
+            with connection.execute_wrapper(profile):
+                response = self.get_response(request)
+        finally:
+            duration = time.perf_counter() - start_time
+            end_profile(token)
+            if profiler:
+                profiler.disable()
 
-        # Calculate request duration
-        duration = time.time() - start_time
-        query_count = len(connection.queries) - initial_queries
+        endpoint = request.resolver_match.view_name if request.resolver_match else 'unresolved'
+        query_count = profile.query_count
 
         # Log slow requests
         slow_threshold = self.monitoring_config.get('SLOW_QUERY_THRESHOLD', 1.0)
         if duration > slow_threshold:
             logger.warning(
-                f"Slow request: {request.method} {request.path} "
-                f"took {duration:.2f}s with {query_count} queries"
+                f"Slow request: {request.method} {request.path} ({endpoint}) "
+                f"took {duration:.2f}s with {query_count} queries ({profile.db_time:.2f}s in DB)"
             )
+            if profiler:
+                self.dump_profile(profiler, endpoint)
 
         # Log excessive query counts
         max_queries = self.monitoring_config.get('MAX_QUERY_COUNT', 50)
         if query_count > max_queries:
             logger.warning(
-                f"High query count: {request.method} {request.path} "
+                f"High query count: {request.method} {request.path} ({endpoint}) "
                 f"executed {query_count} queries"
             )
 
+        # Log repeated query shapes (N+1 signatures) with their call site
+        for shape, stack in profile.repeated_shapes.items():
+            logger.warning(
+                f"Possible N+1 in {request.method} {request.path} ({endpoint}): "
+                f"{profile.shape_counts[shape]} queries of the same shape: {shape}\n{stack}"
+            )
+
+        try:
+            EndpointMetrics.record(endpoint, profile.as_metrics(duration))
+        except Exception as e:
+            logger.warning(f"Failed to record metrics for {endpoint}: {e}")
+
+        # Query budgets: logged in production, raised when enforced (tests)
+        budget = get_query_budget(request.resolver_match)
+        if budget is not None and query_count > budget:
+            message = f"{endpoint} ran {query_count} queries, over its budget of {budget}"
+            if self.monitoring_config.get('ENFORCE_QUERY_BUDGETS'):
+                raise QueryBudgetExceeded(message)
+            logger.warning(f"Query budget exceeded: {request.method} {request.path}: {message}")
+
         # Add performance headers in debug mode
         if settings.DEBUG:
             response['X-Response-Time'] = f"{duration:.3f}s"
             response['X-Query-Count'] = str(query_count)
+            response['X-DB-Time'] = f"{profile.db_time:.3f}s"
 
         return response
 
+    def start_profiler(self):
+        """Start cProfile for a sample of requests (PROFILE_SAMPLE_RATE, off by default)."""
+        sample_rate = self.monitoring_config.get('PROFILE_SAMPLE_RATE', 0)
+        if not sample_rate or random.random() >= sample_rate:
+            return None
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler is already active on this thread
+            return None
+        return profiler
+
+    def dump_profile(self, profiler, endpoint):
+        profile_dir = self.monitoring_config.get('PROFILE_DIR') or os.path.join(settings.BASE_DIR, 'logs', 'profiles')
+        try:
+            os.makedirs(profile_dir, exist_ok=True)
+            name = re.sub(r'[^\w.-]', '_', endpoint)
+            path = os.path.join(profile_dir, f"{name}-{int(time.time() * 1000)}.prof")
+            profiler.dump_stats(path)
+            logger.warning(f"Saved profile of slow request to {path}")
+        except OSError as e:
+            logger.warning(f"Failed to save request profile: {e}")
+
 
 class CSRFExemptMiddleware(MiddlewareMixin):
     """
@@ -0,0 +1,279 @@
+"""
+Always-on request profiling.
+
+RequestProfile collects, for the current request, the query count and DB time
+(from a connection.execute_wrapper, so it works with DEBUG off), cache hits
+and misses (from ProfiledCacheMixin) and DRF render time (ProfiledJSONRenderer).
+
+EndpointMetrics aggregates finished requests by resolved URL name into
+histograms: one Redis hash per endpoint per 5-minute slot, with fields
+`<metric>:<bucket upper bound>`, `<metric>:sum` and `count`, written in one
+pipelined round trip per request. Percentiles over a window are computed by
+merging the slots it covers, so they are accurate to the bucket bounds.
+"""
+
+import contextvars
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from common.cache_utils import CacheManager
+from common.query_budget import app_stack, sql_shape
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.renderers import JSONRenderer
+
+logger = logging.getLogger(__name__)
+
+TIME_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+METRIC_BUCKETS = {
+    'duration_ms': TIME_BUCKETS_MS,
+    'db_time_ms': TIME_BUCKETS_MS,
+    'render_ms': TIME_BUCKETS_MS,
+    'query_count': COUNT_BUCKETS,
+    'cache_hits': COUNT_BUCKETS,
+    'cache_misses': COUNT_BUCKETS,
+}
+
+SLOT_SECONDS = 300
+OVERFLOW = 'inf'
+
+_current_profile = contextvars.ContextVar('request_profile', default=None)
+_in_get_many = contextvars.ContextVar('profiled_cache_get_many', default=False)
+_local_lock = threading.Lock()
+
+
+@dataclass
+class RequestProfile:
+    query_count: int = 0
+    db_time: float = 0.0
+    cache_hits: int = 0
+    cache_misses: int = 0
+    render_time: float = 0.0
+    # N+1 detection: off when 0, otherwise the repeat count at which a shape is reported
+    repeat_threshold: int = 0
+    shape_counts: Dict[str, int] = field(default_factory=dict)
+    repeated_shapes: Dict[str, str] = field(default_factory=dict)  # shape -> call site stack
+
+    def __call__(self, execute, sql, params, many, context):
+        """execute_wrapper hook: time every query run on the connection."""
+        if self.repeat_threshold:
+            self.count_shape(sql)
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - start
+            self.query_count += 1
+
+    def count_shape(self, sql: str) -> None:
+        shape = sql_shape(sql)
+        count = self.shape_counts.get(shape, 0) + 1
+        self.shape_counts[shape] = count
+        if count == self.repeat_threshold:
+            self.repeated_shapes[shape] = app_stack()
+
+    def as_metrics(self, duration: float) -> Dict[str, float]:
+        return {
+            'duration_ms': duration * 1000,
+            'db_time_ms': self.db_time * 1000,
+            'render_ms': self.render_time * 1000,
+            'query_count': self.query_count,
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses,
+        }
+
+
+def start_profile(repeat_threshold: int = 0) -> Tuple[RequestProfile, contextvars.Token]:
+    """Make a fresh profile current; pass the token to end_profile when the request is done."""
+    profile = RequestProfile(repeat_threshold=repeat_threshold)
+    return profile, _current_profile.set(profile)
+
+
+def current_profile() -> Optional[RequestProfile]:
+    return _current_profile.get()
+
+
+def end_profile(token: contextvars.Token) -> None:
+    _current_profile.reset(token)
+
+
+def record_cache_lookup(hits: int, misses: int) -> None:
+    profile = _current_profile.get()
+    if profile is not None:
+        profile.cache_hits += hits
+        profile.cache_misses += misses
+
+
+_MISSING = object()
+
+
+class ProfiledCacheMixin:
+    """Cache backend mixin counting get/get_many hits and misses on the request profile."""
+
+    def get(self, key, default=None, *args, **kwargs):
+        value = super().get(key, _MISSING, *args, **kwargs)
+        if _in_get_many.get():
+            return default if value is _MISSING else value
+        if value is _MISSING:
+            record_cache_lookup(0, 1)
+            return default
+        record_cache_lookup(1, 0)
+        return value
+
+    def get_many(self, keys, *args, **kwargs):
+        keys = list(keys)
+        # Backends whose get_many loops over get() are counted once, here
+        token = _in_get_many.set(True)
+        try:
+            values = super().get_many(keys, *args, **kwargs)
+        finally:
+            _in_get_many.reset(token)
+        record_cache_lookup(len(values), len(keys) - len(values))
+        return values
+
+
+class ProfiledJSONRenderer(JSONRenderer):
+    """JSONRenderer that adds its render time to the request profile."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        start = time.perf_counter()
+        try:
+            return super().render(data, accepted_media_type, renderer_context)
+        finally:
+            profile = _current_profile.get()
+            if profile is not None:
+                profile.render_time += time.perf_counter() - start
+
+
+def _bucket(metric: str, value: float) -> str:
+    for bound in METRIC_BUCKETS[metric]:
+        if value <= bound:
+            return str(bound)
+    return OVERFLOW
+
+
+class EndpointMetrics:
+    """Rolling per-endpoint histograms of request profiles."""
+
+    @staticmethod
+    def _retention() -> int:
+        return getattr(settings, 'CACHE_TIMEOUTS', {}).get('ENDPOINT_METRICS', 86400)
+
+    @staticmethod
+    def _slot(timestamp: Optional[float] = None) -> int:
+        return int((timestamp or time.time()) // SLOT_SECONDS)
+
+    @staticmethod
+    def _key(slot: int, endpoint: str) -> str:
+        return CacheManager.get_cache_key('endpoint_metrics', slot, endpoint)
+
+    @staticmethod
+    def _index_key(slot: int) -> str:
+        return CacheManager.get_cache_key('endpoint_metrics_index', slot)
+
+    @staticmethod
+    def record(endpoint: str, metrics: Dict[str, float]) -> None:
+        """Add one request's metrics (any subset of METRIC_BUCKETS) to the current slot."""
+        slot = EndpointMetrics._slot()
+        fields = {'count': 1}
+        for metric, value in metrics.items():
+            fields[f'{metric}:{_bucket(metric, value)}'] = 1
+            fields[f'{metric}:sum'] = value
+
+        client = CacheManager.get_redis_client()
+        if client is not None:
+            key = cache.make_key(EndpointMetrics._key(slot, endpoint))
+            index_key = cache.make_key(EndpointMetrics._index_key(slot))
+            pipe = client.pipeline(transaction=False)
+            for name, amount in fields.items():
+                if name.endswith(':sum'):
+                    pipe.hincrbyfloat(key, name, amount)
+                else:
+                    pipe.hincrby(key, name, amount)
+            pipe.expire(key, EndpointMetrics._retention())
+            pipe.sadd(index_key, endpoint)
+            pipe.expire(index_key, EndpointMetrics._retention())
+            pipe.execute()
+            return
+
+        key = EndpointMetrics._key(slot, endpoint)
+        index_key = EndpointMetrics._index_key(slot)
+        with _local_lock:
+            histogram = cache.get(key, {})
+            for name, amount in fields.items():
+                histogram[name] = histogram.get(name, 0) + amount
+            cache.set(key, histogram, EndpointMetrics._retention())
+            cache.set(index_key, cache.get(index_key, set()) | {endpoint}, EndpointMetrics._retention())
+
+    @staticmethod
+    def _load_slot(slot: int) -> Dict[str, Dict[str, float]]:
+        client = CacheManager.get_redis_client()
+        if client is not None:
+            endpoints = [
+                name.decode() if isinstance(name, bytes) else name
+                for name in client.smembers(cache.make_key(EndpointMetrics._index_key(slot)))
+            ]
+            pipe = client.pipeline(transaction=False)
+            for endpoint in endpoints:
+                pipe.hgetall(cache.make_key(EndpointMetrics._key(slot, endpoint)))
+            return {
+                endpoint: {
+                    (name.decode() if isinstance(name, bytes) else name): float(value)
+                    for name, value in histogram.items()
+                }
+                for endpoint, histogram in zip(endpoints, pipe.execute())
+            }
+
+        endpoints = cache.get(EndpointMetrics._index_key(slot), set())
+        return {endpoint: cache.get(EndpointMetrics._key(slot, endpoint), {}) for endpoint in endpoints}
+
+    @staticmethod
+    def _percentile(histogram: Dict[str, float], metric: str, count: float, percent: int):
+        """Upper bound of the bucket holding the percentile; the top bound if it overflowed."""
+        target = count * percent / 100
+        seen = 0
+        for bound in METRIC_BUCKETS[metric]:
+            seen += histogram.get(f'{metric}:{bound}', 0)
+            if seen >= target:
+                return bound
+        return METRIC_BUCKETS[metric][-1]
+
+    @staticmethod
+    def summary(window_seconds: int = 3600) -> List[Dict]:
+        """p50/p95/p99 and mean of every metric per endpoint over the last `window_seconds`."""
+        current = EndpointMetrics._slot()
+        slots = range(current - max(0, window_seconds // SLOT_SECONDS - 1), current + 1)
+
+        merged = {}
+        for slot in slots:
+            for endpoint, histogram in EndpointMetrics._load_slot(slot).items():
+                totals = merged.setdefault(endpoint, {})
+                for name, value in histogram.items():
+                    totals[name] = totals.get(name, 0) + value
+
+        endpoints = []
+        for endpoint, histogram in merged.items():
+            metrics = {}
+            for metric, bounds in METRIC_BUCKETS.items():
+                # Per-metric count: callers may record only some metrics
+                count = sum(histogram.get(f'{metric}:{bound}', 0) for bound in (*bounds, OVERFLOW))
+                if not count:
+                    continue
+                metrics[metric] = {
+                    'p50': EndpointMetrics._percentile(histogram, metric, count, 50),
+                    'p95': EndpointMetrics._percentile(histogram, metric, count, 95),
+                    'p99': EndpointMetrics._percentile(histogram, metric, count, 99),
+                    'mean': round(histogram.get(f'{metric}:sum', 0) / count, 2),
+                }
+            endpoints.append({'endpoint': endpoint, 'count': int(histogram.get('count', 0)), 'metrics': metrics})
+
+        return sorted(
+            endpoints,
+            key=lambda item: item['metrics'].get('duration_ms', {}).get('p95', 0),
+            reverse=True,
+        )
@@ -0,0 +1,85 @@
+"""
+Query budgets and N+1 detection.
+
+A budget caps the queries one request to a view may run. Declare it with the
+@query_budget(n) decorator (placed above @api_view) or in
+settings.QUERY_BUDGETS keyed by URL name; the decorator wins.
+PerformanceMonitoringMiddleware checks every request against it: going over
+is logged, or raised as QueryBudgetExceeded when
+PERFORMANCE_MONITORING['ENFORCE_QUERY_BUDGETS'] is on (the test suite).
+
+The N+1 detector counts queries per SQL shape (the SQL text with IN lists
+collapsed). When one shape runs N_PLUS_ONE_THRESHOLD times in a request it
+is logged once, with the application frames of the call site.
+"""
+
+import re
+import traceback
+from typing import Iterator, Optional, Tuple
+
+from django.conf import settings
+from django.urls import URLPattern, URLResolver, get_resolver
+
+IN_LIST_RE = re.compile(r'\((?:%s, )+%s\)')
+
+
+class QueryBudgetExceeded(Exception):
+    """A request ran more queries than its endpoint's budget."""
+
+
+def query_budget(max_queries: int):
+    """
+    Declare the maximum number of queries per request for a view.
+
+    Usage:
+        @query_budget(12)
+        @api_view(['GET'])
+        def my_view(request): ...
+    """
+
+    def decorator(view_func):
+        view_func.query_budget = max_queries
+        return view_func
+
+    return decorator
+
+
+def get_query_budget(resolver_match) -> Optional[int]:
+    """The budget for the resolved view: its decorator first, then settings.QUERY_BUDGETS."""
+    if resolver_match is None:
+        return None
+    budget = getattr(resolver_match.func, 'query_budget', None)
+    if budget is None:
+        budget = getattr(settings, 'QUERY_BUDGETS', {}).get(resolver_match.view_name)
+    return budget
+
+
+def sql_shape(sql: str) -> str:
+    """The SQL with IN (%s, %s, ...) lists collapsed, so batched lookups share one shape."""
+    return IN_LIST_RE.sub('(%s, ...)', sql)
+
+
+def app_stack(limit: int = 8) -> str:
+    """The innermost application frames of the current stack (project code, minus middleware)."""
+    base_dir = str(settings.BASE_DIR)
+    frames = [
+        frame for frame in traceback.extract_stack()[:-1]
+        if frame.filename.startswith(base_dir)
+        and 'site-packages' not in frame.filename
+        and not frame.filename.endswith(('middleware.py', 'common/profiling.py', 'common/query_budget.py'))
+    ]
+    return ''.join(traceback.format_list(frames[-limit:]))
+
+
+def iter_url_patterns(patterns=None, namespace: str = '') -> Iterator[Tuple[str, URLPattern]]:
+    """Yield (view name, pattern) for every named URL, recursing into includes."""
+    if patterns is None:
+        patterns = get_resolver().url_patterns
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            child_namespace = namespace
+            if pattern.namespace:
+                child_namespace = f'{namespace}:{pattern.namespace}' if namespace else pattern.namespace
+            yield from iter_url_patterns(pattern.url_patterns, child_namespace)
+        elif isinstance(pattern, URLPattern) and pattern.name:
+            yield (f'{namespace}:{pattern.name}' if namespace else pattern.name), pattern
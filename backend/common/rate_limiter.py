@@ -0,0 +1,120 @@
+"""
+Shared rate limiter engine.
+
+Sliding-window log: each key is a Redis sorted set of hit timestamps. One Lua
+script drops hits older than the window, counts the rest, records the new hit
+when under the limit and returns (allowed, count, retry_after_ms), so a check
+is a single atomic round trip. The script reads Redis TIME, so app servers
+with skewed clocks still share one window.
+
+Caches other than django-redis (locmem in tests and local development) use
+the same algorithm in-process under a lock.
+"""
+
+import logging
+import math
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+
+from common.cache_utils import CacheManager
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+SLIDING_WINDOW_SCRIPT = """
+local key = KEYS[1]
+local limit = tonumber(ARGV[1])
+local window_ms = tonumber(ARGV[2])
+local now = redis.call('TIME')
+local now_ms = tonumber(now[1]) * 1000 + math.floor(tonumber(now[2]) / 1000)
+
+redis.call('ZREMRANGEBYSCORE', key, '-inf', now_ms - window_ms)
+local count = redis.call('ZCARD', key)
+if count < limit then
+    redis.call('ZADD', key, now_ms, ARGV[3])
+    redis.call('PEXPIRE', key, window_ms)
+    return {1, count + 1, 0}
+end
+
+local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+local retry_after_ms = window_ms
+if oldest[2] then
+    retry_after_ms = tonumber(oldest[2]) + window_ms - now_ms
+end
+return {0, count, retry_after_ms}
+"""
+
+_script = None
+_local_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class RateLimitResult:
+    allowed: bool
+    count: int
+    limit: int
+    retry_after: int = 0  # seconds until the next hit would be allowed
+
+
+class RateLimiter:
+    """Atomic sliding-window rate limiting shared by the middleware and decorators."""
+
+    @staticmethod
+    def get_key(key: str) -> str:
+        return CacheManager.get_cache_key('rate_window', key)
+
+    @staticmethod
+    def _redis_script():
+        """The registered Lua script, or None when the cache isn't django-redis."""
+        global _script
+        if _script is None:
+            client = CacheManager.get_redis_client()
+            _script = client.register_script(SLIDING_WINDOW_SCRIPT) if client is not None else False
+        return _script or None
+
+    @staticmethod
+    def hit(key: str, limit: int, window: int) -> RateLimitResult:
+        """
+        Record a hit for `key` if fewer than `limit` hits happened in the last
+        `window` seconds. Fails open (allowed) if the cache is unreachable.
+        """
+        cache_key = RateLimiter.get_key(key)
+        try:
+            script = RateLimiter._redis_script()
+            if script is not None:
+                allowed, count, retry_after_ms = script(
+                    keys=[cache.make_key(cache_key)],
+                    args=[limit, int(window * 1000), uuid.uuid4().hex],
+                )
+                return RateLimitResult(
+                    allowed=bool(allowed),
+                    count=int(count),
+                    limit=limit,
+                    retry_after=max(1, math.ceil(int(retry_after_ms) / 1000)) if not allowed else 0,
+                )
+            return RateLimiter._hit_cache(cache_key, limit, window)
+        except Exception as e:
+            logger.warning(f"Rate limiter unavailable for {key}, allowing request: {e}")
+            return RateLimitResult(allowed=True, count=0, limit=limit)
+
+    @staticmethod
+    def _hit_cache(cache_key: str, limit: int, window: int) -> RateLimitResult:
+        now = time.time()
+        with _local_lock:
+            hits = [hit for hit in cache.get(cache_key, []) if hit > now - window]
+            if len(hits) >= limit:
+                return RateLimitResult(
+                    allowed=False,
+                    count=len(hits),
+                    limit=limit,
+                    retry_after=max(1, math.ceil(hits[0] + window - now)),
+                )
+            hits.append(now)
+            cache.set(cache_key, hits, window)
+            return RateLimitResult(allowed=True, count=len(hits), limit=limit)
+
+    @staticmethod
+    def reset(key: str) -> None:
+        cache.delete(RateLimiter.get_key(key))
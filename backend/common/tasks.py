@@ -4,6 +4,7 @@ from datetime import timedelta
 from celery import shared_task
 from common.models import CeleryTask
 from communications.models import PhoneVerificationToken
+from communications.scrape_request_registry import ScrapeRequestRegistry
 from communications.social_scraping_service import get_social_scraping_service
 from communications.whatsapp_service import get_whatsapp_service
 from django.core.cache import cache
@@ -45,6 +46,7 @@ def queue_social_accounts_needing_sync(self, days_threshold: int = 30, priority:
     errors: list[str] = []
 
     scraping_service = get_social_scraping_service()
+    suppressed_before = ScrapeRequestRegistry.get_metrics()["suppressed"]
 
     logger.info(
         "Queueing sync for %s social accounts needing update (threshold=%sd)",
@@ -58,6 +60,9 @@ def queue_social_accounts_needing_sync(self, days_threshold: int = 30, priority:
                 message_id = scraping_service.queue_scrape_request(account, priority=priority)
                 if message_id:
                     queued_count += 1
+                elif ScrapeRequestRegistry.get_state(account.platform, account.handle):
+                    # Coalesced into a request that has no message id; counted as suppressed
+                    pass
                 else:
                     error_count += 1
                     errors.append(f"{account.id}:{account.handle}({account.platform}) failed_to_queue")
@@ -69,6 +74,8 @@ def queue_social_accounts_needing_sync(self, days_threshold: int = 30, priority:
             "threshold_days": days_threshold,
             "total_needing_sync": total_needing_sync,
             "queued": queued_count,
+            # Requests coalesced into one already in flight (approximate if other workers queue concurrently)
+            "suppressed": ScrapeRequestRegistry.get_metrics()["suppressed"] - suppressed_before,
             "errors": error_count,
             "error_samples": errors[:50],
         }
@@ -0,0 +1,51 @@
+"""
+Transaction helpers.
+
+`on_commit_once` coalesces work queued for ids during a transaction: every id
+queued under a name before the commit is handed to the callback in one call,
+however many times it was queued.
+
+Usage:
+    from common.transaction_utils import on_commit_once
+
+    on_commit_once('deal_rollups', [influencer_id], DealRollupService.refresh)
+"""
+
+import logging
+import threading
+from typing import Callable, Iterable, List, Set
+
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+_local = threading.local()
+
+
+def _pending(name: str) -> Set:
+    """Ids queued under `name` on the current thread's connection."""
+    if not hasattr(_local, 'pending'):
+        _local.pending = {}
+    return _local.pending.setdefault(name, set())
+
+
+def on_commit_once(name: str, ids: Iterable, callback: Callable[[List], None]) -> None:
+    """
+    Run `callback` with the sorted ids queued under `name` once the current
+    transaction commits. Falsy ids are skipped; errors from the callback are
+    logged, not raised, since the transaction has already committed.
+    """
+    pending = _pending(name)
+    pending.update(item for item in ids if item)
+
+    def _run():
+        batch = sorted(pending)
+        pending.clear()
+        if not batch:
+            return
+        try:
+            callback(batch)
+        except Exception as exc:
+            logger.error(f"Failed to run {name} after commit for {batch}: {exc}")
+
+    transaction.on_commit(_run)
@@ -10,4 +10,5 @@ urlpatterns = [
     path('country-codes/', views.get_country_codes_view, name='get_country_codes'),
     path('location-from-pincode/', views.get_location_from_pincode_view, name='get_location_from_pincode'),
     path('influencer-locations/', views.get_influencer_locations_view, name='get_influencer_locations'),
+    path('ops/performance/', views.performance_metrics_view, name='performance_metrics'),
 ]
@@ -1,12 +1,14 @@
 import pandas as pd
 import pgeocode
 from django.apps import apps
+from django.conf import settings
 from django.core.cache import cache
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import AllowAny
+from rest_framework.permissions import AllowAny, IsAdminUser
 
 from .api_response import api_response
 from .models import ContentCategory, Industry, CountryCode
+from .profiling import EndpointMetrics
 from .serializers import ContentCategorySerializer, IndustrySerializer, CountryCodeSerializer
 
 
@@ -160,3 +162,29 @@ def get_influencer_locations_view(request):
         return api_response(True, result={"locations": locations})
     except Exception as e:
         return api_response(False, error=f"Failed to load influencer locations: {str(e)}", status_code=500)
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def performance_metrics_view(request):
+    """
+    Per-endpoint request profile percentiles for ops (staff only).
+
+    Query Parameters:
+    - window: Seconds to look back (default 3600, up to the ENDPOINT_METRICS retention)
+
+    Returns p50/p95/p99 and mean of duration, DB time, query count, cache hits/misses
+    and render time per resolved URL name, slowest p95 first.
+    """
+    retention = getattr(settings, 'CACHE_TIMEOUTS', {}).get('ENDPOINT_METRICS', 86400)
+    try:
+        window = min(max(int(request.GET.get('window', 3600)), 300), retention)
+    except (TypeError, ValueError):
+        return api_response(False, error='window must be a number of seconds.', status_code=400)
+
+    try:
+        endpoints = EndpointMetrics.summary(window)
+    except Exception as e:
+        return api_response(False, error=f"Failed to load performance metrics: {str(e)}", status_code=500)
+
+    return api_response(True, result={'window_seconds': window, 'endpoints': endpoints})
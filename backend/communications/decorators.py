@@ -70,7 +70,7 @@ def rate_limit(max_attempts=3, time_window=3600):
     def decorator(view_func):
         @wraps(view_func)
         def wrapper(request, *args, **kwargs):
-            from django.core.cache import cache
+            from common.rate_limiter import RateLimiter
 
             user = request.user
             if not user.is_authenticated:
@@ -79,19 +79,14 @@ def rate_limit(max_attempts=3, time_window=3600):
             # Create cache key
             cache_key = f'rate_limit:{view_func.__name__}:{user.id}'
 
-            # Get current attempts
-            attempts = cache.get(cache_key, 0)
-
-            if attempts >= max_attempts:
+            # Check and record the attempt in one atomic step
+            if not RateLimiter.hit(cache_key, max_attempts, time_window).allowed:
                 return api_response(
                     False,
                     error=f'You have exceeded the maximum number of attempts. Please try again later.',
                     status_code=status.HTTP_429_TOO_MANY_REQUESTS
                 )
 
-            # Increment attempts
-            cache.set(cache_key, attempts + 1, time_window)
-
             # Proceed with the view
             return view_func(request, *args, **kwargs)
 
@@ -0,0 +1,124 @@
+"""
+Write-behind buffer for CommunicationLog rows.
+
+The notification workers used to look a message up, insert its log and save
+it again on every status change - several round trips per message, more than
+the provider call itself. Instead they build the log in memory in its final
+state for the attempt and hand it to a CommunicationLogBuffer:
+
+    buffer = CommunicationLogBuffer(max_size=100, max_delay_ms=500)
+    buffer.start()
+    ...
+    buffer.record(CommunicationLog(message_id=..., status='sent', ...))
+    ...
+    buffer.stop()  # flushes what is left
+
+Buffered logs are written as one upsert on message_id every `max_size` logs
+or `max_delay_ms`, whichever comes first; a newer state of a message replaces
+an older one still in the buffer. Duplicate deliveries are detected with a
+Redis SET NX key (claim_message_id) rather than a DB lookup.
+"""
+
+import logging
+import threading
+from typing import Dict, List
+
+from common.cache_utils import CacheManager
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections
+
+from .models import CommunicationLog
+
+logger = logging.getLogger(__name__)
+
+# Columns an upsert overwrites; created_at keeps the first attempt's time
+UPSERT_FIELDS = [
+    'message_type', 'recipient', 'status', 'metadata', 'subject', 'sender_type', 'sender_id',
+    'phone_number', 'country_code', 'sent_at', 'error_log', 'retry_count', 'updated_at',
+]
+
+
+def claim_message_id(message_id: str) -> bool:
+    """
+    True the first time a message id is claimed, False for a duplicate delivery.
+
+    Falls back to looking for an existing log when the cache is unavailable.
+    """
+    key = CacheManager.get_cache_key('comm_message', message_id)
+    timeout = getattr(settings, 'CACHE_TIMEOUTS', {}).get('COMMUNICATION_IDEMPOTENCY', 172800)
+    try:
+        return cache.add(key, 1, timeout)
+    except Exception as exc:
+        logger.warning(f"Idempotency cache unavailable for message {message_id}: {exc}")
+        return not CommunicationLog.objects.filter(message_id=message_id).exists()
+
+
+class CommunicationLogBuffer:
+    """Thread-safe, size- and time-bounded buffer of CommunicationLog upserts."""
+
+    def __init__(self, max_size: int = 100, max_delay_ms: int = 500):
+        self.max_size = max_size
+        self.max_delay = max_delay_ms / 1000
+
+        self._pending: Dict[str, CommunicationLog] = {}
+        self._lock = threading.Lock()
+        # Serializes flushes so two states of one message can't land out of order
+        self._flush_lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def record(self, log: CommunicationLog) -> None:
+        """Buffer the current state of a message's log."""
+        with self._lock:
+            self._pending[log.message_id] = log
+            full = len(self._pending) >= self.max_size
+        if full:
+            self.flush()
+
+    def flush(self) -> int:
+        """Write every buffered log. Returns the number written."""
+        with self._flush_lock:
+            with self._lock:
+                batch: List[CommunicationLog] = list(self._pending.values())
+                self._pending = {}
+            if not batch:
+                return 0
+
+            try:
+                CommunicationLog.objects.bulk_create(
+                    batch,
+                    update_conflicts=True,
+                    unique_fields=['message_id'],
+                    update_fields=UPSERT_FIELDS,
+                    batch_size=self.max_size,
+                )
+            except Exception as exc:
+                logger.error(f"Failed to write {len(batch)} communication logs: {exc}")
+                # Keep them for the next flush unless a newer state arrived meanwhile
+                with self._lock:
+                    for log in batch:
+                        self._pending.setdefault(log.message_id, log)
+                return 0
+            return len(batch)
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.max_delay):
+            close_old_connections()
+            self.flush()
+        close_old_connections()
+
+    def start(self) -> None:
+        """Flush every `max_delay_ms` from a background thread."""
+        if self._thread is None:
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self._run, name='communication-log-flush', daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background flushes and write what is left."""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
@@ -0,0 +1,174 @@
+import json
+import random
+import time
+from datetime import timedelta
+
+from common.models import Industry
+from communications.social_scraping_service import InstagramScraper, get_social_scraping_service
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+from influencers.models import InfluencerProfile, SocialMediaAccount
+from users.models import UserProfile
+
+PROFILE_IMAGE_KEYS = ('profile_image_url', 'profile_pic_url', 'profile_pic_url_hd')
+POST_TYPES = ['image', 'carousel', 'reel', 'video']
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Replay recorded scraper payloads through the scrape persistence step and report rows/sec. '
+        'Everything written is rolled back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--payloads',
+            help='JSON lines file of recorded scraper responses, either raw responses or '
+                 '{"platform": ..., "username": ..., "payload": {...}} objects',
+        )
+        parser.add_argument('--synthetic', type=int, default=200,
+                            help='Number of synthetic payloads to replay when --payloads is not given')
+        parser.add_argument('--posts', type=int, default=50, help='Posts per synthetic payload')
+        parser.add_argument('--rounds', type=int, default=2,
+                            help='Replay every payload this many times (later rounds update existing rows)')
+
+    def handle(self, *args, **options):
+        records = self._load_payloads(options)
+        if not records:
+            raise CommandError('No payloads to replay')
+
+        service = get_social_scraping_service()
+        try:
+            with transaction.atomic():
+                accounts = self._create_accounts(records)
+                self._analyze()
+                for replay_round in range(1, options['rounds'] + 1):
+                    self._replay(service, records, accounts, replay_round)
+                    self._analyze()
+                raise _Rollback()
+        except _Rollback:
+            self.stdout.write('Replayed data rolled back')
+
+    def _load_payloads(self, options):
+        if not options['payloads']:
+            return self._synthetic_payloads(options['synthetic'], options['posts'])
+
+        records = []
+        with open(options['payloads']) as payload_file:
+            for line in payload_file:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                payload = record.get('payload', record)
+                user = payload.get('data', {}).get('user', {})
+                # Avoid downloading profile images while timing the database work
+                for key in PROFILE_IMAGE_KEYS:
+                    user.pop(key, None)
+                records.append({
+                    'platform': (record.get('platform') or 'instagram').lower(),
+                    'username': record.get('username') or user.get('username'),
+                    'payload': payload,
+                })
+        return records
+
+    def _synthetic_payloads(self, count, posts_per_payload):
+        rng = random.Random(7)
+        now = timezone.now()
+        records = []
+        for i in range(count):
+            username = f'bench_scrape_{i}'
+            followers = rng.randint(1000, 5000000)
+            posts = [
+                {
+                    'post_id': f'{username}_{p}',
+                    'post_url': f'https://instagram.com/p/{username}_{p}',
+                    'post_type': rng.choice(POST_TYPES),
+                    'content': f'post {p} #bench',
+                    'hashtags': ['bench'],
+                    'posted_at': (now - timedelta(hours=rng.randint(1, 2000))).isoformat(),
+                    'metrics': {
+                        'likes_count': rng.randint(0, followers // 10),
+                        'comments_count': rng.randint(0, 500),
+                        'views_count': rng.randint(0, followers),
+                    },
+                }
+                for p in range(posts_per_payload)
+            ]
+            records.append({
+                'platform': 'instagram',
+                'username': username,
+                'payload': {
+                    'ok': True,
+                    'data': {
+                        'user': {
+                            'username': username,
+                            'full_name': f'Bench {i}',
+                            'biography': 'benchmark account',
+                            'is_verified': i % 5 == 0,
+                            'metrics': {
+                                'followers_count': followers,
+                                'following_count': rng.randint(10, 2000),
+                                'media_count': posts_per_payload,
+                            },
+                            'engagement_data': {'average_shares': rng.randint(0, 50)},
+                        },
+                        'posts': posts,
+                    },
+                },
+            })
+        return records
+
+    def _create_accounts(self, records):
+        industry, _ = Industry.objects.get_or_create(key='benchmark', defaults={'name': 'Benchmark'})
+        accounts = {}
+        for i, record in enumerate(records):
+            key = (record['platform'], record['username'])
+            if key in accounts:
+                continue
+            user = User.objects.create(username=f'bench_scrape_user_{i}')
+            user_profile = UserProfile.objects.create(user=user, phone_number=f'6{i:09d}')
+            influencer = InfluencerProfile.objects.create(user=user, user_profile=user_profile, industry=industry)
+            accounts[key] = SocialMediaAccount.objects.create(
+                influencer=influencer,
+                platform=record['platform'],
+                handle=record['username'],
+            )
+        return accounts
+
+    @staticmethod
+    def _analyze():
+        # Autovacuum never sees rows of this uncommitted transaction; keep planner stats realistic
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE social_media_accounts, social_media_posts')
+
+    def _replay(self, service, records, accounts, replay_round):
+        scraper = InstagramScraper(service.base_url, service.session)
+        rows = 0
+        queries = 0
+
+        def count_queries(execute, sql, params, many, context):
+            nonlocal queries
+            queries += 1
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(count_queries):
+            start = time.perf_counter()
+            for record in records:
+                account = accounts[(record['platform'], record['username'])]
+                profile_data = scraper.parse_response(record['username'], record['payload'])
+                service._save_account_data(account, profile_data)
+                rows += 1 + len(profile_data.posts)
+            elapsed = time.perf_counter() - start
+
+        self.stdout.write(
+            f'round {replay_round}: {len(records)} payloads, {rows} rows in {elapsed:.2f}s -> '
+            f'{rows / elapsed:,.0f} rows/sec, {len(records) / elapsed:,.1f} payloads/sec, '
+            f'{queries / len(records):.1f} queries/payload'
+        )
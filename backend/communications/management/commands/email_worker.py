@@ -1,25 +1,41 @@
+import functools
 import json
 import logging
 import os
 import signal
-import smtplib
-import ssl
 import sys
-import time
+from concurrent.futures import ThreadPoolExecutor
 from email.message import EmailMessage
 
 import pika
+from communications.log_buffer import CommunicationLogBuffer, claim_message_id
 from communications.models import CommunicationLog
+from communications.rabbitmq_service import LAST_ERROR_HEADER, RETRY_DELAYS_MS, RabbitMQService
+from communications.smtp_pool import SMTPConnectionPool
 from django.core.management.base import BaseCommand
+from django.db import close_old_connections
 from django.utils import timezone
 
 logger = logging.getLogger(__name__)
 
 
 class EmailWorker:
-    """Background worker to process email messages from RabbitMQ"""
-
-    def __init__(self):
+    """
+    Background worker to process email messages from RabbitMQ.
+
+    Deliveries are consumed on the main thread and sent by `concurrency`
+    threads sharing a pool of authenticated SMTP sessions; prefetch matches
+    the thread count. Acks and retry publishes are handed back to the
+    connection thread, as pika channels aren't thread-safe. A failed send is
+    republished to the queue's delayed retry queues (see RabbitMQService.
+    route_failure) and ends up in its DLQ once those are used up, so no
+    thread waits out a backoff. Logs are written in batches through a
+    CommunicationLogBuffer.
+    """
+
+    MAX_ATTEMPTS = 1 + len(RETRY_DELAYS_MS)
+
+    def __init__(self, concurrency=None):
         self.connection = None
         self.channel = None
         self.should_stop = False
@@ -30,6 +46,7 @@ class EmailWorker:
         self.password = os.environ.get('RABBITMQ_PASSWORD', 'guest')
         self.vhost = os.environ.get('RABBITMQ_VHOST', '/')
         self.queue_name = os.environ.get('RABBITMQ_EMAIL_QUEUE', 'email_notifications')
+        self.concurrency = concurrency or int(os.environ.get('EMAIL_WORKER_CONCURRENCY', '8'))
 
         self.smtp_port = int(os.environ.get('ZEPTOMAIL_SMTP_PORT', '587'))
         self.smtp_server = os.environ.get('ZEPTOMAIL_SMTP_HOST', 'smtp.zeptomail.in')
@@ -42,6 +59,22 @@ class EmailWorker:
         if not self.smtp_password:
             logger.warning("ZEPTOMAIL_SMTP_PASSWORD not configured!")
 
+        self.smtp_pool = None
+        if self.smtp_port in (465, 587):
+            self.smtp_pool = SMTPConnectionPool(
+                self.smtp_server,
+                self.smtp_port,
+                self.username,
+                self.smtp_password,
+                size=self.concurrency,
+                max_age=int(os.environ.get('EMAIL_SMTP_SESSION_MAX_AGE', '300')),
+            )
+        self.log_buffer = CommunicationLogBuffer(
+            max_size=int(os.environ.get('COMMUNICATION_LOG_BATCH_SIZE', '100')),
+            max_delay_ms=int(os.environ.get('COMMUNICATION_LOG_FLUSH_MS', '500')),
+        )
+        self.executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='email-sender')
+
     def connect_rabbitmq(self):
         """Establish connection to RabbitMQ"""
         try:
@@ -63,11 +96,12 @@ class EmailWorker:
                 durable=True,
                 arguments={'x-message-ttl': 86400000}  # 24 hours
             )
+            RabbitMQService.declare_retry_topology(self.channel, self.queue_name)
 
-            self.channel.basic_qos(prefetch_count=1)
+            self.channel.basic_qos(prefetch_count=self.concurrency)
 
             logger.info(f"Connected to RabbitMQ at {self.host}:{self.port}")
-            logger.info(f"Listening on queue: {self.queue_name}")
+            logger.info(f"Listening on queue: {self.queue_name} with {self.concurrency} senders")
             return True
 
         except Exception as e:
@@ -75,7 +109,7 @@ class EmailWorker:
             return False
 
     def send_email_smtp(self, to_email, subject, html_body, from_email=None, from_name=None):
-        """Send email using Zoho Zeptomail SMTP - exact same logic as working script"""
+        """Send email using Zoho Zeptomail SMTP over a pooled session"""
         try:
             if not self.smtp_password:
                 error_msg = "SMTP password not configured. Please set ZEPTOMAIL_SMTP_PASSWORD environment variable."
@@ -89,23 +123,16 @@ class EmailWorker:
             msg.set_content('This message contains HTML content. Please view in an HTML-capable email client.')
             msg.add_alternative(html_body, subtype='html')
 
-            logger.info(f"Sending email to: {to_email} via SMTP")
-
-            if self.smtp_port == 465:
-                context = ssl.create_default_context()
-                with smtplib.SMTP_SSL(self.smtp_server, self.smtp_port, context=context) as server:
-                    server.login(self.username, self.smtp_password)
-                    server.send_message(msg)
-            elif self.smtp_port == 587:
-                with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                    server.starttls()
-                    server.login(self.username, self.smtp_password)
-                    server.send_message(msg)
-            else:
+            if self.smtp_pool is None:
                 error_msg = "use 465 / 587 as port value"
                 logger.error(error_msg)
                 return False, error_msg
 
+            logger.info(f"Sending email to: {to_email} via SMTP")
+
+            with self.smtp_pool.connection() as server:
+                server.send_message(msg)
+
             return True, None
 
         except Exception as e:
@@ -113,9 +140,41 @@ class EmailWorker:
             logger.error(f"Error sending email to {to_email}: {error_msg}")
             return False, error_msg
 
+    def _threadsafe(self, callback, *args, **kwargs):
+        """Run a channel operation on the connection thread."""
+        self.connection.add_callback_threadsafe(functools.partial(callback, *args, **kwargs))
+
+    def _ack(self, delivery_tag):
+        self._threadsafe(self.channel.basic_ack, delivery_tag=delivery_tag)
+
+    def _route_failure(self, delivery_tag, properties, body, error, dead_letter=False):
+        """Republish the delivery to its next retry queue (or the DLQ), then ack the original."""
+
+        def publish_and_ack():
+            target = RabbitMQService.route_failure(
+                self.channel, self.queue_name, body, properties, error, dead_letter=dead_letter
+            )
+            self.channel.basic_ack(delivery_tag=delivery_tag)
+            logger.info(f"Message {properties.message_id} routed to {target}")
+
+        self._threadsafe(publish_and_ack)
+
     def process_message(self, ch, method, properties, body):
-        """Process a single message from the queue"""
+        """Hand a delivery to a sender thread"""
+        self.executor.submit(self._send_in_thread, method.delivery_tag, properties, body)
+
+    def _send_in_thread(self, delivery_tag, properties, body):
+        # Each sender thread has its own DB connection; drop it if it went stale
+        close_old_connections()
+        try:
+            self.handle_delivery(delivery_tag, properties, body)
+        finally:
+            close_old_connections()
+
+    def handle_delivery(self, delivery_tag, properties, body):
+        """Send one email"""
         message_id = properties.message_id
+        retry_count = RabbitMQService.get_retry_count(properties)
 
         try:
             # Parse message
@@ -134,65 +193,62 @@ class EmailWorker:
             # Validate required fields
             if not all([to_email, subject, html_body, from_email]):
                 logger.error(f"Message {message_id} missing required fields")
-                ch.basic_ack(delivery_tag=method.delivery_tag)
+                self._ack(delivery_tag)
                 return
 
-            # Check if already logged (duplicate message)
-            if CommunicationLog.objects.filter(message_id=message_id).exists():
+            # Retries were claimed on their first attempt
+            if not retry_count and not claim_message_id(message_id):
                 logger.warning(f"Message {message_id} already processed, skipping")
-                ch.basic_ack(delivery_tag=method.delivery_tag)
+                self._ack(delivery_tag)
                 return
 
-            # Create communication log
-            comm_log = CommunicationLog.objects.create(
+            # The log is upserted on message_id, so a retry updates the first attempt's row
+            comm_log = CommunicationLog(
                 message_type='email',
                 recipient=to_email,
                 status='queued',
                 message_id=message_id,
                 subject=subject,
                 metadata=metadata,
+                retry_count=retry_count,
+                error_log=(properties.headers or {}).get(LAST_ERROR_HEADER, ''),
+            )
+
+            success, error = self.send_email_smtp(
+                to_email, subject, html_body, from_email, from_name
             )
 
-            # Attempt to send email with retries
-            max_retries = 3
-            for attempt in range(max_retries):
-                success, error = self.send_email_smtp(
-                    to_email, subject, html_body, from_email, from_name
-                )
-
-                if success:
-                    # Update log
-                    comm_log.status = 'sent'
-                    comm_log.sent_at = timezone.now()
-                    comm_log.save()
-
-                    # Acknowledge message
-                    ch.basic_ack(delivery_tag=method.delivery_tag)
-                    logger.info(f"Message {message_id} processed successfully")
-                    return
-                else:
-                    comm_log.retry_count = attempt + 1
-                    comm_log.error_log = error
-
-                    if attempt < max_retries - 1:
-                        comm_log.status = 'retrying'
-                        comm_log.save()
-                        logger.warning(f"Retry {attempt + 1}/{max_retries} for message {message_id}")
-                        time.sleep(2 ** attempt)  # Exponential backoff
-                    else:
-                        comm_log.status = 'failed'
-                        comm_log.save()
-                        logger.error(f"Message {message_id} failed after {max_retries} attempts")
-
-            # Acknowledge even if failed (to avoid infinite retries)
-            ch.basic_ack(delivery_tag=method.delivery_tag)
+            if success:
+                comm_log.status = 'sent'
+                comm_log.sent_at = timezone.now()
+                self.log_buffer.record(comm_log)
+
+                # Acknowledge message
+                self._ack(delivery_tag)
+                logger.info(f"Message {message_id} processed successfully")
+                return
+
+            attempt = retry_count + 1
+            comm_log.retry_count = attempt
+            comm_log.error_log = error
+
+            if RabbitMQService.can_retry(properties):
+                comm_log.status = 'retrying'
+                logger.warning(f"Attempt {attempt}/{self.MAX_ATTEMPTS} failed for message {message_id}, "
+                               f"retrying in {RETRY_DELAYS_MS[retry_count]}ms")
+            else:
+                comm_log.status = 'failed'
+                logger.error(f"Message {message_id} failed after {self.MAX_ATTEMPTS} attempts")
+            self.log_buffer.record(comm_log)
+            self._route_failure(delivery_tag, properties, body, error)
 
         except json.JSONDecodeError as e:
             logger.error(f"Failed to parse message {message_id}: {str(e)}")
-            ch.basic_ack(delivery_tag=method.delivery_tag)
+            self._route_failure(delivery_tag, properties, body, f"Invalid JSON: {e}", dead_letter=True)
         except Exception as e:
+            # Delay the retry instead of requeueing, which would redeliver at once
             logger.error(f"Error processing message {message_id}: {str(e)}")
-            ch.basic_nack(delivery_tag=method.delivery_tag, requeue=True)
+            self._route_failure(delivery_tag, properties, body, str(e))
 
     def start_consuming(self):
         """Start consuming messages from the queue"""
@@ -203,6 +259,7 @@ class EmailWorker:
                 auto_ack=False
             )
 
+            self.log_buffer.start()
             logger.info("Email worker started. Waiting for messages...")
             self.channel.start_consuming()
 
@@ -221,9 +278,16 @@ class EmailWorker:
         if self.channel:
             self.channel.stop_consuming()
 
+        # Let in-flight sends finish, then deliver their acks before closing
+        self.executor.shutdown(wait=True)
+        self.log_buffer.stop()
         if self.connection and not self.connection.is_closed:
+            self.connection.process_data_events(time_limit=0)
             self.connection.close()
 
+        if self.smtp_pool:
+            self.smtp_pool.close_all()
+
         logger.info("Email worker stopped")
 
 
@@ -234,6 +298,14 @@ class Command(BaseCommand):
         super().__init__()
         self.worker = None
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=None,
+            help='Number of concurrent senders (default: EMAIL_WORKER_CONCURRENCY or 8)',
+        )
+
     def handle_shutdown(self, signum, frame):
         """Handle shutdown signals"""
         self.stdout.write(self.style.WARNING('\nShutdown signal received...'))
@@ -247,7 +319,7 @@ class Command(BaseCommand):
 
         self.stdout.write(self.style.SUCCESS('Starting email worker...'))
 
-        self.worker = EmailWorker()
+        self.worker = EmailWorker(concurrency=options['concurrency'])
 
         if not self.worker.connect_rabbitmq():
             self.stdout.write(self.style.ERROR('Failed to connect to RabbitMQ'))
@@ -0,0 +1,33 @@
+from communications.scrape_request_registry import ScrapeRequestRegistry
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = 'Show how many scrape requests were queued, suppressed as duplicates, and completed'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help='Reset the counters after printing them')
+        parser.add_argument(
+            '--account',
+            nargs=2,
+            metavar=('PLATFORM', 'HANDLE'),
+            help='Also show the in-flight registry entry for one account',
+        )
+
+    def handle(self, *args, **options):
+        metrics = ScrapeRequestRegistry.get_metrics()
+        total_requests = metrics['queued'] + metrics['suppressed']
+        suppressed_pct = (metrics['suppressed'] / total_requests * 100) if total_requests else 0.0
+
+        self.stdout.write(f"Queued:     {metrics['queued']}")
+        self.stdout.write(f"Suppressed: {metrics['suppressed']} ({suppressed_pct:.1f}% of requests)")
+        self.stdout.write(f"Completed:  {metrics['completed']}")
+
+        if options['account']:
+            platform, handle = options['account']
+            state = ScrapeRequestRegistry.get_state(platform, handle)
+            self.stdout.write(f"{platform}/{handle}: {state or 'no request in flight'}")
+
+        if options['reset']:
+            ScrapeRequestRegistry.reset_metrics()
+            self.stdout.write(self.style.SUCCESS('Counters reset'))
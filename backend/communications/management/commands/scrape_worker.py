@@ -15,9 +15,13 @@ class ScrapeQueueWorker:
     and triggers account refreshes via the scraping service.
     """
 
-    def __init__(self, batch_size: int = 25, idle_sleep: float = 2.0):
+    def __init__(self, batch_size: int = 25, idle_sleep: float = 2.0, mode: str = "poll",
+                 prefetch: int = 100, batch_wait: float = 0.5):
         self.batch_size = max(1, batch_size)
         self.idle_sleep = max(0.1, idle_sleep)
+        self.mode = mode
+        self.prefetch = max(self.batch_size, prefetch)
+        self.batch_wait = max(0.05, batch_wait)
         self.should_stop = False
         self.scraping_service = get_social_scraping_service()
 
@@ -25,6 +29,11 @@ class ScrapeQueueWorker:
         logger.info("Stopping scrape queue worker...")
         self.should_stop = True
 
+        # The stream consumer notices should_stop within batch_wait and closes the
+        # connection itself; closing it here would interrupt pika mid-read.
+        if self.mode == "stream":
+            return
+
         # RabbitMQ connection is managed by the scraping service singleton.
         if self.scraping_service and getattr(self.scraping_service, "rabbitmq", None):
             try:
@@ -33,6 +42,9 @@ class ScrapeQueueWorker:
                 logger.exception("Error while closing RabbitMQ connection during shutdown")
 
     def run(self, max_iterations: Optional[int] = None):
+        if self.mode == "stream":
+            return self.run_stream(max_iterations=max_iterations)
+
         logger.info(
             "Scrape queue worker started with batch_size=%s idle_sleep=%ss",
             self.batch_size,
@@ -60,6 +72,49 @@ class ScrapeQueueWorker:
 
         logger.info("Scrape queue worker stopped")
 
+    def run_stream(self, max_iterations: Optional[int] = None):
+        """
+        Consume scrape_out with basic_consume and process deliveries in micro-batches
+        of up to batch_size messages or batch_wait seconds.
+        """
+        logger.info(
+            "Scrape queue stream consumer started with prefetch=%s batch_size=%s batch_wait=%ss",
+            self.prefetch,
+            self.batch_size,
+            self.batch_wait,
+        )
+
+        rabbitmq = self.scraping_service.rabbitmq
+        queue_name = self.scraping_service.scrape_out_queue
+        iterations = 0
+
+        with self.scraping_service.create_fetcher() as fetcher:
+            while not self.should_stop and not (max_iterations and iterations >= max_iterations):
+                try:
+                    for batch in rabbitmq.consume_batches(
+                            queue_name,
+                            prefetch_count=self.prefetch,
+                            max_batch_size=self.batch_size,
+                            max_wait=self.batch_wait,
+                    ):
+                        if batch:
+                            processed = self.scraping_service.process_scrape_out_batch(batch, fetcher)
+                            logger.debug("Processed batch of %s deliveries (%s accounts updated)",
+                                         len(batch), processed)
+
+                        iterations += 1
+                        if self.should_stop or (max_iterations and iterations >= max_iterations):
+                            break
+                    rabbitmq.cancel_consumer()
+                except Exception:  # pragma: no cover - unexpected runtime failure
+                    # Closing the connection returns unacked deliveries to the queue
+                    logger.exception("Unhandled exception in scrape_out stream consumer, reconnecting")
+                    rabbitmq.close()
+                    time.sleep(self.idle_sleep)
+
+        rabbitmq.close()
+        logger.info("Scrape queue stream consumer stopped")
+
 
 class Command(BaseCommand):
     help = "Continuously process scrape_out messages and update influencer data"
@@ -77,6 +132,24 @@ class Command(BaseCommand):
             default=2.0,
             help="Seconds to sleep when no messages were processed (default: 2.0)",
         )
+        parser.add_argument(
+            "--mode",
+            choices=["poll", "stream"],
+            default="poll",
+            help="poll: basic_get loop; stream: basic_consume with prefetch and micro-batches (default: poll)",
+        )
+        parser.add_argument(
+            "--prefetch",
+            type=int,
+            default=100,
+            help="Unacknowledged deliveries allowed in stream mode (default: 100)",
+        )
+        parser.add_argument(
+            "--batch-wait",
+            type=float,
+            default=0.5,
+            help="Seconds to wait for a stream micro-batch to fill before processing it (default: 0.5)",
+        )
         parser.add_argument(
             "--max-iterations",
             type=int,
@@ -88,6 +161,9 @@ class Command(BaseCommand):
         worker = ScrapeQueueWorker(
             batch_size=options["batch_size"],
             idle_sleep=options["idle_sleep"],
+            mode=options["mode"],
+            prefetch=options["prefetch"],
+            batch_wait=options["batch_wait"],
         )
 
         max_iterations = options.get("max_iterations") or None
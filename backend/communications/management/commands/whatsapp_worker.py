@@ -3,11 +3,12 @@ import logging
 import os
 import signal
 import sys
-import time
 
 import pika
 from brands.models import Brand
+from communications.log_buffer import CommunicationLogBuffer, claim_message_id
 from communications.models import CommunicationLog
+from communications.rabbitmq_service import LAST_ERROR_HEADER, RETRY_DELAYS_MS, RabbitMQService
 from communications.utils import check_whatsapp_rate_limit, check_brand_credits, deduct_brand_credits
 from communications.whatsapp_cloud_client import get_whatsapp_cloud_client
 from communications.msg91_whatsapp_client import get_msg91_whatsapp_client, MSG91_TEMPLATES
@@ -19,7 +20,17 @@ logger = logging.getLogger(__name__)
 
 
 class WhatsAppWorker:
-    """Background worker to process WhatsApp messages from RabbitMQ"""
+    """
+    Background worker to process WhatsApp messages from RabbitMQ.
+
+    Each delivery gets one send attempt. A failed one is republished to the
+    queue's delayed retry queues (see RabbitMQService.route_failure) and ends
+    up in its DLQ once those are used up, so the worker never sleeps through
+    a provider outage. Logs are written in batches through a
+    CommunicationLogBuffer.
+    """
+
+    MAX_ATTEMPTS = 1 + len(RETRY_DELAYS_MS)
 
     def __init__(self):
         self.connection = None
@@ -35,6 +46,10 @@ class WhatsAppWorker:
 
         self.whatsapp_client = get_whatsapp_cloud_client()
         self.msg91_client = get_msg91_whatsapp_client()
+        self.log_buffer = CommunicationLogBuffer(
+            max_size=int(os.environ.get('COMMUNICATION_LOG_BATCH_SIZE', '100')),
+            max_delay_ms=int(os.environ.get('COMMUNICATION_LOG_FLUSH_MS', '500')),
+        )
 
         logger.info("WhatsApp Cloud API and MSG91 clients initialized")
 
@@ -59,6 +74,7 @@ class WhatsAppWorker:
                 durable=True,
                 arguments={'x-message-ttl': 86400000}  # 24 hours
             )
+            RabbitMQService.declare_retry_topology(self.channel, self.queue_name)
 
             self.channel.basic_qos(prefetch_count=1)
 
@@ -156,9 +172,18 @@ class WhatsAppWorker:
             logger.error(error_msg)
             return False, error_msg
 
+    def _route_failure(self, ch, method, properties, body, error, dead_letter=False):
+        """Republish the delivery to its next retry queue (or the DLQ), then ack the original."""
+        target = RabbitMQService.route_failure(
+            ch, self.queue_name, body, properties, error, dead_letter=dead_letter
+        )
+        ch.basic_ack(delivery_tag=method.delivery_tag)
+        logger.info(f"Message {properties.message_id} routed to {target}")
+
     def process_message(self, ch, method, properties, body):
         """Process a single message from the queue"""
         message_id = properties.message_id
+        retry_count = RabbitMQService.get_retry_count(properties)
 
         try:
             # Parse message
@@ -188,12 +213,27 @@ class WhatsAppWorker:
                 ch.basic_ack(delivery_tag=method.delivery_tag)
                 return
 
-            # Check if already logged (duplicate message)
-            if CommunicationLog.objects.filter(message_id=message_id).exists():
+            # Check for a duplicate delivery; retries were claimed on their first attempt
+            if not retry_count and not claim_message_id(message_id):
                 logger.warning(f"Message {message_id} already processed, skipping")
                 ch.basic_ack(delivery_tag=method.delivery_tag)
                 return
 
+            # The log is upserted on message_id, so a retry updates the first attempt's row
+            comm_log = CommunicationLog(
+                message_type='whatsapp',
+                recipient=f"{country_code}{phone_number}",
+                status='queued',
+                message_id=message_id,
+                phone_number=phone_number,
+                country_code=country_code,
+                sender_type=metadata.get('sender_type'),
+                sender_id=metadata.get('sender_id'),
+                metadata=metadata,
+                retry_count=retry_count,
+                error_log=(properties.headers or {}).get(LAST_ERROR_HEADER, ''),
+            )
+
             # Get user for rate limiting (if applicable)
             user = None
             user_id = metadata.get('user_id')
@@ -205,23 +245,15 @@ class WhatsAppWorker:
 
             # Check rate limits only for password reset messages (forgot_password).
             # Phone verification is handled separately and should not be blocked here.
-            if user and whatsapp_type == 'forgot_password':
+            # A retry was already counted on its first attempt.
+            if user and whatsapp_type == 'forgot_password' and not retry_count:
                 allowed, error_msg, time_until_next = check_whatsapp_rate_limit(user, whatsapp_type)
                 if not allowed:
                     logger.warning(f"Rate limit exceeded for message {message_id}: {error_msg}")
-                    # Create log entry for rate limit failure
-                    CommunicationLog.objects.create(
-                        message_type='whatsapp',
-                        recipient=f"{country_code}{phone_number}",
-                        status='failed',
-                        message_id=message_id,
-                        phone_number=phone_number,
-                        country_code=country_code,
-                        sender_type=metadata.get('sender_type'),
-                        sender_id=metadata.get('sender_id'),
-                        metadata=metadata,
-                        error_log=f"Rate limit exceeded: {error_msg}",
-                    )
+                    # Log the rate limit failure
+                    comm_log.status = 'failed'
+                    comm_log.error_log = f"Rate limit exceeded: {error_msg}"
+                    self.log_buffer.record(comm_log)
                     ch.basic_ack(delivery_tag=method.delivery_tag)
                     return
 
@@ -239,19 +271,10 @@ class WhatsAppWorker:
                                 f"Brand {sender_id} has insufficient credits for message {message_id}. "
                                 f"Remaining: {credits_remaining}"
                             )
-                            # Create log entry for insufficient credits
-                            CommunicationLog.objects.create(
-                                message_type='whatsapp',
-                                recipient=f"{country_code}{phone_number}",
-                                status='failed',
-                                message_id=message_id,
-                                phone_number=phone_number,
-                                country_code=country_code,
-                                sender_type=sender_type,
-                                sender_id=sender_id,
-                                metadata=metadata,
-                                error_log=f"Insufficient credits. Remaining: {credits_remaining}",
-                            )
+                            # Log the insufficient credits
+                            comm_log.status = 'failed'
+                            comm_log.error_log = f"Insufficient credits. Remaining: {credits_remaining}"
+                            self.log_buffer.record(comm_log)
                             ch.basic_ack(delivery_tag=method.delivery_tag)
                             return
                     except Brand.DoesNotExist:
@@ -259,88 +282,76 @@ class WhatsAppWorker:
                         ch.basic_ack(delivery_tag=method.delivery_tag)
                         return
 
-            # Create communication log
-            comm_log = CommunicationLog.objects.create(
-                message_type='whatsapp',
-                recipient=f"{country_code}{phone_number}",
-                status='queued',
-                message_id=message_id,
-                phone_number=phone_number,
-                country_code=country_code,
-                sender_type=metadata.get('sender_type'),
-                sender_id=metadata.get('sender_id'),
-                metadata=metadata,
-            )
-
-            # Attempt to send WhatsApp message with retries
-            max_retries = 3
             full_phone = f"{country_code}{phone_number}"
-            
+
             # Determine if this template should be sent via MSG91
             use_msg91 = template_name in MSG91_TEMPLATES
-            
-            for attempt in range(max_retries):
-                if use_msg91:
-                    # Route to MSG91 for specific templates
-                    success, error = self._send_via_msg91(
-                        template_name=template_name,
-                        full_phone=full_phone,
-                        template_components=template_components,
-                        metadata=metadata,
-                    )
-                else:
-                    # Use Meta Cloud API for all other templates
-                    success, error = self.whatsapp_client.send_template_message(
-                        full_phone=full_phone,
-                        template_name=template_name,
-                        language_code=language_code,
-                        components=template_components,
-                    )
-
-                if success:
-                    # Deduct credits if required
-                    if requires_credits:
-                        sender_type = metadata.get('sender_type')
-                        sender_id = metadata.get('sender_id')
-                        if sender_type == 'brand' and sender_id:
-                            try:
-                                brand = Brand.objects.get(id=sender_id)
-                                deduct_brand_credits(brand, credits=1)
-                            except Brand.DoesNotExist:
-                                logger.error(f"Brand {sender_id} not found when deducting credits")
-
-                    # Update log
-                    comm_log.status = 'sent'
-                    comm_log.sent_at = timezone.now()
-                    comm_log.save()
-
-                    # Acknowledge message
-                    ch.basic_ack(delivery_tag=method.delivery_tag)
-                    logger.info(f"Message {message_id} processed successfully")
-                    return
-                else:
-                    comm_log.retry_count = attempt + 1
-                    comm_log.error_log = error
-
-                    if attempt < max_retries - 1:
-                        comm_log.status = 'retrying'
-                        comm_log.save()
-                        logger.warning(f"Retry {attempt + 1}/{max_retries} for message {message_id}")
-                        time.sleep(2 ** attempt)  # Exponential backoff
-                    else:
-                        comm_log.status = 'failed'
-                        comm_log.save()
-                        logger.error(f"Message {message_id} failed after {max_retries} attempts")
-
-            # Acknowledge even if failed (to avoid infinite retries)
-            ch.basic_ack(delivery_tag=method.delivery_tag)
+
+            if use_msg91:
+                # Route to MSG91 for specific templates
+                success, error = self._send_via_msg91(
+                    template_name=template_name,
+                    full_phone=full_phone,
+                    template_components=template_components,
+                    metadata=metadata,
+                )
+            else:
+                # Use Meta Cloud API for all other templates
+                success, error = self.whatsapp_client.send_template_message(
+                    full_phone=full_phone,
+                    template_name=template_name,
+                    language_code=language_code,
+                    components=template_components,
+                )
+
+            if success:
+                comm_log.status = 'sent'
+                comm_log.sent_at = timezone.now()
+
+                # Deduct credits if required. The provider already accepted the
+                # message, so a failure here must not send it through a retry again.
+                if requires_credits:
+                    sender_type = metadata.get('sender_type')
+                    sender_id = metadata.get('sender_id')
+                    if sender_type == 'brand' and sender_id:
+                        try:
+                            brand = Brand.objects.get(id=sender_id)
+                            deduct_brand_credits(brand, credits=1)
+                        except Brand.DoesNotExist:
+                            logger.error(f"Brand {sender_id} not found when deducting credits")
+                        except Exception as e:
+                            logger.error(f"Failed to deduct credits from brand {sender_id} "
+                                         f"for sent message {message_id}: {str(e)}")
+                            comm_log.error_log = f"Credit deduction failed: {e}"
+
+                self.log_buffer.record(comm_log)
+
+                # Acknowledge message
+                ch.basic_ack(delivery_tag=method.delivery_tag)
+                logger.info(f"Message {message_id} processed successfully")
+                return
+
+            attempt = retry_count + 1
+            comm_log.retry_count = attempt
+            comm_log.error_log = error
+
+            if RabbitMQService.can_retry(properties):
+                comm_log.status = 'retrying'
+                logger.warning(f"Attempt {attempt}/{self.MAX_ATTEMPTS} failed for message {message_id}, "
+                               f"retrying in {RETRY_DELAYS_MS[retry_count]}ms")
+            else:
+                comm_log.status = 'failed'
+                logger.error(f"Message {message_id} failed after {self.MAX_ATTEMPTS} attempts")
+            self.log_buffer.record(comm_log)
+            self._route_failure(ch, method, properties, body, error)
 
         except json.JSONDecodeError as e:
             logger.error(f"Failed to parse message {message_id}: {str(e)}")
-            ch.basic_ack(delivery_tag=method.delivery_tag)
+            self._route_failure(ch, method, properties, body, f"Invalid JSON: {e}", dead_letter=True)
         except Exception as e:
+            # Delay the retry instead of requeueing, which would redeliver at once
             logger.error(f"Error processing message {message_id}: {str(e)}")
-            ch.basic_nack(delivery_tag=method.delivery_tag, requeue=True)
+            self._route_failure(ch, method, properties, body, str(e))
 
     def start_consuming(self):
         """Start consuming messages from the queue"""
@@ -351,6 +362,7 @@ class WhatsAppWorker:
                 auto_ack=False
             )
 
+            self.log_buffer.start()
             logger.info("WhatsApp worker started. Waiting for messages...")
             self.channel.start_consuming()
 
@@ -369,6 +381,8 @@ class WhatsAppWorker:
         if self.channel:
             self.channel.stop_consuming()
 
+        self.log_buffer.stop()
+
         if self.connection and not self.connection.is_closed:
             self.connection.close()
 
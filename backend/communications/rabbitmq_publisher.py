@@ -0,0 +1,245 @@
+"""
+Thread-safe, pooled RabbitMQ publisher.
+
+RabbitMQService keeps one BlockingConnection that was shared by every thread
+of a gunicorn or Celery worker, re-checked the connection and re-declared the
+queue on each publish, and sent one message per call. pika connections are
+not thread-safe, so RabbitMQPublisher lends each publishing thread a pooled
+channel with its own connection instead:
+
+    publisher = get_rabbitmq_publisher()
+    message_id = publisher.publish('email_notifications', message_data)
+    message_ids = publisher.publish_batch('email_notifications', [data, ...])
+
+    # Publishes made on this thread inside the block go out per queue in
+    # one publish_batch when it exits; `results` then holds their ids
+    with publisher.batched() as results:
+        email_service.send_campaign_notification(...)
+    published = [message_id for message_id in results.get('email_notifications', []) if message_id]
+
+Queues are declared once per process. With RABBITMQ_PUBLISHER_CONFIRMS the
+pooled channels are in confirm mode and a message only counts as published
+once the broker acked it.
+"""
+
+import logging
+import os
+import queue
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Tuple
+
+import pika
+from django.conf import settings
+
+from .rabbitmq_service import RabbitMQService
+
+logger = logging.getLogger(__name__)
+
+_local = threading.local()
+
+
+class RabbitMQPublisher:
+    """Publishes messages over a pool of channels, each with its own connection."""
+
+    def __init__(self, size: Optional[int] = None, confirms: Optional[bool] = None):
+        self.size = size or getattr(settings, 'RABBITMQ_PUBLISHER_POOL_SIZE', 4)
+        self.confirms = getattr(settings, 'RABBITMQ_PUBLISHER_CONFIRMS', False) if confirms is None else confirms
+        self._reset()
+
+    def _reset(self) -> None:
+        self._idle = queue.LifoQueue()
+        # Bounds open channels (idle + lent out) to `size`
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._declared_queues = set()
+        self._declare_lock = threading.Lock()
+        self._pid = os.getpid()
+
+    def _open(self) -> RabbitMQService:
+        channel = RabbitMQService()
+        if not channel.connect():
+            raise pika.exceptions.AMQPConnectionError("Cannot publish: Connection failed")
+        if self.confirms:
+            channel.channel.confirm_delivery()
+        return channel
+
+    def _checkout(self) -> RabbitMQService:
+        """An idle channel that is still open, or a new one."""
+        while True:
+            try:
+                channel = self._idle.get_nowait()
+            except queue.Empty:
+                return self._open()
+            try:
+                # Services heartbeats the connection missed while idle
+                channel.connection.process_data_events(time_limit=0)
+            except Exception:
+                channel.close()
+                continue
+            if channel.is_connected():
+                return channel
+            channel.close()
+
+    @contextmanager
+    def _channel(self):
+        """Lend a pooled channel; a channel that raised is closed instead of returned."""
+        if os.getpid() != self._pid:
+            # Forked (gunicorn/Celery prefork): the parent's sockets aren't ours to use
+            self._reset()
+        self._slots.acquire()
+        try:
+            channel = self._checkout()
+            try:
+                yield channel
+            except Exception:
+                channel.close()
+                raise
+            self._idle.put(channel)
+        finally:
+            self._slots.release()
+
+    def _ensure_queue(self, channel: RabbitMQService, queue_name: str) -> None:
+        if queue_name in self._declared_queues:
+            return
+        with self._declare_lock:
+            if queue_name not in self._declared_queues:
+                if not channel.declare_queue(queue_name):
+                    raise pika.exceptions.AMQPChannelError(f"Queue '{queue_name}' declaration failed")
+                self._declared_queues.add(queue_name)
+
+    @staticmethod
+    def _prepare(message_data: Dict[str, Any], priority: int) -> Tuple[str, str, int]:
+        message_id, body = RabbitMQService.build_message(message_data)
+        return message_id, body, priority
+
+    def _publish_all(self, channel: RabbitMQService, queue_name: str, prepared: List[Tuple[str, str, int]],
+                     message_ids: List[Optional[str]]) -> None:
+        """Publish the prepared messages whose message_ids entry is still None."""
+        self._ensure_queue(channel, queue_name)
+        for index, (message_id, body, priority) in enumerate(prepared):
+            if message_ids[index] is not None:
+                continue
+            try:
+                channel.channel.basic_publish(
+                    exchange='',
+                    routing_key=queue_name,
+                    body=body,
+                    properties=pika.BasicProperties(
+                        delivery_mode=2,  # Make message persistent
+                        priority=priority,
+                        content_type='application/json',
+                        message_id=message_id,
+                    ),
+                    mandatory=self.confirms,
+                )
+            except (pika.exceptions.UnroutableError, pika.exceptions.NackError) as e:
+                logger.error(f"Broker rejected message {message_id} for queue '{queue_name}': {str(e)}")
+                message_ids[index] = ''
+                continue
+            message_ids[index] = message_id
+
+    def _send(self, queue_name: str, prepared: List[Tuple[str, str, int]]) -> List[Optional[str]]:
+        message_ids: List[Optional[str]] = [None] * len(prepared)
+        for attempt in range(2):
+            try:
+                with self._channel() as channel:
+                    self._publish_all(channel, queue_name, prepared, message_ids)
+                break
+            except (pika.exceptions.AMQPConnectionError, pika.exceptions.AMQPChannelError) as e:
+                logger.error(f"Connection error while publishing to '{queue_name}' (attempt {attempt + 1}): {str(e)}")
+                with self._declare_lock:
+                    self._declared_queues.discard(queue_name)
+            except Exception as e:
+                logger.error(f"Failed to publish to '{queue_name}': {str(e)}")
+                break
+
+        message_ids = [message_id or None for message_id in message_ids]
+        published = sum(1 for message_id in message_ids if message_id)
+        logger.info(f"Published {published}/{len(message_ids)} messages to queue '{queue_name}'")
+        return message_ids
+
+    def publish_batch(self, queue_name: str, messages: List[Dict[str, Any]], priority: int = 5) -> List[Optional[str]]:
+        """
+        Publish messages to a queue over one pooled channel.
+
+        A message's own integer 'priority' key wins over `priority`. Returns the
+        message ids in order, None for messages that could not be published.
+        A dropped connection is retried once on a fresh channel.
+        """
+        prepared = []
+        for message_data in messages:
+            message_priority = message_data.get('priority')
+            prepared.append(self._prepare(message_data, message_priority if isinstance(message_priority, int) else priority))
+        return self._send(queue_name, prepared)
+
+    def publish(self, queue_name: str, message_data: Dict[str, Any], priority: int = 5) -> Optional[str]:
+        """
+        Publish one message.
+
+        Inside batched() the message is only buffered: the returned id is the one
+        it will be sent with, and whether it was sent is in the block's results.
+        """
+        prepared = self._prepare(message_data, priority)
+        pending = getattr(_local, 'pending', None)
+        if pending is not None:
+            pending[queue_name].append(prepared)
+            return prepared[0]
+        return self._send(queue_name, [prepared])[0]
+
+    @contextmanager
+    def batched(self):
+        """
+        Buffer this thread's publishes and send them per queue when the block exits.
+
+        Yields a dict that, after the block, maps each queue to the ids of its
+        buffered messages in publish order, None for those that could not be
+        published. Nothing is sent when the block raises. Nested blocks share
+        the outermost block's buffer and results.
+        """
+        if getattr(_local, 'pending', None) is not None:
+            # Nested: the outermost block flushes
+            yield _local.results
+            return
+        pending = _local.pending = defaultdict(list)
+        results = _local.results = {}
+        try:
+            yield results
+        except BaseException:
+            discarded = sum(len(prepared) for prepared in pending.values())
+            logger.warning(f"Discarding {discarded} batched messages after an error in the batch")
+            raise
+        finally:
+            _local.pending = _local.results = None
+
+        for queue_name, prepared in pending.items():
+            results[queue_name] = self._send(queue_name, prepared)
+            failed = results[queue_name].count(None)
+            if failed:
+                logger.error(f"{failed}/{len(prepared)} batched messages to queue '{queue_name}' were not published")
+
+    def close(self) -> None:
+        """Close every idle channel."""
+        while True:
+            try:
+                channel = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            channel.close()
+
+
+# Singleton instance for reuse
+_rabbitmq_publisher = None
+_rabbitmq_publisher_lock = threading.Lock()
+
+
+def get_rabbitmq_publisher() -> RabbitMQPublisher:
+    """
+    Get or create a singleton instance of RabbitMQPublisher
+    """
+    global _rabbitmq_publisher
+    if _rabbitmq_publisher is None:
+        with _rabbitmq_publisher_lock:
+            if _rabbitmq_publisher is None:
+                _rabbitmq_publisher = RabbitMQPublisher()
+    return _rabbitmq_publisher
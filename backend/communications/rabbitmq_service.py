@@ -1,13 +1,22 @@
 import json
 import logging
 import ssl
-from typing import Dict, Any, Optional
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 import pika
 from django.conf import settings
 
 logger = logging.getLogger(__name__)
 
+# Delayed retries: a failed delivery is republished to <queue>.retry.<delay>,
+# which holds it for its TTL and then dead-letters it back to <queue>. The
+# retry count travels in a header; once RETRY_DELAYS_MS are used up, or when
+# the message can't be processed at all, it goes to <queue>.dlq instead.
+RETRY_DELAYS_MS = (1000, 10000, 60000)
+RETRY_COUNT_HEADER = 'x-retry-count'
+LAST_ERROR_HEADER = 'x-last-error'
+
 
 class RabbitMQService:
     """
@@ -23,6 +32,8 @@ class RabbitMQService:
         self.password = getattr(settings, 'RABBITMQ_PASSWORD', 'guest')
         self.vhost = getattr(settings, 'RABBITMQ_VHOST', '/')
         self.use_ssl = getattr(settings, 'RABBITMQ_USE_SSL', False)
+        # Queues already declared on the current connection
+        self._declared_queues = set()
 
     def connect(self) -> bool:
         """
@@ -62,6 +73,7 @@ class RabbitMQService:
 
             self.connection = pika.BlockingConnection(parameters)
             self.channel = self.connection.channel()
+            self._declared_queues = set()
 
             logger.info(f"Successfully connected to RabbitMQ at {self.host}:{self.port}")
             return True
@@ -113,6 +125,9 @@ class RabbitMQService:
                 logger.error("Cannot declare queue: Connection failed")
                 return False
 
+            if queue_name in self._declared_queues:
+                return True
+
             self.channel.queue_declare(
                 queue=queue_name,
                 durable=durable,
@@ -120,6 +135,7 @@ class RabbitMQService:
                     'x-message-ttl': 86400000,  # 24 hours in milliseconds
                 }
             )
+            self._declared_queues.add(queue_name)
             logger.debug(f"Queue '{queue_name}' declared successfully")
             return True
 
@@ -129,6 +145,87 @@ class RabbitMQService:
             self.close()
             return False
 
+    @staticmethod
+    def retry_queue_name(queue_name: str, delay_ms: int) -> str:
+        return f"{queue_name}.retry.{delay_ms // 1000}s"
+
+    @staticmethod
+    def dead_letter_queue_name(queue_name: str) -> str:
+        return f"{queue_name}.dlq"
+
+    @staticmethod
+    def declare_retry_topology(channel, queue_name: str) -> None:
+        """Declare the retry queues and DLQ of `queue_name` on a consumer's channel."""
+        for delay_ms in RETRY_DELAYS_MS:
+            channel.queue_declare(
+                queue=RabbitMQService.retry_queue_name(queue_name, delay_ms),
+                durable=True,
+                arguments={
+                    'x-message-ttl': delay_ms,
+                    'x-dead-letter-exchange': '',
+                    'x-dead-letter-routing-key': queue_name,
+                }
+            )
+        channel.queue_declare(queue=RabbitMQService.dead_letter_queue_name(queue_name), durable=True)
+
+    @staticmethod
+    def get_retry_count(properties) -> int:
+        return int((properties.headers or {}).get(RETRY_COUNT_HEADER, 0))
+
+    @staticmethod
+    def can_retry(properties) -> bool:
+        """Whether a failed delivery still has a retry delay left."""
+        return RabbitMQService.get_retry_count(properties) < len(RETRY_DELAYS_MS)
+
+    @staticmethod
+    def route_failure(channel, queue_name: str, body: bytes, properties, error: str,
+                      dead_letter: bool = False) -> str:
+        """
+        Republish a failed delivery to its next retry queue, or to the DLQ when
+        it is out of retries or `dead_letter` is set. Returns the target queue;
+        the caller acks the original delivery afterwards.
+        """
+        retry_count = RabbitMQService.get_retry_count(properties)
+        if dead_letter or retry_count >= len(RETRY_DELAYS_MS):
+            target = RabbitMQService.dead_letter_queue_name(queue_name)
+        else:
+            target = RabbitMQService.retry_queue_name(queue_name, RETRY_DELAYS_MS[retry_count])
+            retry_count += 1
+
+        headers = dict(properties.headers or {})
+        headers[RETRY_COUNT_HEADER] = retry_count
+        headers[LAST_ERROR_HEADER] = str(error)[:500]
+        channel.basic_publish(
+            exchange='',
+            routing_key=target,
+            body=body,
+            properties=pika.BasicProperties(
+                delivery_mode=2,
+                content_type=properties.content_type,
+                message_id=properties.message_id,
+                headers=headers,
+            )
+        )
+        return target
+
+    @staticmethod
+    def build_message(message_data: Dict[str, Any]) -> Tuple[str, str]:
+        """
+        Stamp message_data with a timestamp and message_id (kept if already
+        set) and return (message_id, JSON body).
+        """
+        # Add timestamp if not present
+        if 'timestamp' not in message_data:
+            from django.utils import timezone
+            message_data['timestamp'] = timezone.now().isoformat()
+
+        # Generate message ID
+        if not message_data.get('message_id'):
+            import uuid
+            message_data['message_id'] = str(uuid.uuid4())
+
+        return message_data['message_id'], json.dumps(message_data)
+
     def publish_message(
             self,
             queue_name: str,
@@ -138,6 +235,9 @@ class RabbitMQService:
         """
         Publish a message to the specified queue
         
+        Publishes go through the pooled, thread-safe RabbitMQPublisher rather
+        than this instance's connection, which callers share across threads.
+
         Args:
             queue_name: Name of the queue
             message_data: Dictionary containing message data
@@ -146,59 +246,8 @@ class RabbitMQService:
         Returns:
             message_id if successful, None otherwise
         """
-        try:
-            # Ensure connection is active
-            if not self.ensure_connection():
-                logger.error("Cannot publish message: Connection failed")
-                return None
-
-            # Ensure queue exists
-            if not self.declare_queue(queue_name):
-                logger.error("Cannot publish message: Queue declaration failed")
-                return None
-
-            # Add timestamp if not present
-            if 'timestamp' not in message_data:
-                from django.utils import timezone
-                message_data['timestamp'] = timezone.now().isoformat()
-
-            # Generate message ID
-            import uuid
-            message_id = str(uuid.uuid4())
-            message_data['message_id'] = message_id
-
-            # Convert to JSON
-            message_body = json.dumps(message_data)
-
-            # Publish message
-            self.channel.basic_publish(
-                exchange='',
-                routing_key=queue_name,
-                body=message_body,
-                properties=pika.BasicProperties(
-                    delivery_mode=2,  # Make message persistent
-                    priority=priority,
-                    content_type='application/json',
-                    message_id=message_id,
-                )
-            )
-
-            logger.info(f"Message {message_id} published to queue '{queue_name}'")
-            return message_id
-
-        except pika.exceptions.AMQPChannelError as e:
-            logger.error(f"Channel error while publishing to '{queue_name}': {str(e)}")
-            # Close and reconnect for next attempt
-            self.close()
-            return None
-        except pika.exceptions.AMQPConnectionError as e:
-            logger.error(f"Connection error while publishing to '{queue_name}': {str(e)}")
-            # Close and reconnect for next attempt
-            self.close()
-            return None
-        except Exception as e:
-            logger.error(f"Failed to publish message to '{queue_name}': {str(e)}")
-            return None
+        from .rabbitmq_publisher import get_rabbitmq_publisher
+        return get_rabbitmq_publisher().publish(queue_name, message_data, priority=priority)
 
     def consume_next_message(
             self,
@@ -227,17 +276,63 @@ class RabbitMQService:
             self.close()
             return None
 
-    def ack_message(self, delivery_tag: Any) -> None:
+    def consume_batches(
+            self,
+            queue_name: str,
+            prefetch_count: int = 100,
+            max_batch_size: int = 50,
+            max_wait: float = 0.5,
+    ) -> Iterator[List[Tuple[Any, Any, bytes]]]:
+        """
+        Push-based consumer that groups deliveries into micro-batches.
+
+        Yields lists of (method_frame, header_frame, body) once `max_batch_size`
+        deliveries arrived or `max_wait` seconds passed since the first one. Yields
+        an empty list when the queue is idle so callers can check for shutdown.
+        Deliveries must be acked/nacked by the caller; at most `prefetch_count`
+        are unacknowledged at a time. Call `cancel_consumer` after breaking out.
+        """
+        if not self.ensure_connection():
+            raise pika.exceptions.AMQPConnectionError("Cannot consume: Connection failed")
+        if not self.declare_queue(queue_name):
+            raise pika.exceptions.AMQPChannelError(f"Cannot consume: Queue '{queue_name}' declaration failed")
+
+        self.channel.basic_qos(prefetch_count=prefetch_count)
+
+        batch: List[Tuple[Any, Any, bytes]] = []
+        deadline = None
+        for method_frame, header_frame, body in self.channel.consume(queue_name, inactivity_timeout=max_wait):
+            if method_frame is not None:
+                batch.append((method_frame, header_frame, body))
+                if deadline is None:
+                    deadline = time.monotonic() + max_wait
+
+            if batch and (len(batch) >= max_batch_size or time.monotonic() >= deadline):
+                yield batch
+                batch = []
+                deadline = None
+            elif method_frame is None and not batch:
+                yield []
+
+    def cancel_consumer(self) -> None:
+        """Cancel the consume_batches consumer; unacked deliveries are requeued."""
+        try:
+            if self.channel and self.channel.is_open:
+                self.channel.cancel()
+        except Exception as e:
+            logger.error(f"Failed to cancel consumer: {str(e)}")
+
+    def ack_message(self, delivery_tag: Any, multiple: bool = False) -> None:
         try:
             if self.channel and self.channel.is_open:
-                self.channel.basic_ack(delivery_tag)
+                self.channel.basic_ack(delivery_tag, multiple=multiple)
         except Exception as e:
             logger.error(f"Failed to ack message: {str(e)}")
 
-    def nack_message(self, delivery_tag: Any, requeue: bool = False) -> None:
+    def nack_message(self, delivery_tag: Any, requeue: bool = False, multiple: bool = False) -> None:
         try:
             if self.channel and self.channel.is_open:
-                self.channel.basic_nack(delivery_tag, requeue=requeue)
+                self.channel.basic_nack(delivery_tag, multiple=multiple, requeue=requeue)
         except Exception as e:
             logger.error(f"Failed to nack message: {str(e)}")
 
@@ -259,6 +354,7 @@ class RabbitMQService:
             # Force cleanup
             self.channel = None
             self.connection = None
+        self._declared_queues = set()
 
 
 # Singleton instance for reuse
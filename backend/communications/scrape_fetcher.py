@@ -0,0 +1,175 @@
+"""
+Concurrent scraper fetching.
+
+Runs BasePlatformScraper.fetch for many accounts on a thread pool that shares
+one pooled requests.Session (see pooled_session), with:
+
+- a per-host concurrency limit (the scraper API is a single host today),
+- a token-bucket rate limit across all workers,
+- retries with exponential backoff and full jitter for timeouts, connection
+  errors, 429 and 5xx responses.
+
+Workers only do HTTP; persisting results stays on the calling thread, which
+owns the database connection.
+"""
+
+import logging
+import random
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Callable, Iterable, Iterator, List, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """Thread-safe token bucket; `acquire` blocks until a token is available."""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = float(rate)
+        self.capacity = float(capacity or max(1.0, rate))
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def pooled_session(max_connections: int) -> requests.Session:
+    """
+    A requests.Session whose connection pool holds `max_connections` per host.
+
+    Size it to the fetch worker count when the session is created, so threads
+    don't queue on connections; fetchers share the session and never remount it.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(1, max_connections))
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+@dataclass
+class FetchResult:
+    account: object
+    profile_data: Optional[object] = None
+    error: Optional[Exception] = None
+    attempts: int = 0
+
+
+class ConcurrentScrapeFetcher:
+    """
+    Bounded-concurrency fetch engine for scraper profiles.
+
+    Usage:
+        with ConcurrentScrapeFetcher(service.get_scraper) as fetcher:
+            for result in fetcher.fetch_many(accounts):
+                ...
+    """
+
+    def __init__(
+            self,
+            get_scraper: Callable,
+            timeout: int = 15,
+            max_workers: int = 16,
+            per_host_limit: int = 8,
+            rate_per_second: float = 20.0,
+            max_retries: int = 3,
+            backoff_base: float = 0.5,
+            backoff_max: float = 10.0,
+    ):
+        self.get_scraper = get_scraper
+        self.timeout = timeout
+        self.max_workers = max(1, max_workers)
+        self.per_host_limit = max(1, per_host_limit)
+        self.max_retries = max(0, max_retries)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.bucket = TokenBucket(rate_per_second) if rate_per_second and rate_per_second > 0 else None
+
+        self._host_limits = defaultdict(lambda: threading.BoundedSemaphore(self.per_host_limit))
+        self._host_limits_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='scrape-fetch')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+
+    def submit(self, accounts: Iterable) -> List[Future]:
+        """Start fetching the accounts; each future resolves to a FetchResult."""
+        return [self._executor.submit(self._fetch, account) for account in accounts]
+
+    def fetch_many(self, accounts: Iterable) -> Iterator[FetchResult]:
+        """Fetch every account concurrently, yielding results as they complete."""
+        for future in as_completed(self.submit(accounts)):
+            yield future.result()
+
+    def _host_limit(self, host: str) -> threading.BoundedSemaphore:
+        with self._host_limits_lock:
+            return self._host_limits[host]
+
+    def _backoff(self, attempt: int) -> float:
+        # Full jitter: uniform in [0, min(cap, base * 2^attempt)]
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    @staticmethod
+    def _is_retryable(exc: Exception) -> bool:
+        if isinstance(exc, (requests.Timeout, requests.ConnectionError)):
+            return True
+        if isinstance(exc, requests.HTTPError) and exc.response is not None:
+            return exc.response.status_code in RETRY_STATUS_CODES
+        return False
+
+    def _fetch(self, account) -> FetchResult:
+        scraper = self.get_scraper(account.platform)
+        host = urlparse(scraper.build_url(account.handle)).netloc
+        result = FetchResult(account=account)
+
+        for attempt in range(self.max_retries + 1):
+            result.attempts = attempt + 1
+            if self.bucket:
+                self.bucket.acquire()
+            try:
+                with self._host_limit(host):
+                    result.profile_data = scraper.fetch(account.handle, timeout=self.timeout)
+                result.error = None
+                return result
+            except Exception as exc:
+                result.error = exc
+                if attempt >= self.max_retries or not self._is_retryable(exc):
+                    return result
+                delay = self._backoff(attempt)
+                logger.debug(
+                    "Retrying %s/%s in %.2fs after %s (attempt %s)",
+                    account.platform,
+                    account.handle,
+                    delay,
+                    exc,
+                    attempt + 1,
+                )
+                time.sleep(delay)
+        return result
@@ -0,0 +1,121 @@
+"""
+In-flight registry for scrape requests.
+
+One cache entry per account (`scrape_request:<platform>:<handle>`) records
+whether a scrape is pending (queued, no completion yet) or recently completed.
+While an entry exists, new requests for the account are coalesced into the
+in-flight one instead of being published again. Entries expire on their own,
+so a lost request or completion only delays the next scrape by the TTL.
+
+Counters for queued, suppressed and completed requests are kept alongside.
+"""
+
+import logging
+from typing import Dict, Optional
+
+from common.cache_utils import CacheManager
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+STATE_PENDING = 'pending'
+STATE_COMPLETED = 'completed'
+
+METRIC_NAMES = ('queued', 'suppressed', 'completed')
+
+
+class ScrapeRequestRegistry:
+    """Coalesces duplicate scrape requests per account."""
+
+    @staticmethod
+    def _timeout(name: str, default: int) -> int:
+        return getattr(settings, 'CACHE_TIMEOUTS', {}).get(name, default)
+
+    @staticmethod
+    def get_key(platform: str, handle: str) -> str:
+        return CacheManager.get_cache_key('scrape_request', (platform or '').lower(), (handle or '').lower())
+
+    @staticmethod
+    def _incr(metric: str) -> None:
+        key = CacheManager.get_cache_key('scrape_request_metrics', metric)
+        try:
+            cache.incr(key)
+        except ValueError:
+            if not cache.add(key, 1, timeout=None):
+                cache.incr(key)
+
+    @staticmethod
+    def get_state(platform: str, handle: str) -> Optional[Dict]:
+        """The account's registry entry ({'state', 'message_id', 'at'}) or None."""
+        return cache.get(ScrapeRequestRegistry.get_key(platform, handle))
+
+    @staticmethod
+    def acquire(platform: str, handle: str) -> Optional[Dict]:
+        """
+        Mark a request for the account as pending.
+
+        Returns None when the caller should publish the request, or the existing
+        entry when a request is already in flight or just completed (the new
+        request is suppressed).
+        """
+        key = ScrapeRequestRegistry.get_key(platform, handle)
+        entry = {'state': STATE_PENDING, 'message_id': None, 'at': timezone.now().isoformat()}
+        if cache.add(key, entry, ScrapeRequestRegistry._timeout('SCRAPE_REQUEST_PENDING', 3600)):
+            return None
+
+        existing = cache.get(key)
+        if existing is None:
+            # Expired between add() and get(); take it over
+            cache.set(key, entry, ScrapeRequestRegistry._timeout('SCRAPE_REQUEST_PENDING', 3600))
+            return None
+
+        ScrapeRequestRegistry._incr('suppressed')
+        return existing
+
+    @staticmethod
+    def mark_pending(platform: str, handle: str, message_id: str) -> None:
+        """Record the published message for a pending request."""
+        entry = {'state': STATE_PENDING, 'message_id': message_id, 'at': timezone.now().isoformat()}
+        cache.set(
+            ScrapeRequestRegistry.get_key(platform, handle),
+            entry,
+            ScrapeRequestRegistry._timeout('SCRAPE_REQUEST_PENDING', 3600),
+        )
+        ScrapeRequestRegistry._incr('queued')
+
+    @staticmethod
+    def mark_completed(platform: str, handle: str) -> None:
+        """
+        Record a scrape completion. Requests within the completed TTL are still
+        suppressed, since the data was just refreshed.
+        """
+        entry = {'state': STATE_COMPLETED, 'message_id': None, 'at': timezone.now().isoformat()}
+        cache.set(
+            ScrapeRequestRegistry.get_key(platform, handle),
+            entry,
+            ScrapeRequestRegistry._timeout('SCRAPE_REQUEST_COMPLETED', 900),
+        )
+        ScrapeRequestRegistry._incr('completed')
+
+    @staticmethod
+    def release(platform: str, handle: str) -> None:
+        """Forget the account's entry, e.g. when publishing the request failed."""
+        cache.delete(ScrapeRequestRegistry.get_key(platform, handle))
+
+    @staticmethod
+    def get_metrics() -> Dict[str, int]:
+        """Running totals of queued, suppressed and completed scrape requests."""
+        keys = {
+            metric: CacheManager.get_cache_key('scrape_request_metrics', metric)
+            for metric in METRIC_NAMES
+        }
+        values = cache.get_many(list(keys.values()))
+        return {metric: int(values.get(key) or 0) for metric, key in keys.items()}
+
+    @staticmethod
+    def reset_metrics() -> None:
+        cache.delete_many([
+            CacheManager.get_cache_key('scrape_request_metrics', metric) for metric in METRIC_NAMES
+        ])
@@ -0,0 +1,136 @@
+"""
+Pooled SMTP sessions.
+
+Opening an SMTP session costs a TCP connect, STARTTLS and AUTH - several round
+trips that were paid again for every email. SMTPConnectionPool keeps up to
+`size` authenticated sessions open and lends them to sending threads:
+
+    pool = SMTPConnectionPool(host, port, username, password, size=8)
+    with pool.connection() as server:
+        server.send_message(msg)
+
+A session idle for longer than `health_check_after` seconds is checked with
+NOOP before it is lent out, sessions older than `max_age` are recycled, and a
+session that raised while lent out is closed so the next send opens a new one.
+"""
+
+import logging
+import queue
+import smtplib
+import ssl
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _Session:
+    server: smtplib.SMTP
+    created_at: float
+    last_used: float
+
+
+class SMTPConnectionPool:
+    """Thread-safe pool of long-lived, authenticated SMTP sessions."""
+
+    def __init__(self, host: str, port: int, username: str, password: str, size: int = 4,
+                 timeout: float = 30, max_age: float = 300, health_check_after: float = 30):
+        if port not in (465, 587):
+            raise ValueError("use 465 / 587 as port value")
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.size = size
+        self.timeout = timeout
+        self.max_age = max_age
+        self.health_check_after = health_check_after
+
+        self._idle = queue.LifoQueue()
+        self._closed = False
+        # Bounds open sessions (idle + lent out) to `size`
+        self._slots = threading.BoundedSemaphore(size)
+
+    def _open(self) -> _Session:
+        if self.port == 465:
+            server = smtplib.SMTP_SSL(self.host, self.port, context=ssl.create_default_context(),
+                                      timeout=self.timeout)
+        else:
+            server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+            server.starttls()
+        try:
+            server.login(self.username, self.password)
+        except Exception:
+            self._close(server)
+            raise
+        logger.info(f"Opened SMTP session to {self.host}:{self.port}")
+        now = time.monotonic()
+        return _Session(server=server, created_at=now, last_used=now)
+
+    @staticmethod
+    def _close(server: smtplib.SMTP) -> None:
+        try:
+            server.quit()
+        except Exception:
+            try:
+                server.close()
+            except Exception:
+                pass
+
+    @staticmethod
+    def _is_alive(server: smtplib.SMTP) -> bool:
+        try:
+            return server.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+
+    def _checkout(self) -> _Session:
+        """An idle session that is still usable, or a new one."""
+        while True:
+            try:
+                session = self._idle.get_nowait()
+            except queue.Empty:
+                return self._open()
+
+            now = time.monotonic()
+            if now - session.created_at > self.max_age:
+                self._close(session.server)
+                continue
+            if now - session.last_used > self.health_check_after and not self._is_alive(session.server):
+                logger.info(f"Discarding dead SMTP session to {self.host}:{self.port}")
+                self._close(session.server)
+                continue
+            return session
+
+    @contextmanager
+    def connection(self):
+        """Lend an authenticated session; blocks while all `size` sessions are in use."""
+        self._slots.acquire()
+        try:
+            session = self._checkout()
+            try:
+                yield session.server
+            except Exception:
+                # The session may be mid-transaction or disconnected; don't reuse it
+                self._close(session.server)
+                raise
+            if self._closed:
+                self._close(session.server)
+            else:
+                session.last_used = time.monotonic()
+                self._idle.put(session)
+        finally:
+            self._slots.release()
+
+    def close_all(self) -> None:
+        """Close every idle session; sessions lent out are closed when they are returned."""
+        self._closed = True
+        while True:
+            try:
+                session = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self._close(session.server)
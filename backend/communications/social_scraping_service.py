@@ -2,24 +2,38 @@ import json
 import logging
 import os
 import uuid
+from collections import defaultdict
 from dataclasses import dataclass
 from datetime import datetime
 from decimal import Decimal
-from typing import Any, Dict, List, Optional
+from itertools import islice
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 from urllib.parse import urlparse
 
 import requests
 from communications.rabbitmq_service import get_rabbitmq_service
+from communications.scrape_fetcher import ConcurrentScrapeFetcher, FetchResult, pooled_session
+from communications.scrape_request_registry import ScrapeRequestRegistry
 from django.conf import settings
 from django.core.files.base import ContentFile
 from django.db import transaction, models
+from django.db.models import Q
 from django.utils import timezone
 from django.utils.dateparse import parse_datetime
 from influencers.models import InfluencerProfile, SocialMediaAccount, SocialMediaPost
-from influencers.services.engagement import calculate_engagement_metrics
+from influencers.services.engagement import calculate_engagement_metrics, calculate_posts_engagement_metrics
+from influencers.services.search_index_service import InfluencerSearchIndexService
 
 logger = logging.getLogger(__name__)
 
+# Keep at most this many posts per influencer profile to keep data manageable
+MAX_POSTS_PER_INFLUENCER = 50
+
+POST_UPSERT_FIELDS = [
+    'post_url', 'post_type', 'caption', 'hashtags', 'mentions', 'media_urls', 'posted_at',
+    'likes_count', 'comments_count', 'views_count', 'shares_count', 'last_fetched_at',
+]
+
 
 class ScraperError(Exception):
     """Raised when scraper data cannot be fetched or parsed."""
@@ -103,9 +117,13 @@ class SocialScrapingService:
         self.scrape_in_queue = getattr(settings, 'RABBITMQ_SCRAPE_IN_QUEUE', 'scrape_in')
         self.scrape_out_queue = getattr(settings, 'RABBITMQ_SCRAPE_OUT_QUEUE', 'scrape_out')
         self.requeue_threshold_days = getattr(settings, 'SCRAPER_REFRESH_DAYS', 7)
+        self.fetch_concurrency = getattr(settings, 'SCRAPER_FETCH_CONCURRENCY', 16)
+        self.fetch_per_host_limit = getattr(settings, 'SCRAPER_FETCH_PER_HOST_LIMIT', 8)
+        self.fetch_rate_limit = getattr(settings, 'SCRAPER_FETCH_RATE_PER_SECOND', 20.0)
+        self.fetch_max_retries = getattr(settings, 'SCRAPER_FETCH_MAX_RETRIES', 3)
 
         self.rabbitmq = get_rabbitmq_service()
-        self.session = requests.Session()
+        self.session = pooled_session(self.fetch_concurrency)
 
         self.scrapers: Dict[str, BasePlatformScraper] = {
             'instagram': InstagramScraper(self.base_url, self.session),
@@ -162,7 +180,7 @@ class SocialScrapingService:
                 account.handle,
                 exc,
             )
-            self.queue_scrape_request(account)
+            self.queue_scrape_request(account, force=True)
             return None
         except requests.HTTPError as exc:
             # Handle other HTTP errors (non-404)
@@ -210,11 +228,29 @@ class SocialScrapingService:
 
         return self.sync_account(account, force=force)
 
-    def queue_scrape_request(self, account: SocialMediaAccount, priority: str = 'high', max_attempts: int = 5) -> \
-            Optional[str]:
+    def queue_scrape_request(self, account: SocialMediaAccount, priority: str = 'high', max_attempts: int = 5,
+                             force: bool = False) -> Optional[str]:
         """
         Publish a scrape request for the given account to the RabbitMQ queue.
+
+        Requests for an account that already has one in flight (or just completed)
+        are coalesced: nothing is published and the in-flight message id is returned,
+        or None when the in-flight request has no id (it is still being published or
+        has completed). `force` publishes regardless, e.g. to retry after a scraper error.
+        Returns None when publishing failed; ScrapeRequestRegistry.get_state() tells the
+        two apart, since a failed publish leaves no registry entry.
         """
+        if not force:
+            existing = ScrapeRequestRegistry.acquire(account.platform, account.handle)
+            if existing is not None:
+                logger.debug(
+                    "Coalesced scrape request for %s/%s into %s request",
+                    account.platform,
+                    account.handle,
+                    existing['state'],
+                )
+                return existing.get('message_id')
+
         message = {
             "request_id": str(uuid.uuid4()),
             "username": account.handle,
@@ -224,11 +260,116 @@ class SocialScrapingService:
             "max_attempts": max_attempts,
         }
         logger.debug("Queuing scrape request: %s", message)
-        return self.rabbitmq.publish_message(
+        message_id = self.rabbitmq.publish_message(
             queue_name=self.scrape_in_queue,
             message_data=message,
             priority=8 if priority == 'high' else 5,
         )
+        if message_id:
+            ScrapeRequestRegistry.mark_pending(account.platform, account.handle, message_id)
+        else:
+            ScrapeRequestRegistry.release(account.platform, account.handle)
+        return message_id
+
+    def create_fetcher(self) -> ConcurrentScrapeFetcher:
+        """Concurrent fetcher over this service's scrapers (and so its session), configured from settings."""
+        return ConcurrentScrapeFetcher(
+            self.get_scraper,
+            timeout=self.timeout,
+            max_workers=self.fetch_concurrency,
+            per_host_limit=self.fetch_per_host_limit,
+            rate_per_second=self.fetch_rate_limit,
+            max_retries=self.fetch_max_retries,
+        )
+
+    def sync_accounts(self, accounts: Iterable[SocialMediaAccount], batch_size: int = 200,
+                      queue_requests: bool = True) -> Dict[str, int]:
+        """
+        Fetch and persist many accounts, fetching concurrently and saving each batch
+        in one transaction. Like sync_account(force=True), but for bulk syncs.
+
+        `accounts` is consumed lazily, so a queryset `.iterator()` keeps memory flat.
+        When `queue_requests` is set, a background scrape is queued for every account too.
+        """
+        counts = {'total': 0, 'queued': 0, 'synced': 0, 'skipped': 0, 'errors': 0}
+        accounts = iter(accounts)
+        suppressed_before = ScrapeRequestRegistry.get_metrics()['suppressed']
+
+        with self.create_fetcher() as fetcher:
+            # Fetch batch N+1 while batch N is being persisted
+            in_flight = []
+            while True:
+                batch = list(islice(accounts, batch_size))
+                counts['total'] += len(batch)
+
+                if queue_requests:
+                    for account in batch:
+                        try:
+                            if self.queue_scrape_request(account, priority='high'):
+                                counts['queued'] += 1
+                            elif ScrapeRequestRegistry.get_state(account.platform, account.handle):
+                                # Coalesced into a request that has no message id; counted as suppressed
+                                pass
+                            else:
+                                counts['errors'] += 1
+                                logger.warning("Failed to queue scrape request for %s (%s)",
+                                               account.handle, account.platform)
+                        except Exception:
+                            counts['errors'] += 1
+                            logger.exception("Error queueing sync for %s", account.handle)
+
+                fetchable = [account for account in batch if self.get_scraper(account.platform)]
+                counts['skipped'] += len(batch) - len(fetchable)
+                submitted = fetcher.submit(fetchable)
+
+                if in_flight:
+                    with transaction.atomic():
+                        for future in in_flight:
+                            counts[self._persist_fetch_result(future.result())] += 1
+                    logger.info("Bulk sync progress: %s", counts)
+
+                if not batch:
+                    break
+                in_flight = submitted
+
+        # Part of 'queued': requests coalesced into one already in flight
+        counts['suppressed'] = ScrapeRequestRegistry.get_metrics()['suppressed'] - suppressed_before
+        return counts
+
+    def _persist_fetch_result(self, result: FetchResult) -> str:
+        """Save a fetched profile, handling errors like sync_account. Returns the counts key."""
+        account = result.account
+        exc = result.error
+        if exc is None:
+            try:
+                self._save_account_data(account, result.profile_data)
+                return 'synced'
+            except Exception:
+                logger.exception("Error saving %s data for %s", account.platform, account.handle)
+                return 'errors'
+
+        if isinstance(exc, ScraperError):
+            error_msg = str(exc).lower()
+            if 'not found' in error_msg or '404' in error_msg:
+                logger.warning("Account %s/%s not found on scraper API. Skipping sync.",
+                               account.platform, account.handle)
+            else:
+                logger.warning("Scraper error for %s/%s: %s. Requeuing scrape request.",
+                               account.platform, account.handle, exc)
+                try:
+                    self.queue_scrape_request(account, force=True)
+                except Exception:
+                    logger.exception("Error requeueing scrape request for %s", account.handle)
+            return 'skipped'
+
+        logger.error(
+            "Error fetching %s data for %s after %s attempt(s): %s",
+            account.platform,
+            account.handle,
+            result.attempts,
+            exc,
+        )
+        return 'errors'
 
     @transaction.atomic
     def _save_account_data(self, account: SocialMediaAccount, profile_data: PlatformProfileData) -> None:
@@ -290,37 +431,52 @@ class SocialScrapingService:
             if 'is_verified' in user_data:
                 account.platform_verified = bool(user_data.get('is_verified', False))
 
-        # Update averages using engagement data when available
-        account.average_likes = engagement_data.get('average_likes', account.average_likes)
-        account.average_comments = engagement_data.get('average_comments', account.average_comments)
+        # Averages come from the scraped posts below; shares are only in the engagement payload
         account.average_shares = engagement_data.get('average_shares', account.average_shares)
-        account.average_video_views = engagement_data.get('average_views', account.average_video_views)
-        account.average_video_likes = engagement_data.get('average_video_likes', account.average_video_likes)
-        account.average_video_comments = engagement_data.get('average_video_comments', account.average_video_comments)
+
+        posts, latest_posted_at = self._build_posts(account, profile_data.posts)
+        if latest_posted_at and (not account.last_posted_at or latest_posted_at > account.last_posted_at):
+            account.last_posted_at = latest_posted_at
+
+        if posts:
+            metrics_summary = calculate_posts_engagement_metrics(posts.values(), account.followers_count)
+        else:
+            # Nothing scraped; score the posts we already have
+            metrics_summary = calculate_engagement_metrics(account)
+        self._apply_engagement_metrics(account, metrics_summary)
 
         account.last_synced_at = timezone.now()
+        account.updated_at = account.last_synced_at
         update_fields = [
             'followers_count',
             'following_count',
             'posts_count',
+            'engagement_rate',
             'average_likes',
             'average_comments',
             'average_shares',
             'average_video_views',
             'average_video_likes',
             'average_video_comments',
+            'engagement_snapshot',
             'display_name',
             'bio',
             'external_url',
             'is_private',
             'profile_image_url',
             'platform_verified',
+            'last_posted_at',
             'last_synced_at',
             'updated_at',
         ]
         if profile_data.username:
             update_fields.insert(0, 'handle')
-        account.save(update_fields=update_fields)
+        # Single UPDATE; post_save receivers are skipped, the search refresh is scheduled below
+        SocialMediaAccount.objects.filter(pk=account.pk).update(
+            **{field: getattr(account, field) for field in update_fields}
+        )
+
+        self._save_posts(account, posts, prune_stale=bool(profile_data.posts))
 
         # If scraper provides a profile image and the user has no profile image yet,
         # hydrate the user's profile image from the social platform (one-time, non-destructive).
@@ -334,78 +490,44 @@ class SocialScrapingService:
                 account.handle,
             )
 
-        latest_posted_at = self._save_posts(account, profile_data.posts)
-        if latest_posted_at and (not account.last_posted_at or latest_posted_at > account.last_posted_at):
-            account.last_posted_at = latest_posted_at
-            account.save(update_fields=['last_posted_at', 'updated_at'])
+        self._update_influencer_summary(account.influencer)
 
-        metrics_summary = calculate_engagement_metrics(account)
+        # Re-rank the influencer in search once the scrape is committed
+        InfluencerSearchIndexService.schedule_refresh(account.influencer_id)
 
-        # Safely update engagement_rate and related metrics from calculated summary
-        if metrics_summary:
-            # Clamp engagement rate to the valid range for the DB field (0-100)
-            try:
-                overall_rate = round(float(metrics_summary.get('overall_engagement_rate', 0)), 2)
-            except Exception:
-                overall_rate = 0.0
+    @staticmethod
+    def _apply_engagement_metrics(account: SocialMediaAccount, metrics_summary: Dict[str, Any]) -> None:
+        """Set engagement rate, averages and snapshot on the account from a metrics summary."""
+        # Clamp engagement rate to the valid range for the DB field (0-100)
+        try:
+            overall_rate = round(float(metrics_summary.get('overall_engagement_rate', 0)), 2)
+        except Exception:
+            overall_rate = 0.0
 
-            if overall_rate < 0:
-                overall_rate = 0.0
-            if overall_rate > 100:
-                logger.warning(
-                    "Clamping engagement_rate for account %s/%s from %s to 100.00",
-                    account.platform,
-                    account.handle,
-                    overall_rate,
-                )
-                overall_rate = 100.00
-
-            account.engagement_rate = Decimal(str(overall_rate))
-
-            account.average_likes = int(round(
-                metrics_summary.get('average_post_likes', account.average_likes)
-            ))
-            account.average_comments = int(round(
-                metrics_summary.get('average_post_comments', account.average_comments)
-            ))
-            account.average_video_likes = int(round(
-                metrics_summary.get('average_video_likes', account.average_video_likes)
-            ))
-            account.average_video_comments = int(round(
-                metrics_summary.get('average_video_comments', account.average_video_comments)
-            ))
-            account.average_video_views = int(round(
-                metrics_summary.get('average_video_views', account.average_video_views)
-            ))
-            account.engagement_snapshot = metrics_summary
-
-        # Persist updated engagement metrics (if any)
-        account.average_likes = int(round(metrics_summary.get('average_post_likes',
-                                                              account.average_likes))) if metrics_summary else account.average_likes
-        account.average_comments = int(round(metrics_summary.get('average_post_comments',
-                                                                 account.average_comments))) if metrics_summary else account.average_comments
-        account.average_video_likes = int(round(metrics_summary.get('average_video_likes',
-                                                                    account.average_video_likes))) if metrics_summary else account.average_video_likes
-        account.average_video_comments = int(round(metrics_summary.get('average_video_comments',
-                                                                       account.average_video_comments))) if metrics_summary else account.average_video_comments
-        account.average_video_views = int(round(metrics_summary.get('average_video_views',
-                                                                    account.average_video_views))) if metrics_summary else account.average_video_views
+        if overall_rate < 0:
+            overall_rate = 0.0
+        if overall_rate > 100:
+            logger.warning(
+                "Clamping engagement_rate for account %s/%s from %s to 100.00",
+                account.platform,
+                account.handle,
+                overall_rate,
+            )
+            overall_rate = 100.00
+
+        account.engagement_rate = Decimal(str(overall_rate))
+        account.average_likes = int(round(metrics_summary.get('average_post_likes', account.average_likes)))
+        account.average_comments = int(round(metrics_summary.get('average_post_comments', account.average_comments)))
+        account.average_video_likes = int(round(
+            metrics_summary.get('average_video_likes', account.average_video_likes)
+        ))
+        account.average_video_comments = int(round(
+            metrics_summary.get('average_video_comments', account.average_video_comments)
+        ))
+        account.average_video_views = int(round(
+            metrics_summary.get('average_video_views', account.average_video_views)
+        ))
         account.engagement_snapshot = metrics_summary
-        account.save(update_fields=[
-            'engagement_rate',
-            'average_likes',
-            'average_comments',
-            'average_video_likes',
-            'average_video_comments',
-            'average_video_views',
-            'engagement_snapshot',
-            'updated_at',
-        ])
-
-        self._update_influencer_summary(account.influencer)
-
-        # Enforce a maximum number of posts per influencer profile to keep data manageable
-        self._enforce_post_limit(account.influencer, max_posts=50)
 
     def _maybe_set_user_profile_image_from_social(self, account: SocialMediaAccount) -> None:
         """
@@ -493,10 +615,8 @@ class SocialScrapingService:
                 break
 
             method_frame, header_frame, body = message
-            try:
-                payload = json.loads(body.decode('utf-8') if isinstance(body, (bytes, bytearray)) else body)
-            except json.JSONDecodeError:
-                logger.error("Invalid JSON payload received from scrape_out: %s", body)
+            payload = self._decode_completion(body)
+            if payload is None:
                 self.rabbitmq.ack_message(method_frame.delivery_tag)
                 continue
 
@@ -529,23 +649,113 @@ class SocialScrapingService:
 
         return processed
 
-    def _handle_scrape_completion(self, payload: Dict[str, Any]) -> bool:
+    def process_scrape_out_batch(self, deliveries: List[Tuple[Any, Any, bytes]],
+                                 fetcher: ConcurrentScrapeFetcher) -> int:
         """
-        Process a single completion payload. Returns True when an account was updated.
+        Handle a micro-batch of scrape_out deliveries (see RabbitMQService.consume_batches).
+
+        Completions for the same account are coalesced into one sync, fetches run
+        concurrently and all results are saved in one transaction. Failed syncs are
+        requeued individually; everything else is acknowledged with a single
+        multiple=True ack. Returns the number of accounts updated.
         """
+        tags_by_account: Dict[Tuple[str, str], List[int]] = defaultdict(list)
+        ack_tags: List[int] = []
+        requeue_tags: List[int] = []
+
+        for method_frame, _header_frame, body in deliveries:
+            payload = self._decode_completion(body)
+            if payload is None:
+                # Malformed messages can never succeed; ack them rather than fail the batch
+                ack_tags.append(method_frame.delivery_tag)
+                continue
+
+            account_key = self._completion_account_key(payload)
+            if account_key:
+                ScrapeRequestRegistry.mark_completed(*account_key)
+                tags_by_account[account_key].append(method_frame.delivery_tag)
+            else:
+                ack_tags.append(method_frame.delivery_tag)
+
+        accounts = []
+        if tags_by_account:
+            lookup = Q()
+            for platform, username in tags_by_account:
+                lookup |= Q(platform=platform, handle__iexact=username)
+            found = {
+                (account.platform, account.handle.lower()): account
+                for account in SocialMediaAccount.objects.filter(lookup).select_related('influencer__user_profile')
+            }
+            for account_key, tags in tags_by_account.items():
+                account = found.get(account_key)
+                if account and self.get_scraper(account.platform):
+                    accounts.append(account)
+                else:
+                    logger.warning("No syncable social account found for %s/%s", *account_key)
+                    ack_tags.extend(tags)
+
+        processed = 0
+        results = list(fetcher.fetch_many(accounts))
+        with transaction.atomic():
+            for result in results:
+                account = result.account
+                tags = tags_by_account[(account.platform, account.handle.lower())]
+                outcome = self._persist_fetch_result(result)
+                if outcome == 'errors':
+                    requeue_tags.extend(tags)
+                    continue
+                if outcome == 'synced':
+                    processed += 1
+                ack_tags.extend(tags)
+
+        # Nack first: a multiple=True ack covers every outstanding tag up to the given one
+        for tag in requeue_tags:
+            self.rabbitmq.nack_message(tag, requeue=True)
+        if ack_tags:
+            self.rabbitmq.ack_message(max(ack_tags), multiple=True)
+
+        return processed
+
+    @staticmethod
+    def _decode_completion(body) -> Optional[Dict[str, Any]]:
+        """The JSON object in a scrape_out message body, or None when it is malformed."""
+        try:
+            payload = json.loads(body.decode('utf-8') if isinstance(body, (bytes, bytearray)) else body)
+        except (UnicodeDecodeError, json.JSONDecodeError, TypeError):
+            logger.error("Invalid JSON payload received from scrape_out: %r", body)
+            return None
+        if not isinstance(payload, dict):
+            logger.error("Unexpected payload received from scrape_out: %r", payload)
+            return None
+        return payload
+
+    @staticmethod
+    def _completion_account_key(payload: Dict[str, Any]) -> Optional[Tuple[str, str]]:
+        """(platform, lowercased username) for an engagement_update event, else None."""
         event_type = payload.get('event')
         if event_type != 'engagement_update':
             logger.debug("Ignoring non-engagement event: %s", event_type)
-            return False
+            return None
 
         platform = payload.get('platform')
         username = payload.get('username')
         if not platform or not username:
             logger.warning("Incomplete scrape completion payload: %s", payload)
+            return None
+        return platform.lower(), username.lower()
+
+    def _handle_scrape_completion(self, payload: Dict[str, Any]) -> bool:
+        """
+        Process a single completion payload. Returns True when an account was updated.
+        """
+        account_key = self._completion_account_key(payload)
+        if not account_key:
             return False
 
+        platform, username = account_key
+        ScrapeRequestRegistry.mark_completed(platform, username)
         account = SocialMediaAccount.objects.filter(
-            platform=platform.lower(),
+            platform=platform,
             handle__iexact=username,
         ).select_related('influencer').first()
 
@@ -560,55 +770,34 @@ class SocialScrapingService:
         """
         Update aggregate influencer metrics based on active social accounts.
         """
-        active_accounts = influencer.social_accounts.filter(is_active=True)
-        if not active_accounts.exists():
-            return
-
-        avg_engagement = active_accounts.aggregate(avg=models.Avg('engagement_rate'))['avg'] or 0
-        avg_video_views = active_accounts.aggregate(avg=models.Avg('average_video_views'))['avg'] or 0
-
-        influencer.average_interaction = f"{avg_engagement:.2f}%"
-        influencer.average_views = f"{int(round(avg_video_views))}"
-        influencer.save(update_fields=['average_interaction', 'average_views', 'updated_at'])
-
-    def _enforce_post_limit(self, influencer: InfluencerProfile, max_posts: int = 50) -> None:
-        """
-        Ensure we only keep up to `max_posts` SocialMediaPost records per influencer profile.
-        Older posts (by posted_at/last_fetched_at) are deleted when the limit is exceeded.
-        """
-        from influencers.models import SocialMediaPost  # local import to avoid circulars in some contexts
-
-        queryset = SocialMediaPost.objects.filter(
-            account__influencer=influencer
-        ).order_by('-posted_at', '-last_fetched_at')
-
-        total = queryset.count()
-        if total <= max_posts:
-            return
-
-        keep_ids = list(queryset.values_list('id', flat=True)[:max_posts])
-        if not keep_ids:
+        summary = influencer.social_accounts.filter(is_active=True).aggregate(
+            count=models.Count('id'),
+            avg_engagement=models.Avg('engagement_rate'),
+            avg_video_views=models.Avg('average_video_views'),
+        )
+        if not summary['count']:
             return
 
-        SocialMediaPost.objects.filter(
-            account__influencer=influencer
-        ).exclude(id__in=keep_ids).delete()
+        influencer.average_interaction = f"{summary['avg_engagement'] or 0:.2f}%"
+        influencer.average_views = f"{int(round(summary['avg_video_views'] or 0))}"
+        influencer.updated_at = timezone.now()
+        # Neither field is searchable, so skipping post_save (and its cache invalidation) is fine
+        InfluencerProfile.objects.filter(pk=influencer.pk).update(
+            average_interaction=influencer.average_interaction,
+            average_views=influencer.average_views,
+            updated_at=influencer.updated_at,
+        )
 
-    def _save_posts(self, account: SocialMediaAccount, posts: List[Dict[str, Any]]) -> Optional[datetime]:
+    def _build_posts(self, account: SocialMediaAccount,
+                     posts: List[Dict[str, Any]]) -> Tuple[Dict[str, SocialMediaPost], Optional[datetime]]:
         """
-        Upsert posts for the given account. Returns the most recent posted_at timestamp.
+        Build unsaved posts for the given account from the scraper payload, keyed by
+        platform post id. Returns them with the most recent posted_at timestamp.
         """
-        if not posts:
-            return None
-
         latest_posted_at: Optional[datetime] = None
-        existing_post_ids = set(
-            SocialMediaPost.objects.filter(account=account, platform=account.platform).values_list(
-                'platform_post_id', flat=True
-            )
-        )
+        posts_by_id: Dict[str, SocialMediaPost] = {}
 
-        for post_payload in posts:
+        for post_payload in posts or []:
             post_id = post_payload.get('post_id') or post_payload.get('id')
             if not post_id:
                 logger.debug("Skipping post without identifier for account %s", account.id)
@@ -623,40 +812,52 @@ class SocialScrapingService:
             if posted_at and timezone.is_naive(posted_at):
                 posted_at = timezone.make_aware(posted_at)
 
-            defaults = {
-                'post_url': post_payload.get('post_url') or '',
-                'post_type': post_payload.get('post_type') or '',
-                'caption': post_payload.get('content') or '',
-                'hashtags': post_payload.get('hashtags') or [],
-                'mentions': post_payload.get('mentions') or [],
-                'media_urls': post_payload.get('media_urls') or [],
-                'posted_at': posted_at,
-                'likes_count': metrics.get('likes_count', 0),
-                'comments_count': metrics.get('comments_count', 0),
-                'views_count': metrics.get('views_count', 0),
-                'shares_count': metrics.get('shares_count', 0),
-            }
-
-            SocialMediaPost.objects.update_or_create(
+            # A repeated post keeps its last occurrence; one upsert can't touch a row twice
+            posts_by_id[str(post_id)] = SocialMediaPost(
                 account=account,
+                platform=account.platform,
                 platform_post_id=post_id,
-                defaults=defaults,
+                post_url=post_payload.get('post_url') or '',
+                post_type=post_payload.get('post_type') or '',
+                caption=post_payload.get('content') or '',
+                hashtags=post_payload.get('hashtags') or [],
+                mentions=post_payload.get('mentions') or [],
+                media_urls=post_payload.get('media_urls') or [],
+                posted_at=posted_at,
+                likes_count=metrics.get('likes_count', 0),
+                comments_count=metrics.get('comments_count', 0),
+                views_count=metrics.get('views_count', 0),
+                shares_count=metrics.get('shares_count', 0),
             )
 
             if posted_at and (not latest_posted_at or posted_at > latest_posted_at):
                 latest_posted_at = posted_at
 
-        # Clean up posts that are no longer returned by the scraper to keep the dataset manageable
-        current_post_ids = {post.get('post_id') or post.get('id') for post in posts if
-                            post.get('post_id') or post.get('id')}
-        stale_posts = [post_id for post_id in existing_post_ids if post_id not in current_post_ids]
-        if stale_posts:
-            SocialMediaPost.objects.filter(
-                account=account,
-                platform_post_id__in=stale_posts
-            ).delete()
+        return posts_by_id, latest_posted_at
+
+    def _save_posts(self, account: SocialMediaAccount, posts_by_id: Dict[str, SocialMediaPost],
+                    prune_stale: bool = True) -> None:
+        """
+        Upsert posts for the given account in one statement, then delete, in one more,
+        posts the scraper no longer returns (when `prune_stale`) and posts beyond the
+        influencer's MAX_POSTS_PER_INFLUENCER (oldest by posted_at/last_fetched_at).
+        """
+        if posts_by_id:
+            SocialMediaPost.objects.bulk_create(
+                posts_by_id.values(),
+                update_conflicts=True,
+                unique_fields=['account', 'platform_post_id'],
+                update_fields=POST_UPSERT_FIELDS,
+            )
 
-        return latest_posted_at
+        influencer_accounts = SocialMediaAccount.objects.filter(influencer_id=account.influencer_id).values('id')
+        influencer_posts = SocialMediaPost.objects.filter(account_id__in=influencer_accounts)
+        keep_ids = influencer_posts.order_by('-posted_at', '-last_fetched_at').values('id')[:MAX_POSTS_PER_INFLUENCER]
+        prune = ~Q(id__in=keep_ids)
+        if prune_stale:
+            # Clean up posts that are no longer returned by the scraper
+            prune |= Q(account=account) & ~Q(platform_post_id__in=list(posts_by_id))
+        influencer_posts.filter(prune).delete()
 
 
 _social_scraping_service: Optional[SocialScrapingService] = None
@@ -1,5 +1,5 @@
 import logging
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Set
 from urllib.parse import urlparse
 
 from django.conf import settings
@@ -120,12 +120,14 @@ class WhatsAppService:
             metadata: Optional[Dict[str, Any]] = None,
             priority: int = 5,
             requires_credits: bool = False,
+            valid_country_codes: Optional[Set[str]] = None,
     ) -> Optional[str]:
         """
         Queue a WhatsApp template message to be sent by the background worker.
 
         This single internal function is used for all auth, utility and
-        marketing templates.
+        marketing templates. Bulk senders can pass the active country codes
+        as `valid_country_codes` to skip the per-message lookup.
         """
         try:
             country_code = (country_code or "+91").strip()
@@ -133,7 +135,11 @@ class WhatsAppService:
                 country_code = f'+{country_code}'
 
             from common.models import CountryCode
-            if country_code and not CountryCode.objects.filter(code=country_code, is_active=True).exists():
+            if valid_country_codes is not None:
+                country_code_valid = country_code in valid_country_codes
+            else:
+                country_code_valid = CountryCode.objects.filter(code=country_code, is_active=True).exists()
+            if country_code and not country_code_valid:
                 logger.error(
                     f"Invalid country_code '{country_code}' for phone_number '{phone_number}'. "
                     f"Country code does not exist in CountryCode table. Skipping message."
@@ -339,7 +345,8 @@ class WhatsAppService:
             country_code: str,
             custom_message: str = "",
             sender_type: str = 'brand',
-            sender_id: Optional[int] = None
+            sender_id: Optional[int] = None,
+            valid_country_codes: Optional[Set[str]] = None,
     ) -> bool:
         """
         Send campaign notification to influencer via WhatsApp
@@ -354,6 +361,7 @@ class WhatsAppService:
             custom_message: Optional custom message from brand
             sender_type: Type of sender ('brand' or 'influencer')
             sender_id: ID of the brand or influencer sending the message
+            valid_country_codes: Preloaded active country codes (see _queue_whatsapp_template)
             
         Returns:
             True if message was queued successfully
@@ -539,6 +547,7 @@ class WhatsAppService:
                 },
                 priority=6,  # Medium-high priority for campaign notifications
                 requires_credits=True,
+                valid_country_codes=valid_country_codes,
             )
 
             # Automatically send SMS for invitation notifications
@@ -331,6 +331,7 @@ def _create_content_notification(deal, submission, action, custom_message=None):
     Create a notification message in the deal conversation about content events.
     """
     from messaging.models import Conversation, Message
+    from messaging.realtime import broadcast_new_message
 
     try:
         # Get or create conversation for this deal
@@ -377,7 +378,7 @@ def _create_content_notification(deal, submission, action, custom_message=None):
             return  # Unknown action
 
         # Create the notification message
-        Message.objects.create(
+        message = Message.objects.create(
             conversation=conversation,
             sender_type=sender_type,
             sender_user=sender_user,
@@ -385,6 +386,7 @@ def _create_content_notification(deal, submission, action, custom_message=None):
             read_by_influencer=read_by_influencer,
             read_by_brand=read_by_brand
         )
+        broadcast_new_message(message, deal)
 
     except Exception as e:
         # Log error but don't fail the main operation
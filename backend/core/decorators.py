@@ -2,6 +2,7 @@ import functools
 import logging
 import time
 
+from common.rate_limiter import RateLimiter
 from django.core.cache import cache
 from django.http import JsonResponse
 
@@ -27,18 +28,18 @@ def rate_limit(requests_per_minute=60, key_func=None):
                 client_ip = get_client_ip(request)
                 cache_key = f"rate_limit:{view_func.__name__}:{client_ip}"
 
-            # Check current request count
-            current_requests = cache.get(cache_key, 0)
+            # Check and record the request in one atomic step
+            result = RateLimiter.hit(cache_key, requests_per_minute, 60)
 
-            if current_requests >= requests_per_minute:
+            if not result.allowed:
                 logger.warning(f"Rate limit exceeded for {cache_key}")
-                return JsonResponse({
+                response = JsonResponse({
                     'error': 'Rate limit exceeded',
-                    'message': f'Maximum {requests_per_minute} requests per minute allowed'
+                    'message': f'Maximum {requests_per_minute} requests per minute allowed',
+                    'retry_after_seconds': result.retry_after
                 }, status=429)
-
-            # Increment counter
-            cache.set(cache_key, current_requests + 1, 60)  # 60 seconds TTL
+                response['Retry-After'] = str(result.retry_after)
+                return response
 
             return view_func(request, *args, **kwargs)
 
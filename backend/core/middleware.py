@@ -1,9 +1,8 @@
 import logging
-import time
 
+from common.middleware import PerformanceMonitoringMiddleware  # noqa: F401 (profiling lives in common)
+from common.rate_limiter import RateLimiter
 from django.conf import settings
-from django.core.cache import cache
-from django.db import connection
 from django.http import JsonResponse
 from django.utils.deprecation import MiddlewareMixin
 
@@ -66,11 +65,16 @@ class RateLimitMiddleware:
         rate_limit_key = self.get_rate_limit_key(request.path)
         rate_limit = self.rate_limits.get(rate_limit_key, self.rate_limits.get('DEFAULT'))
 
-        if rate_limit and not self.is_rate_limited(client_ip, rate_limit_key, rate_limit):
-            return JsonResponse({
-                'error': 'Rate limit exceeded',
-                'message': f'Too many requests. Limit: {rate_limit["requests"]} per {rate_limit["window"]} seconds'
-            }, status=429)
+        if rate_limit:
+            result = self.is_rate_limited(client_ip, rate_limit_key, rate_limit)
+            if not result.allowed:
+                response = JsonResponse({
+                    'error': 'Rate limit exceeded',
+                    'message': f'Too many requests. Limit: {rate_limit["requests"]} per {rate_limit["window"]} seconds',
+                    'retry_after_seconds': result.retry_after
+                }, status=429)
+                response['Retry-After'] = str(result.retry_after)
+                return response
 
         response = self.get_response(request)
         return response
@@ -94,63 +98,17 @@ class RateLimitMiddleware:
             return 'DEFAULT'
 
     def is_rate_limited(self, client_ip, rate_limit_key, rate_limit):
-        """Check if the client has exceeded the rate limit."""
-        cache_key = f"rate_limit:{rate_limit_key}:{client_ip}"
-        current_requests = cache.get(cache_key, 0)
+        """Record the request and return the limiter result (`allowed` is False once over the limit)."""
+        result = RateLimiter.hit(
+            f"rate_limit:{rate_limit_key}:{client_ip}", rate_limit['requests'], rate_limit['window']
+        )
 
-        if current_requests >= rate_limit['requests']:
+        if not result.allowed:
             security_logger.warning(
                 f"Rate limit exceeded for IP {client_ip} on {rate_limit_key} endpoint. "
-                f"Requests: {current_requests}/{rate_limit['requests']}"
+                f"Requests: {result.count}/{rate_limit['requests']}"
             )
-            return False
-
-        # Increment the counter
-        cache.set(cache_key, current_requests + 1, rate_limit['window'])
-        return True
-
-
-class PerformanceMonitoringMiddleware:
-    """
-    Middleware to monitor performance and log slow requests.
-    """
-
-    def __init__(self, get_response):
-        self.get_response = get_response
-        self.monitoring_config = getattr(settings, 'PERFORMANCE_MONITORING', {})
-
-    def __call__(self, request):
-        start_time = time.time()
-        initial_queries = len(connection.queries)
-
-        response = self.get_response(request)
-
-        # Calculate request duration
-        duration = time.time() - start_time
-        query_count = len(connection.queries) - initial_queries
-
-        # Log slow requests
-        slow_threshold = self.monitoring_config.get('SLOW_QUERY_THRESHOLD', 1.0)
-        if duration > slow_threshold:
-            logger.warning(
-                f"Slow request: {request.method} {request.path} "
-                f"took {duration:.2f}s with {query_count} queries"
-            )
-
-        # Log excessive query counts
-        max_queries = self.monitoring_config.get('MAX_QUERY_COUNT', 50)
-        if query_count > max_queries:
-            logger.warning(
-                f"High query count: {request.method} {request.path} "
-                f"executed {query_count} queries"
-            )
-
-        # Add performance headers in debug mode
-        if settings.DEBUG:
-            response['X-Response-Time'] = f"{duration:.3f}s"
-            response['X-Query-Count'] = str(query_count)
-
-        return response
+        return result
 
 
 class CSRFExemptMiddleware(MiddlewareMixin):
@@ -3,6 +3,7 @@ import logging
 import time
 
 import psutil
+from common.profiling import EndpointMetrics
 from django.core.cache import cache
 from django.db import connection
 from django.utils import timezone
@@ -174,16 +175,11 @@ class PerformanceMonitor:
         if duration > 2.0:  # Slower than 2 seconds
             logger.warning(f"Slow API request: {json.dumps(performance_data)}")
 
-        # Store performance metrics in cache
-        cache_key = f"api_performance:{view_name}"
-        metrics = cache.get(cache_key, [])
-        metrics.append(performance_data)
-
-        # Keep only last 100 requests
-        if len(metrics) > 100:
-            metrics = metrics[-100:]
-
-        cache.set(cache_key, metrics, 1800)  # 30 minutes cache
+        # Add to the rolling per-endpoint histograms (one pipelined write, no read-modify-write)
+        try:
+            EndpointMetrics.record(view_name, {'duration_ms': duration * 1000})
+        except Exception as e:
+            logger.warning(f"Failed to record performance for {view_name}: {e}")
 
     @staticmethod
     def get_performance_summary():
@@ -191,13 +187,10 @@ class PerformanceMonitor:
         Get performance summary for all tracked endpoints.
         """
         try:
-            # Get all performance cache keys
-            cache_keys = []
-            # This is a simplified approach - in production, you'd use Redis SCAN
-
             summary = {
                 'system_metrics': cache.get('system_metrics', {}),
                 'database_metrics': SystemMonitor.get_database_metrics(),
+                'endpoints': EndpointMetrics.summary(),
                 'timestamp': timezone.now().isoformat(),
             }
 
@@ -0,0 +1,135 @@
+import json
+import time
+from itertools import count
+
+import pytest
+from django.contrib.auth.models import User
+
+from brands.models import Brand, BrandUser
+from campaigns.models import Campaign
+from common.models import Industry
+from communications.rabbitmq_service import RabbitMQService
+from influencers.models import InfluencerProfile
+from users.models import UserProfile
+
+
+@pytest.fixture(autouse=True)
+def enforce_query_budgets(settings):
+    """Fail any request that goes over its endpoint's query budget (see common/query_budget.py)."""
+    settings.PERFORMANCE_MONITORING = {**settings.PERFORMANCE_MONITORING, 'ENFORCE_QUERY_BUDGETS': True}
+
+
+class FakeBlockingChannel:
+    def __init__(self):
+        self.is_open = True
+        self.in_use = False
+        self.declared, self.published = [], []
+
+    def queue_declare(self, queue, durable, arguments):
+        self.declared.append(queue)
+
+    def basic_publish(self, exchange, routing_key, body, properties, mandatory=False):
+        assert not self.in_use, 'channel used by two threads at once'
+        self.in_use = True
+        time.sleep(0.0001)
+        self.in_use = False
+        self.published.append((routing_key, json.loads(body), properties.priority))
+
+    def close(self):
+        self.is_open = False
+
+
+class FakeBlockingConnection:
+    def __init__(self):
+        self.is_closed = False
+
+    def process_data_events(self, time_limit=None):
+        pass
+
+    def close(self):
+        self.is_closed = True
+
+
+@pytest.fixture
+def fake_broker(monkeypatch):
+    """Connect RabbitMQService to in-memory channels; returns the channels opened, in order."""
+    channels = []
+
+    def connect(service):
+        service.connection, service.channel = FakeBlockingConnection(), FakeBlockingChannel()
+        channels.append(service.channel)
+        return True
+
+    monkeypatch.setattr(RabbitMQService, 'connect', connect)
+    return channels
+
+
+@pytest.fixture
+def industry():
+    industry, _ = Industry.objects.get_or_create(key='tests', defaults={'name': 'Tests'})
+    return industry
+
+
+@pytest.fixture
+def make_brand(industry):
+    """Create brands with unique names, domains and contact emails."""
+    numbers = count()
+
+    def make_brand(**fields):
+        n = next(numbers)
+        fields = {
+            'name': f'Test Brand {n}',
+            'domain': f'brand{n}.test',
+            'industry': industry,
+            'contact_email': f'contact@brand{n}.test',
+            **fields,
+        }
+        return Brand.objects.create(**fields)
+
+    return make_brand
+
+
+@pytest.fixture
+def make_brand_user(make_brand):
+    """Create a brand's user (owner by default), with a new brand unless one is given."""
+    numbers = count()
+
+    def make_brand_user(brand=None, role='owner'):
+        n = next(numbers)
+        user = User.objects.create_user(f'test-brand-user-{n}', f'user{n}@brands.test', 'pass1234')
+        return BrandUser.objects.create(user=user, brand=brand or make_brand(), role=role)
+
+    return make_brand_user
+
+
+@pytest.fixture
+def make_influencer(industry):
+    """
+    Create influencers with a user and user profile.
+
+    `user_profile_fields` go to the UserProfile, any other keyword to the InfluencerProfile.
+    """
+    numbers = count()
+
+    def make_influencer(user_profile_fields=None, **fields):
+        n = next(numbers)
+        user = User.objects.create_user(f'test-influencer-{n}', f'influencer{n}@influencers.test', 'pass1234')
+        user_profile = UserProfile.objects.create(user=user, phone_number=f'98{n:08d}',
+                                                  **(user_profile_fields or {}))
+        fields = {'industry': industry, **fields}
+        return InfluencerProfile.objects.create(user=user, user_profile=user_profile, **fields)
+
+    return make_influencer
+
+
+@pytest.fixture
+def make_campaign(make_brand):
+    """Create cash campaigns, for a new brand unless one is given."""
+    numbers = count()
+
+    def make_campaign(brand=None, **fields):
+        n = next(numbers)
+        fields = {'title': f'Test Campaign {n}', 'description': '-', 'deal_type': 'cash', **fields}
+        return Campaign.objects.create(brand=brand or make_brand(), **fields)
+
+    return make_campaign
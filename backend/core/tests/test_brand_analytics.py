@@ -0,0 +1,71 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from brands.analytics import BrandAnalyticsService
+from deals.models import Deal
+
+
+@pytest.fixture
+def brand_with_deals(make_brand, make_campaign, make_influencer):
+    brand = make_brand()
+    influencers = [make_influencer() for _ in range(4)]
+    campaigns = [
+        make_campaign(brand=brand, cash_amount=1000 * (i + 1),
+                      application_deadline=timezone.now() + timedelta(days=7 if i else -1))
+        for i in range(2)
+    ]
+    statuses = ['invited', 'accepted', 'content_submitted', 'completed']
+    deals = [
+        Deal.objects.create(campaign=campaign, influencer=influencer, status=statuses[(i + j) % 4],
+                            brand_rating=i + 1)
+        for j, campaign in enumerate(campaigns)
+        for i, influencer in enumerate(influencers)
+    ]
+    return brand, campaigns, deals
+
+
+@pytest.mark.django_db
+def test_campaign_stats_are_one_grouped_query(brand_with_deals):
+    brand, campaigns, deals = brand_with_deals
+
+    with CaptureQueriesContext(connection) as queries:
+        rows = BrandAnalyticsService.get_campaign_stats(brand.id)
+    summary = BrandAnalyticsService.summarize(rows)
+
+    assert len(queries) == 1
+    assert [row['id'] for row in rows] == [campaign.id for campaign in reversed(campaigns)]
+    for row in rows:
+        campaign_deals = Deal.objects.filter(campaign_id=row['id'])
+        assert row['influencers_count'] == campaign_deals.count()
+        assert row['completed_deals'] == campaign_deals.filter(status='completed').count()
+        assert row['pending_deals'] == campaign_deals.filter(status='invited').count()
+    assert summary['total_campaigns'] == 2
+    assert summary['active_campaigns'] == 1
+    assert summary['total_investment'] == 3000
+    assert summary['total_deals'] == 8
+    assert summary['pending_content'] == 2
+    assert summary['avg_rating'] == 2.5
+
+
+@pytest.mark.django_db
+def test_deal_status_change_invalidates_cached_stats(brand_with_deals, django_capture_on_commit_callbacks):
+    brand, campaigns, deals = brand_with_deals
+    time_range = 'last_7_days'
+    completed = BrandAnalyticsService.summarize(
+        BrandAnalyticsService.get_campaign_stats(brand.id, time_range))['completed_deals']
+
+    with CaptureQueriesContext(connection) as queries:
+        BrandAnalyticsService.get_campaign_stats(brand.id, time_range)
+    assert len(queries) == 0
+
+    deal = next(deal for deal in deals if deal.status != 'completed')
+    with django_capture_on_commit_callbacks(execute=True):
+        deal.set_status_with_timestamp('completed')
+        deal.save()
+
+    summary = BrandAnalyticsService.summarize(BrandAnalyticsService.get_campaign_stats(brand.id, time_range))
+    assert summary['completed_deals'] == completed + 1
@@ -0,0 +1,98 @@
+import uuid
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+import communications.rabbitmq_publisher as rabbitmq_publisher
+from brands.invitations import CampaignInvitationService
+from brands.tasks import send_campaign_invitations
+from common.models import CountryCode
+from communications.rabbitmq_publisher import RabbitMQPublisher
+from deals.models import Deal
+
+
+@pytest.fixture
+def published(fake_broker, monkeypatch):
+    """Routing keys of the messages published over the fake broker."""
+    monkeypatch.setattr(rabbitmq_publisher, '_rabbitmq_publisher', RabbitMQPublisher(size=1))
+    # Run the Celery task in-process
+    monkeypatch.setattr(send_campaign_invitations, 'delay', lambda *args: send_campaign_invitations.run(*args))
+    return lambda: [routing_key for channel in fake_broker for routing_key, _, _ in channel.published]
+
+
+@pytest.fixture
+def campaign_with_influencers(make_brand_user, make_campaign, make_influencer):
+    CountryCode.objects.get_or_create(code='+91', defaults={'shorthand': 'IN', 'country': 'India'})
+    brand_user = make_brand_user()
+    campaign = make_campaign(brand=brand_user.brand, deal_type='product', cash_amount=0)
+
+    def make_influencers(count):
+        return [make_influencer(user_profile_fields={'country_code': '91', 'email_verified': True})
+                for _ in range(count)]
+
+    return brand_user.user, campaign, make_influencers
+
+
+@pytest.mark.django_db
+def test_bulk_invite_is_constant_queries_and_reports_progress(
+        campaign_with_influencers, published, make_campaign, django_capture_on_commit_callbacks):
+    brand_user, campaign, make_influencers = campaign_with_influencers
+    client = APIClient()
+    client.force_authenticate(brand_user)
+    url = reverse('brands:add-influencers-to-campaign', kwargs={'campaign_id': campaign.id})
+
+    def invite(influencers):
+        with CaptureQueriesContext(connection) as queries:
+            response = client.post(url, {'influencer_ids': [influencer.id for influencer in influencers]},
+                                   format='json')
+        assert response.status_code == 200
+        return response.data, len(queries)
+
+    few = make_influencers(2)
+    _, few_queries = invite(few)
+    many = make_influencers(20)
+    with django_capture_on_commit_callbacks(execute=True):
+        data, many_queries = invite(few[:1] + many)
+
+    assert many_queries == few_queries
+    assert [deal['influencer_id'] for deal in data['existing_deals']] == [few[0].id]
+    assert len(data['created_deals']) == 20
+    assert Deal.objects.filter(campaign=campaign).count() == 22
+    assert Deal.objects.get(id=data['created_deals'][0]['deal_id']).shipping_address == {}
+
+    job = data['invitation_job']
+    progress_url = reverse('brands:campaign-invitation-progress',
+                           kwargs={'campaign_id': campaign.id, 'job_id': job['job_id']})
+    progress = client.get(progress_url).data['result']
+    assert progress['status'] == 'completed'
+    assert (progress['processed'], progress['whatsapp_queued'], progress['errors']) == (20, 20, 0)
+    assert published().count('whatsapp_notifications') == 20
+    assert published().count('email_notifications') == progress['emails_queued'] == 20
+
+    other_campaign = make_campaign(brand=campaign.brand)
+    assert client.get(reverse('brands:campaign-invitation-progress', kwargs={
+        'campaign_id': other_campaign.id, 'job_id': job['job_id']})).status_code == 404
+
+
+@pytest.mark.django_db
+def test_progress_counts_only_messages_the_flush_published(campaign_with_influencers, published, monkeypatch):
+    _, campaign, make_influencers = campaign_with_influencers
+    deals, _ = CampaignInvitationService.create_deals(campaign, make_influencers(3))
+    publisher = rabbitmq_publisher.get_rabbitmq_publisher()
+    send = publisher._send
+
+    def send_without_whatsapp(queue_name, prepared):
+        if queue_name == 'whatsapp_notifications':
+            return [None] * len(prepared)
+        return send(queue_name, prepared)
+
+    monkeypatch.setattr(publisher, '_send', send_without_whatsapp)
+
+    # A fresh job id so no progress left in the cache by an earlier run is picked up
+    progress = CampaignInvitationService.send_invitations(uuid.uuid4().hex, [deal.id for deal in deals])
+
+    assert (progress['processed'], progress['emails_queued'], progress['whatsapp_queued']) == (3, 3, 0)
+    assert progress['errors'] == 3
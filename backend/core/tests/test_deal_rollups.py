@@ -0,0 +1,83 @@
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db.models import Sum
+from django.utils import timezone
+
+from deals.models import Deal, InfluencerDealRollup
+from deals.rollups import DealRollupService, last_months
+
+
+@pytest.fixture
+def influencer_with_deals(make_campaign, make_influencer):
+    influencer = make_influencer()
+
+    now = timezone.now()
+    last_month = last_months(2, now)[1]
+    deals = []
+    for i, (deal_status, payment_status) in enumerate([
+        ('completed', 'paid'), ('completed', 'pending'), ('completed', 'paid'), ('accepted', 'pending'),
+        ('invited', 'pending'),
+    ]):
+        campaign = make_campaign(cash_amount=100 * (i + 1),
+                                 platforms_required=['instagram'] if i % 2 else ['youtube', 'unknown'])
+        deal = Deal.objects.create(campaign=campaign, influencer=influencer, status=deal_status,
+                                   payment_status=payment_status, responded_at=now if i < 4 else None)
+        if deal_status == 'completed':
+            completed_at = now if i else timezone.make_aware(datetime.combine(last_month, time.min))
+            Deal.objects.filter(pk=deal.pk).update(
+                completed_at=completed_at,
+                payment_date=completed_at + timedelta(minutes=1) if payment_status == 'paid' else None,
+            )
+        deals.append(deal)
+    return influencer, deals
+
+
+@pytest.mark.django_db
+def test_rollup_totals_match_deals(influencer_with_deals):
+    influencer, deals = influencer_with_deals
+    DealRollupService.refresh([influencer.id])
+
+    totals = DealRollupService.summarize(DealRollupService.get_rows(influencer.id))
+    completed = Deal.objects.filter(influencer=influencer, status='completed')
+
+    assert totals['deals_count'] == 5
+    assert totals['responded_count'] == 4
+    assert totals['status_counts'] == {'completed': 3, 'accepted': 1, 'invited': 1}
+    assert totals['completed_count'] == completed.count()
+    assert totals['earnings'] == completed.aggregate(total=Sum('campaign__cash_amount'))['total']
+    assert totals['earnings_paid'] == Decimal('400.00')
+    assert totals['earnings_pending'] == Decimal('200.00')
+    assert totals['paid_in_month'] == totals['earnings_paid']
+    assert len(totals['brand_ids']) == 3
+
+    # Only platforms from PLATFORM_CHOICES get rows; platform rows overlap the '' rows
+    assert DealRollupService.summarize(DealRollupService.get_rows(influencer.id), 'instagram')['deals_count'] == 2
+    assert not InfluencerDealRollup.objects.filter(platform='unknown').exists()
+
+    this_month, previous_month = last_months(2)
+    monthly = DealRollupService.by_month(DealRollupService.get_rows(influencer.id))
+    assert monthly[previous_month]['earnings_paid'] == Decimal('100.00')
+    assert monthly[this_month]['completed_count'] == 2
+
+
+@pytest.mark.django_db
+def test_status_change_refreshes_rollups(influencer_with_deals, django_capture_on_commit_callbacks):
+    influencer, deals = influencer_with_deals
+    call_command('backfill_deal_rollups', stdout=StringIO())
+    assert DealRollupService.summarize(DealRollupService.get_rows(influencer.id))['completed_count'] == 3
+
+    deal = deals[3]
+    with django_capture_on_commit_callbacks(execute=True):
+        deal.set_status_with_timestamp('completed')
+        deal.payment_status = 'paid'
+        deal.payment_date = timezone.now()
+        deal.save()
+
+    totals = DealRollupService.summarize(DealRollupService.get_rows(influencer.id))
+    assert totals['completed_count'] == 4
+    assert totals['earnings_paid'] == Decimal('800.00')
+    assert totals['status_counts']['completed'] == 4
@@ -0,0 +1,96 @@
+import pytest
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient, APIRequestFactory
+
+from brands.models import BookmarkedInfluencer
+from influencers.models import InfluencerProfile, SocialMediaAccount
+from influencers.serializers import InfluencerSearchSerializer
+from influencers.services.search_index_service import InfluencerSearchIndexService
+
+
+@pytest.fixture
+def brand_user(make_brand_user):
+    return make_brand_user()
+
+
+@pytest.fixture
+def influencers(brand_user, make_influencer):
+    profiles = []
+    for i in range(12):
+        profile = make_influencer()
+        for platform in ('instagram', 'youtube', 'facebook'):
+            SocialMediaAccount.objects.create(
+                influencer=profile,
+                platform=platform,
+                handle=f'inf{i}_{platform}',
+                followers_count=1000 * (i + 1),
+                average_likes=100 * (i + 1),
+                follower_growth_rate=i,
+                platform_verified=platform == 'instagram',
+            )
+        if i % 2:
+            BookmarkedInfluencer.objects.create(brand=brand_user.brand, influencer=profile,
+                                                bookmarked_by=brand_user.user)
+        profiles.append(profile)
+    return profiles
+
+
+def _serialize_page(brand_user, page_size):
+    request = APIRequestFactory().get('/api/influencers/search/')
+    request.user = User.objects.select_related('brand_user').get(pk=brand_user.user_id)
+    page = InfluencerProfile.objects.select_related(
+        'user', 'user_profile', 'industry'
+    ).prefetch_related('social_accounts').order_by('id')[:page_size]
+
+    with CaptureQueriesContext(connection) as queries:
+        data = InfluencerSearchSerializer(
+            page, many=True, context={'request': request, 'platforms_filter': ['instagram']}
+        ).data
+    return data, len(queries)
+
+
+@pytest.mark.django_db
+class TestInfluencerSearchSerializerQueries:
+    def test_query_count_is_constant_across_page_sizes(self, brand_user, influencers):
+        """Serializing a search page must not issue per-row queries."""
+        _, small_page_queries = _serialize_page(brand_user, 2)
+        _, large_page_queries = _serialize_page(brand_user, 12)
+
+        assert small_page_queries == large_page_queries
+        # page + social_accounts prefetch + bookmarks
+        assert large_page_queries <= 3
+
+    def test_serialized_values_match_accounts(self, brand_user, influencers):
+        """Batched lookups return the same data the per-row queries did."""
+        data, _ = _serialize_page(brand_user, 12)
+
+        first, second = data[0], data[1]
+        assert first['is_bookmarked'] is False
+        assert second['is_bookmarked'] is True
+        assert sorted(first['platforms']) == ['facebook', 'instagram', 'youtube']
+        assert first['total_followers'] == 1000
+        assert first['platform_verified_platforms'] == ['instagram']
+        assert len(first['social_accounts']) == 3
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('sort_by', ['recommendation', 'growth_rate'])
+def test_performance_filters_return_each_influencer_once(brand_user, influencers, sort_by):
+    """Every account of these influencers matches the filter; none may be listed more than once."""
+    # Search documents are refreshed on commit, which doesn't run inside the test transaction
+    InfluencerSearchIndexService.rebuild()
+    client = APIClient()
+    client.force_authenticate(brand_user.user)
+
+    response = client.get(reverse('influencers:influencer_search'),
+                          {'min_avg_likes': 300, 'sort_by': sort_by, 'page_size': 50})
+
+    assert response.status_code == 200
+    ids = [row['id'] for row in response.data['results']]
+    assert sorted(ids) == sorted(profile.id for profile in influencers[2:])
+    assert response.data['pagination']['total_count'] == 10
+    if sort_by == 'growth_rate':
+        assert ids == [profile.id for profile in reversed(influencers[2:])]
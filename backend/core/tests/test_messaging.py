@@ -0,0 +1,276 @@
+import asyncio
+import json
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from brands.models import BrandUser
+from deals.models import Deal
+from messaging.models import Conversation, Message
+from messaging.realtime import deal_group_name, mark_offline, mark_online, online_user_ids, user_group_name
+from messaging.routing import websocket_urlpatterns
+
+
+@pytest.fixture(autouse=True)
+def in_memory_channel_layer(settings):
+    settings.CHANNEL_LAYERS = {'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}}
+
+
+@pytest.fixture
+def conversation(make_brand_user, make_influencer, make_campaign):
+    brand_user = make_brand_user()
+    influencer = make_influencer()
+    user = influencer.user
+    campaign = make_campaign(brand=brand_user.brand)
+    deal = Deal.objects.create(campaign=campaign, influencer=influencer)
+    conversation = Conversation.objects.create(deal=deal)
+
+    start = timezone.now() - timedelta(hours=1)
+    for i in range(6):
+        message = Message.objects.create(
+            conversation=conversation,
+            sender_type='brand' if i % 3 else 'influencer',
+            sender_user=brand_user.user if i % 3 else user,
+            content=f'message {i}',
+        )
+        Message.objects.filter(pk=message.pk).update(created_at=start + timedelta(minutes=i))
+    conversation.refresh_from_db()
+    return conversation
+
+
+@pytest.mark.django_db
+class TestMarkReadUntil:
+    def test_marks_other_party_messages_up_to_cutoff_in_one_query(self, conversation):
+        messages = list(conversation.messages.order_by('created_at'))
+        cutoff = messages[3].created_at
+
+        with CaptureQueriesContext(connection) as queries:
+            marked = conversation.mark_read_until('influencer', cutoff)
+
+        # message update + counter update, plus savepoint and counter refresh
+        assert len([q for q in queries if q['sql'].startswith('UPDATE')]) == 2
+        # Brand messages 1 and 2 are before the cutoff; message 0 and 3 are the influencer's own
+        assert marked == 2
+        read = set(conversation.messages.filter(read_by_influencer=True).values_list('content', flat=True))
+        assert read == {'message 1', 'message 2'}
+        assert not conversation.messages.filter(read_by_influencer=True, read_at__isnull=True).exists()
+        assert conversation.unread_count_for_influencer == 2
+
+    def test_rest_endpoint_marks_up_to_message(self, conversation):
+        last_brand_message = conversation.messages.filter(sender_type='brand').order_by('-created_at').first()
+        client = APIClient()
+        client.force_authenticate(conversation.deal.influencer.user)
+
+        response = client.post(
+            reverse('messaging:conversation_read', kwargs={'conversation_id': conversation.id}),
+            {'message_id': last_brand_message.id},
+            format='json',
+        )
+
+        assert response.status_code == 200
+        assert response.data['marked_read'] == 4
+        conversation.refresh_from_db()
+        assert conversation.unread_count_for_influencer == 0
+        assert conversation.unread_count_for_brand == 2
+
+    def test_rest_endpoint_rejects_non_numeric_message_id(self, conversation):
+        client = APIClient()
+        client.force_authenticate(conversation.deal.influencer.user)
+
+        response = client.post(
+            reverse('messaging:conversation_read', kwargs={'conversation_id': conversation.id}),
+            {'message_id': 'abc'},
+            format='json',
+        )
+
+        assert response.status_code == 400
+        assert response.data['message'] == 'Invalid message_id.'
+
+    def test_rest_endpoint_rejects_other_brands(self, conversation, make_brand_user):
+        last_influencer_message = (conversation.messages.filter(sender_type='influencer')
+                                   .order_by('-created_at').first())
+        client = APIClient()
+        client.force_authenticate(make_brand_user().user)
+
+        response = client.post(
+            reverse('messaging:conversation_read', kwargs={'conversation_id': conversation.id}),
+            {'message_id': last_influencer_message.id},
+            format='json',
+        )
+
+        assert response.status_code == 403
+        conversation.refresh_from_db()
+        assert (conversation.unread_count_for_brand, conversation.unread_count_for_influencer) == (2, 4)
+        assert not conversation.messages.filter(read_by_brand=True).exists()
+
+
+@pytest.mark.django_db
+class TestConversationCounters:
+    def test_counters_follow_new_and_read_messages(self, conversation):
+        assert conversation.messages_count == 6
+        assert conversation.unread_count_for_influencer == 4
+        assert conversation.unread_count_for_brand == 2
+        assert conversation.last_message == conversation.messages.order_by('-id').first()
+
+        message = conversation.messages.filter(sender_type='influencer').first()
+        message.mark_as_read('brand')
+        message.mark_as_read('brand')
+        reply = Message.objects.create(conversation=conversation, sender_type='influencer',
+                                       sender_user=conversation.deal.influencer.user, content='reply')
+
+        conversation.refresh_from_db()
+        assert conversation.messages_count == 7
+        assert conversation.unread_count_for_brand == 2
+        assert conversation.last_message_id == reply.id
+
+    def test_mark_as_read_rejects_unknown_reader_type(self, conversation):
+        message = conversation.messages.first()
+
+        with pytest.raises(ValueError, match='Unknown reader type'):
+            message.mark_as_read('admin')
+        with pytest.raises(ValueError, match='Unknown reader type'):
+            conversation.mark_read_until('admin')
+
+    def test_unread_count_view_sums_counters(self, conversation):
+        client = APIClient()
+        client.force_authenticate(conversation.deal.influencer.user)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(reverse('messaging:unread_count'))
+
+        assert response.data['unread_count'] == 4
+        assert len([q for q in queries if 'messages' in q['sql']]) == 0
+
+    def test_reconcile_repairs_drift(self, conversation):
+        Conversation.objects.filter(pk=conversation.pk).update(
+            messages_count=0, unread_count_for_influencer=9, last_message=None
+        )
+
+        call_command('reconcile_conversation_counters', stdout=StringIO())
+
+        conversation.refresh_from_db()
+        assert conversation.messages_count == 6
+        assert conversation.unread_count_for_influencer == 4
+        assert conversation.unread_count_for_brand == 2
+        assert conversation.last_message == conversation.messages.order_by('-id').first()
+
+
+@pytest.mark.django_db
+class TestMessageHistory:
+    def _get(self, conversation, **params):
+        client = APIClient()
+        client.force_authenticate(conversation.deal.influencer.user)
+        url = reverse('messaging:conversation_messages', kwargs={'conversation_id': conversation.id})
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url, params)
+        return response, queries
+
+    def test_scrolls_back_and_forward_by_cursor(self, conversation):
+        response, queries = self._get(conversation, limit=4)
+
+        assert [m['content'] for m in response.data['messages']] == [f'message {i}' for i in (5, 4, 3, 2)]
+        assert response.data['has_older'] is True
+        assert not [q for q in queries if 'COUNT(' in q['sql']]
+
+        older, _ = self._get(conversation, limit=4, before=response.data['before'])
+        assert [m['content'] for m in older.data['messages']] == ['message 1', 'message 0']
+        assert older.data['has_older'] is False and older.data['has_newer'] is True
+
+        newer, _ = self._get(conversation, limit=1, after=older.data['after'])
+        assert [m['content'] for m in newer.data['messages']] == ['message 2']
+        assert newer.data['has_newer'] is True
+
+    def test_filters_and_legacy_page_mode(self, conversation):
+        response, _ = self._get(conversation, search='MESSAGE 3')
+        assert [m['content'] for m in response.data['messages']] == ['message 3']
+
+        response, _ = self._get(conversation, sender_type='influencer', page=1)
+        assert response.data['count'] == 2
+
+    def test_plain_get_keeps_numbered_pagination(self, conversation):
+        response, _ = self._get(conversation)
+
+        assert response.data['count'] == 6
+        assert {'next', 'previous'} <= set(response.data)
+        assert 'has_older' not in response.data
+
+
+@pytest.mark.django_db
+class TestRealtimeFanout:
+    def _listen(self, group):
+        layer = get_channel_layer()
+        channel = async_to_sync(layer.new_channel)()
+        async_to_sync(layer.group_add)(group, channel)
+        return layer, channel
+
+    def test_rest_message_reaches_deal_group_and_online_recipient(self, conversation,
+                                                                   django_capture_on_commit_callbacks):
+        influencer_user = conversation.deal.influencer.user
+        brand_user = BrandUser.objects.get(brand=conversation.deal.campaign.brand)
+        layer, deal_channel = self._listen(deal_group_name(conversation.deal_id))
+        _, user_channel = self._listen(user_group_name(influencer_user.id))
+        mark_online(influencer_user.id)
+
+        client = APIClient()
+        client.force_authenticate(brand_user.user)
+        with django_capture_on_commit_callbacks(execute=True):
+            response = client.post(
+                reverse('messaging:conversation_messages', kwargs={'conversation_id': conversation.id}),
+                {'content': 'hello'},
+            )
+
+        assert response.status_code == 201
+        deal_event = async_to_sync(layer.receive)(deal_channel)
+        user_event = async_to_sync(layer.receive)(user_channel)
+        assert deal_event['type'] == 'chat_message'
+        assert deal_event['message']['content'] == 'hello'
+        assert user_event['type'] == 'new_message'
+        assert user_event['conversation_id'] == conversation.id
+        mark_offline(influencer_user.id)
+
+    def test_offline_recipients_are_skipped(self, conversation):
+        brand_user = BrandUser.objects.get(brand=conversation.deal.campaign.brand)
+        mark_online(brand_user.user_id)
+        mark_offline(brand_user.user_id)
+
+        assert online_user_ids([brand_user.user_id, conversation.deal.influencer.user_id]) == []
+
+
+@pytest.mark.django_db(transaction=True)
+class TestBrandSocket:
+    def test_brand_message_over_socket_reaches_influencer(self, conversation):
+        brand_user = BrandUser.objects.select_related('user').get(brand=conversation.deal.campaign.brand)
+        path = f'/ws/deals/{conversation.deal_id}/messages/?token='
+        influencer_token = str(AccessToken.for_user(conversation.deal.influencer.user))
+        brand_token = str(AccessToken.for_user(brand_user.user))
+
+        async def exchange():
+            application = URLRouter(websocket_urlpatterns)
+            influencer_socket = WebsocketCommunicator(application, path + influencer_token)
+            brand_socket = WebsocketCommunicator(application, path + brand_token)
+            assert (await influencer_socket.connect())[0]
+            assert (await brand_socket.connect())[0]
+
+            await brand_socket.send_to(text_data=json.dumps({'type': 'message', 'content': 'from brand'}))
+            received = json.loads(await influencer_socket.receive_from(timeout=5))
+            await influencer_socket.disconnect()
+            await brand_socket.disconnect()
+            return received
+
+        received = asyncio.run(exchange())
+
+        assert received['type'] == 'message'
+        assert received['message']['sender_type'] == 'brand'
+        assert received['message']['content'] == 'from brand'
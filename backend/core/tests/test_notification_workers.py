@@ -0,0 +1,219 @@
+import json
+import smtplib
+from types import SimpleNamespace
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from communications.management.commands import whatsapp_worker
+from communications.management.commands.email_worker import EmailWorker
+from communications.management.commands.whatsapp_worker import WhatsAppWorker
+from common.cache_utils import CacheManager
+from communications.models import CommunicationLog
+from communications.smtp_pool import SMTPConnectionPool
+
+
+class FakeSMTP:
+    opened = []
+
+    def __init__(self, host, port, timeout=None):
+        self.sent = []
+        self.fail_next = False
+        FakeSMTP.opened.append(self)
+
+    def starttls(self):
+        pass
+
+    def login(self, username, password):
+        pass
+
+    def noop(self):
+        return 250, b'OK'
+
+    def send_message(self, msg):
+        if self.fail_next:
+            raise smtplib.SMTPServerDisconnected('gone')
+        self.sent.append(msg['To'])
+
+    def quit(self):
+        pass
+
+
+class FakeConnection:
+    """Runs add_callback_threadsafe callbacks inline."""
+
+    def add_callback_threadsafe(self, callback):
+        callback()
+
+
+class FakeChannel:
+    def __init__(self):
+        self.acked, self.published = [], []
+
+    def basic_ack(self, delivery_tag):
+        self.acked.append(delivery_tag)
+
+    def basic_publish(self, exchange, routing_key, body, properties):
+        self.published.append((routing_key, properties.headers))
+
+
+def forget_message_ids(*message_ids):
+    """Drop the idempotency claims earlier runs left for these message ids."""
+    cache.delete_many([CacheManager.get_cache_key('comm_message', message_id) for message_id in message_ids])
+
+
+@pytest.fixture
+def fake_smtp(monkeypatch):
+    FakeSMTP.opened = []
+    monkeypatch.setattr(smtplib, 'SMTP', FakeSMTP)
+    return FakeSMTP
+
+
+def test_pool_reuses_sessions_and_replaces_broken_ones(fake_smtp):
+    pool = SMTPConnectionPool('smtp.test', 587, 'user', 'secret', size=2)
+
+    for _ in range(3):
+        with pool.connection() as server:
+            server.send_message({'To': 'a@b.test'})
+    assert len(fake_smtp.opened) == 1
+
+    fake_smtp.opened[0].fail_next = True
+    with pytest.raises(smtplib.SMTPServerDisconnected):
+        with pool.connection() as server:
+            server.send_message({'To': 'a@b.test'})
+    with pool.connection() as server:
+        server.send_message({'To': 'a@b.test'})
+    assert len(fake_smtp.opened) == 2
+
+
+@pytest.mark.django_db
+def test_failed_send_goes_to_retry_queues_then_dlq(fake_smtp, monkeypatch):
+    forget_message_ids('email-retry-1', 'email-bad-json')
+    monkeypatch.setenv('ZEPTOMAIL_SMTP_PASSWORD', 'secret')
+    worker = EmailWorker(concurrency=1)
+    worker.connection, worker.channel = FakeConnection(), FakeChannel()
+    monkeypatch.setattr(worker, 'send_email_smtp', lambda *args: (False, 'mailbox unavailable'))
+
+    body = json.dumps({'channel_data': {'to': 'inf@worker.test', 'subject': 'Hi', 'html_body': '<p>Hi</p>',
+                                        'from_email': 'noreply@worker.test'}})
+    properties = SimpleNamespace(message_id='email-retry-1', headers=None, content_type='application/json')
+    worker.handle_delivery(1, properties, body)
+    worker.log_buffer.flush()
+
+    assert worker.channel.acked == [1]
+    assert worker.channel.published == [
+        ('email_notifications.retry.1s', {'x-retry-count': 1, 'x-last-error': 'mailbox unavailable'}),
+    ]
+    log = CommunicationLog.objects.get(message_id='email-retry-1')
+    assert log.status == 'retrying'
+
+    # Each redelivery waits in the next, longer retry queue
+    worker.handle_delivery(2, SimpleNamespace(message_id='email-retry-1', headers={'x-retry-count': 1},
+                                              content_type='application/json'), body)
+    assert worker.channel.published[-1][0] == 'email_notifications.retry.10s'
+
+    # The last attempt goes to the DLQ
+    worker.handle_delivery(3, SimpleNamespace(message_id='email-retry-1', headers={'x-retry-count': 3},
+                                              content_type='application/json'), body)
+    worker.log_buffer.flush()
+    assert worker.channel.acked == [1, 2, 3]
+    assert worker.channel.published[-1] == (
+        'email_notifications.dlq', {'x-retry-count': 3, 'x-last-error': 'mailbox unavailable'},
+    )
+    log.refresh_from_db()
+    assert (log.status, log.retry_count) == ('failed', 4)
+    assert CommunicationLog.objects.filter(message_id='email-retry-1').count() == 1
+
+    # Unparseable messages skip the retries
+    worker.handle_delivery(4, SimpleNamespace(message_id='email-bad-json', headers=None,
+                                              content_type='application/json'), '{not json')
+    assert worker.channel.acked[-1] == 4
+    assert worker.channel.published[-1][0] == 'email_notifications.dlq'
+    worker.executor.shutdown()
+
+
+@pytest.mark.django_db
+def test_logs_are_batched_and_duplicates_skipped(fake_smtp, monkeypatch):
+    forget_message_ids(*(f'email-batch-{i}' for i in range(5)))
+    monkeypatch.setenv('ZEPTOMAIL_SMTP_PASSWORD', 'secret')
+    worker = EmailWorker(concurrency=1)
+    worker.connection, worker.channel = FakeConnection(), FakeChannel()
+    monkeypatch.setattr(worker, 'send_email_smtp', lambda *args: (True, None))
+
+    body = json.dumps({'channel_data': {'to': 'inf@worker.test', 'subject': 'Hi', 'html_body': '<p>Hi</p>',
+                                        'from_email': 'noreply@worker.test'}})
+    with CaptureQueriesContext(connection) as queries:
+        for i in range(5):
+            worker.handle_delivery(i, SimpleNamespace(message_id=f'email-batch-{i}', headers=None,
+                                                      content_type='application/json'), body)
+        # A redelivered duplicate is dropped without touching the DB
+        worker.handle_delivery(5, SimpleNamespace(message_id='email-batch-0', headers=None,
+                                                  content_type='application/json'), body)
+    assert len(queries) == 0
+    assert worker.channel.acked == [0, 1, 2, 3, 4, 5]
+
+    with CaptureQueriesContext(connection) as queries:
+        assert worker.log_buffer.flush() == 5
+    assert len(queries) == 1
+    assert CommunicationLog.objects.filter(message_id__startswith='email-batch-', status='sent').count() == 5
+    worker.executor.shutdown()
+
+
+@pytest.mark.django_db
+def test_sent_whatsapp_is_acked_even_if_credit_deduction_fails(make_brand, monkeypatch):
+    forget_message_ids('whatsapp-credits-1')
+    brand = make_brand()
+    worker = WhatsAppWorker()
+    worker.channel = FakeChannel()
+    sent = []
+
+    def send_template_message(full_phone, **kwargs):
+        sent.append(full_phone)
+        return True, None
+
+    def deduct_brand_credits(brand, credits=1):
+        raise RuntimeError('database unavailable')
+
+    monkeypatch.setattr(worker.whatsapp_client, 'send_template_message', send_template_message)
+    monkeypatch.setattr(whatsapp_worker, 'deduct_brand_credits', deduct_brand_credits)
+
+    body = json.dumps({
+        'channel_data': {'phone_number': '9876543210', 'country_code': '+91', 'template_name': 'deal_update'},
+        'metadata': {'sender_type': 'brand', 'sender_id': brand.id},
+        'requires_credits': True,
+    })
+    worker.process_message(worker.channel, SimpleNamespace(delivery_tag=1),
+                           SimpleNamespace(message_id='whatsapp-credits-1', headers=None,
+                                           content_type='application/json'), body)
+    worker.log_buffer.flush()
+
+    # Sent once, acked, and not handed to the retry queues that would send it again
+    assert sent == ['+919876543210']
+    assert worker.channel.acked == [1]
+    assert worker.channel.published == []
+    log = CommunicationLog.objects.get(message_id='whatsapp-credits-1')
+    assert log.status == 'sent'
+    assert 'Credit deduction failed' in log.error_log
+
+
+@pytest.mark.django_db
+def test_failed_whatsapp_goes_to_retry_queue(monkeypatch):
+    forget_message_ids('whatsapp-retry-1')
+    worker = WhatsAppWorker()
+    worker.channel = FakeChannel()
+    monkeypatch.setattr(worker.whatsapp_client, 'send_template_message', lambda **kwargs: (False, 'throttled'))
+
+    body = json.dumps({'channel_data': {'phone_number': '9876543210', 'country_code': '+91',
+                                        'template_name': 'deal_update'}})
+    worker.process_message(worker.channel, SimpleNamespace(delivery_tag=1),
+                           SimpleNamespace(message_id='whatsapp-retry-1', headers=None,
+                                           content_type='application/json'), body)
+    worker.log_buffer.flush()
+
+    assert worker.channel.acked == [1]
+    assert worker.channel.published == [
+        ('whatsapp_notifications.retry.1s', {'x-retry-count': 1, 'x-last-error': 'throttled'}),
+    ]
+    assert CommunicationLog.objects.get(message_id='whatsapp-retry-1').status == 'retrying'
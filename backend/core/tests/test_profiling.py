@@ -0,0 +1,41 @@
+import pytest
+from django.contrib.auth.models import User
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from common.models import Industry
+from common.profiling import EndpointMetrics
+
+
+def _endpoint(name):
+    return next((item for item in EndpointMetrics.summary(300) if item['endpoint'] == name), None)
+
+
+@pytest.mark.django_db
+def test_requests_are_profiled_with_debug_off(settings):
+    settings.DEBUG = False
+    Industry.objects.get_or_create(key='profiling', defaults={'name': 'Profiling'})
+    before = _endpoint('common:get_industries')
+
+    response = APIClient().get(reverse('common:get_industries'))
+
+    assert response.status_code == 200
+    after = _endpoint('common:get_industries')
+    assert after['count'] == (before['count'] if before else 0) + 1
+    assert after['metrics']['query_count']['p99'] >= 1
+    assert after['metrics']['duration_ms']['mean'] > 0
+    assert 'render_ms' in after['metrics']
+
+
+@pytest.mark.django_db
+def test_performance_view_is_staff_only():
+    client = APIClient()
+    url = reverse('common:performance_metrics')
+    client.force_authenticate(User.objects.create_user('ops-user', 'ops@profiling.test', 'pass1234'))
+    assert client.get(url).status_code == 403
+
+    client.force_authenticate(User.objects.create_user('ops-staff', 'staff@profiling.test', 'pass1234', is_staff=True))
+    response = client.get(url, {'window': 600})
+
+    assert response.status_code == 200
+    assert response.data['result']['window_seconds'] == 600
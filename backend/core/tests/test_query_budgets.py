@@ -0,0 +1,149 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from common.models import Industry
+from common.profiling import start_profile, end_profile
+from common.query_budget import QueryBudgetExceeded, get_query_budget, iter_url_patterns
+from content.models import ContentSubmission
+from deals.models import Deal
+from deals.rollups import DealRollupService
+from influencers.models import SocialMediaAccount
+from influencers.services.search_index_service import InfluencerSearchIndexService
+from messaging.models import Conversation, Message
+
+# Namespaces that are not part of the API sweep
+SKIPPED_NAMESPACES = ('admin',)
+
+
+@pytest.fixture
+def seeded_dataset(make_brand_user, make_campaign, make_influencer):
+    """A brand with campaigns, deals, conversations and content across several influencers."""
+    brand_user = make_brand_user()
+    brand = brand_user.brand
+    campaigns = [
+        make_campaign(brand=brand, cash_amount=1000 * (i + 1), application_deadline=timezone.now() + timedelta(days=7))
+        for i in range(3)
+    ]
+
+    influencers, deals = [], []
+    statuses = ['invited', 'accepted', 'content_submitted', 'completed']
+    for i in range(4):
+        influencer = make_influencer()
+        user = influencer.user
+        # Freshly synced, so profile views don't queue scrapes
+        SocialMediaAccount.objects.create(influencer=influencer, platform='instagram', handle=f'budget{i}',
+                                          followers_count=1000 * (i + 1), last_synced_at=timezone.now())
+        influencers.append(influencer)
+        for j, campaign in enumerate(campaigns):
+            deal = Deal.objects.create(campaign=campaign, influencer=influencer, status=statuses[(i + j) % 4])
+            conversation = Conversation.objects.create(deal=deal)
+            for k in range(3):
+                Message.objects.create(conversation=conversation, sender_type='brand' if k % 2 else 'influencer',
+                                       sender_user=brand_user.user if k % 2 else user, content=f'message {k}')
+            ContentSubmission.objects.create(deal=deal, platform='instagram', content_type='post')
+            deals.append(deal)
+
+    # Search documents and deal rollups are refreshed on commit, which doesn't run inside the test transaction
+    InfluencerSearchIndexService.rebuild()
+    DealRollupService.refresh(influencer.id for influencer in influencers)
+
+    deal = deals[0]
+    return {
+        'brand_user': brand_user.user,
+        'influencer_user': influencers[0].user,
+        'kwargs': {
+            'deal_id': deal.id,
+            'campaign_id': deal.campaign_id,
+            'conversation_id': deal.conversation.id,
+            'message_id': Message.objects.filter(conversation__deal=deal).latest('id').id,
+            'influencer_id': influencers[0].id,
+            'brand_id': brand.id,
+            'user_id': influencers[0].user_id,
+            'account_id': influencers[0].social_accounts.first().id,
+            'submission_id': deal.content_submissions.first().id,
+        },
+    }
+
+
+@pytest.fixture
+def url_sweep(seeded_dataset):
+    """
+    GET every named URL in backend/urls.py as the brand user and as an influencer,
+    returning one row per request with its query count and budget.
+    """
+
+    def run():
+        clients = {}
+        for role in ('brand', 'influencer'):
+            clients[role] = APIClient(raise_request_exception=False)
+            clients[role].force_authenticate(seeded_dataset[f'{role}_user'])
+
+        rows = []
+        for name, pattern in iter_url_patterns():
+            if name.split(':')[0] in SKIPPED_NAMESPACES:
+                continue
+            converters = getattr(pattern.pattern, 'converters', {})
+            if any(kwarg not in seeded_dataset['kwargs'] for kwarg in converters):
+                rows.append({'name': name, 'role': None, 'status': 'skipped', 'queries': None, 'budget': None})
+                continue
+
+            url = reverse(name, kwargs={kwarg: seeded_dataset['kwargs'][kwarg] for kwarg in converters})
+            budget = get_query_budget(resolve(url))
+            for role, client in clients.items():
+                with CaptureQueriesContext(connection) as queries:
+                    response = client.get(url)
+                rows.append({'name': name, 'role': role, 'status': response.status_code,
+                             'queries': len(queries), 'budget': budget})
+
+        print('\nQuery counts per endpoint (GET):')
+        for row in sorted(rows, key=lambda row: -(row['queries'] or 0)):
+            budget = f"/{row['budget']}" if row['budget'] is not None else ''
+            print(f"  {row['name']:<60} {row['role'] or '-':<10} {row['status']!s:<8} {row['queries']}{budget}")
+        return rows
+
+    return run
+
+
+@pytest.mark.django_db
+def test_url_sweep_stays_within_query_budgets(url_sweep):
+    rows = url_sweep()
+
+    assert any(row['queries'] for row in rows)
+    over_budget = [
+        row for row in rows
+        if row['budget'] is not None and row['queries'] is not None and row['queries'] > row['budget']
+    ]
+    assert not over_budget
+
+
+@pytest.mark.django_db
+def test_enforced_budget_raises(settings):
+    settings.PERFORMANCE_MONITORING = {**settings.PERFORMANCE_MONITORING, 'ENFORCE_QUERY_BUDGETS': True}
+    settings.QUERY_BUDGETS = {'common:get_industries': 0}
+
+    with pytest.raises(QueryBudgetExceeded):
+        APIClient().get(reverse('common:get_industries'))
+
+
+@pytest.mark.django_db
+def test_repeated_query_shape_is_reported_with_call_site():
+    Industry.objects.get_or_create(key='budget', defaults={'name': 'Budget'})
+    profile, token = start_profile(repeat_threshold=3)
+    try:
+        with connection.execute_wrapper(profile):
+            for _ in range(4):
+                Industry.objects.filter(key='budget').first()
+            list(Industry.objects.filter(key__in=['a', 'b']))
+            list(Industry.objects.filter(key__in=['a', 'b', 'c']))
+    finally:
+        end_profile(token)
+
+    assert list(profile.shape_counts.values()) == [4, 2]
+    [(shape, stack)] = profile.repeated_shapes.items()
+    assert 'test_query_budgets.py' in stack
@@ -0,0 +1,77 @@
+import threading
+
+import pytest
+
+from communications.rabbitmq_publisher import RabbitMQPublisher
+from communications.rabbitmq_service import RabbitMQService
+
+
+def test_publish_batch_uses_one_channel_and_declares_once(fake_broker):
+    publisher = RabbitMQPublisher(size=2)
+
+    message_ids = publisher.publish_batch('email_notifications', [{'n': i} for i in range(300)])
+    publisher.publish('email_notifications', {'n': 300}, priority=8)
+
+    assert len(fake_broker) == 1
+    channel = fake_broker[0]
+    assert channel.declared == ['email_notifications']
+    assert len(channel.published) == 301
+    assert [body['message_id'] for _, body, _ in channel.published[:300]] == message_ids
+    assert channel.published[-1][2] == 8
+
+
+def test_batched_block_defers_publishes_per_queue(fake_broker):
+    publisher = RabbitMQPublisher(size=2)
+
+    with publisher.batched() as results:
+        email_id = publisher.publish('email_notifications', {'to': 'a@b.test'})
+        whatsapp_id = publisher.publish('whatsapp_notifications', {'phone_number': '9000000000'})
+        assert not fake_broker
+
+    published = fake_broker[0].published
+    assert [(queue, body['message_id']) for queue, body, _ in published] == [
+        ('email_notifications', email_id), ('whatsapp_notifications', whatsapp_id),
+    ]
+    assert results == {'email_notifications': [email_id], 'whatsapp_notifications': [whatsapp_id]}
+
+
+def test_batched_block_reports_failures_and_drops_messages_on_error(monkeypatch):
+    publisher = RabbitMQPublisher(size=1)
+    connects = []
+
+    def connect(service):
+        connects.append(service)
+        return False
+
+    monkeypatch.setattr(RabbitMQService, 'connect', connect)
+
+    with pytest.raises(ValueError):
+        with publisher.batched():
+            publisher.publish('email_notifications', {'to': 'a@b.test'})
+            raise ValueError('render failed')
+    assert not connects
+
+    with publisher.batched() as results:
+        publisher.publish('email_notifications', {'to': 'a@b.test'})
+    assert results == {'email_notifications': [None]}
+    # The outer block's buffer is gone; publishes go straight out again
+    assert publisher.publish('email_notifications', {'to': 'a@b.test'}) is None
+
+
+def test_threads_never_share_a_channel(fake_broker):
+    publisher = RabbitMQPublisher(size=3)
+    barrier = threading.Barrier(3)
+
+    def publish():
+        barrier.wait()
+        for i in range(50):
+            publisher.publish('email_notifications', {'n': i})
+
+    threads = [threading.Thread(target=publish) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert 1 <= len(fake_broker) <= 3
+    assert sum(len(channel.published) for channel in fake_broker) == 150
@@ -0,0 +1,38 @@
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.test import RequestFactory
+
+from common.decorators import rate_limit
+from common.rate_limiter import RateLimiter
+
+
+def test_concurrent_hits_admit_exactly_the_limit():
+    key = f'test:{uuid.uuid4().hex}'
+    limit = 25
+
+    try:
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            results = list(pool.map(lambda _: RateLimiter.hit(key, limit, 60), range(200)))
+    finally:
+        RateLimiter.reset(key)
+
+    allowed = [result for result in results if result.allowed]
+    assert len(allowed) == limit
+    assert sorted(result.count for result in allowed) == list(range(1, limit + 1))
+    assert all(0 < result.retry_after <= 60 for result in results if not result.allowed)
+
+
+def test_decorator_returns_retry_after_once_limited():
+    key = f'test:{uuid.uuid4().hex}'
+    view = rate_limit(requests_per_minute=2, key_func=lambda request: key)(lambda request: 'ok')
+    request = RequestFactory().get('/')
+
+    try:
+        assert [view(request), view(request)] == ['ok', 'ok']
+        response = view(request)
+    finally:
+        RateLimiter.reset(key)
+
+    assert response.status_code == 429
+    assert 0 < int(response['Retry-After']) <= 60
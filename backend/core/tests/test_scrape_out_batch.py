@@ -0,0 +1,33 @@
+from types import SimpleNamespace
+
+import pytest
+
+from communications.scrape_fetcher import ConcurrentScrapeFetcher
+from communications.social_scraping_service import SocialScrapingService
+
+
+class FakeRabbitMQ:
+    def __init__(self):
+        self.acked, self.nacked = [], []
+
+    def ack_message(self, delivery_tag, multiple=False):
+        self.acked.append((delivery_tag, multiple))
+
+    def nack_message(self, delivery_tag, requeue=True):
+        self.nacked.append(delivery_tag)
+
+
+@pytest.mark.django_db
+def test_malformed_messages_are_acked_without_failing_the_batch():
+    service = SocialScrapingService()
+    service.rabbitmq = FakeRabbitMQ()
+    deliveries = [
+        (SimpleNamespace(delivery_tag=tag), None, body)
+        for tag, body in enumerate([b'\xff\xfe', b'{not json', b'[1, 2]', None, b'{"event": "other"}'], start=1)
+    ]
+
+    with ConcurrentScrapeFetcher(service.get_scraper) as fetcher:
+        assert service.process_scrape_out_batch(deliveries, fetcher) == 0
+
+    assert service.rabbitmq.acked == [(5, True)]
+    assert service.rabbitmq.nacked == []
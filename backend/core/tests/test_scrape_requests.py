@@ -0,0 +1,44 @@
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+from communications.scrape_request_registry import ScrapeRequestRegistry
+from communications.social_scraping_service import SocialScrapingService
+
+
+class FakeRabbitMQ:
+    def __init__(self):
+        self.published = []
+
+    def publish_message(self, queue_name, message_data, priority=5):
+        self.published.append(message_data)
+        return f'msg-{len(self.published)}'
+
+
+@pytest.fixture
+def account():
+    account = SimpleNamespace(platform='instagram', handle=f'test-{uuid.uuid4().hex}')
+    yield account
+    ScrapeRequestRegistry.release(account.platform, account.handle)
+
+
+@pytest.fixture
+def service():
+    service = SocialScrapingService()
+    service.rabbitmq = FakeRabbitMQ()
+    return service
+
+
+def test_coalesced_request_returns_the_in_flight_message_id(service, account):
+    assert service.queue_scrape_request(account) == 'msg-1'
+    assert service.queue_scrape_request(account) == 'msg-1'
+    assert len(service.rabbitmq.published) == 1
+
+
+def test_coalesced_request_without_message_id_returns_none(service, account):
+    ScrapeRequestRegistry.mark_completed(account.platform, account.handle)
+
+    assert service.queue_scrape_request(account) is None
+    assert ScrapeRequestRegistry.get_state(account.platform, account.handle)['state'] == 'completed'
+    assert not service.rabbitmq.published
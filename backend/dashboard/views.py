@@ -5,7 +5,8 @@ from common.api_response import api_response
 from common.decorators import user_rate_limit, cache_response, log_performance
 from common.models import PLATFORM_CHOICES
 from deals.models import Deal
-from django.db.models import Count, Sum, Avg, F
+from deals.rollups import DealRollupService, last_months
+from django.db.models import Count, Sum, Avg, F, Q
 from django.db.models.functions import Coalesce
 from django.utils import timezone
 from influencers.models import InfluencerProfile
@@ -14,6 +15,9 @@ from rest_framework.permissions import IsAuthenticated
 
 from .serializers import DashboardStatsSerializer
 
+ACTIVE_DEAL_STATUSES = ['accepted', 'active', 'content_submitted', 'under_review']
+ACCEPTED_DEAL_STATUSES = ACTIVE_DEAL_STATUSES + ['approved', 'completed']
+
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
@@ -27,93 +31,58 @@ def dashboard_stats_view(request):
     except InfluencerProfile.DoesNotExist:
         return api_response(False, error='Influencer profile not found.', status_code=404)
 
-    # Get deal statistics
-    deals = Deal.objects.filter(influencer=profile)
-
-    total_invitations = deals.count()
-    pending_responses = deals.filter(
-        status__in=['invited', 'pending'],
-        campaign__application_deadline__gt=timezone.now()
-    ).count()
-    active_deals = deals.filter(status__in=['accepted', 'active', 'content_submitted', 'under_review']).count()
-    completed_deals = deals.filter(status='completed').count()
-    rejected_deals = deals.filter(status='rejected').count()
-
-    # Calculate earnings (include all completed deals)
-    completed_deals_qs = deals.filter(status='completed')
-    total_earnings = completed_deals_qs.aggregate(
-        total=Coalesce(Sum('campaign__cash_amount'), Decimal('0.00'))
-    )['total'] or Decimal('0.00')
-
-    pending_payments = deals.filter(
-        status='completed',
-        payment_status__in=['pending', 'processing']
-    ).aggregate(
-        total=Coalesce(Sum('campaign__cash_amount'), Decimal('0.00'))
-    )['total'] or Decimal('0.00')
-
-    # This month earnings - try multiple approaches
-    this_month_start = timezone.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-
-    # First try: deals completed this month
-    this_month_earnings = completed_deals_qs.filter(
-        completed_at__gte=this_month_start
-    ).aggregate(
-        total=Coalesce(Sum('campaign__cash_amount'), Decimal('0.00'))
-    )['total'] or Decimal('0.00')
-
-    # If no earnings from completed_at, try using accepted_at for recent deals
-    if this_month_earnings == 0:
-        this_month_earnings = completed_deals_qs.filter(
-            accepted_at__gte=this_month_start
-        ).aggregate(
-            total=Coalesce(Sum('campaign__cash_amount'), Decimal('0.00'))
-        )['total'] or Decimal('0.00')
-
-    # If still no earnings, try deals from last 30 days using accepted_at
-    if this_month_earnings == 0:
-        thirty_days_ago = timezone.now() - timedelta(days=30)
-        this_month_earnings = completed_deals_qs.filter(
-            accepted_at__gte=thirty_days_ago
-        ).aggregate(
-            total=Coalesce(Sum('campaign__cash_amount'), Decimal('0.00'))
-        )['total'] or Decimal('0.00')
-
-    # Final fallback: if we have completed deals but no date-based earnings, 
+    # Deal counts and earnings from the monthly rollups
+    now = timezone.now()
+    rows = DealRollupService.get_rows(profile.id)
+    totals = DealRollupService.summarize(rows)
+    this_month = DealRollupService.by_month(rows).get(last_months(1, now)[0])
+
+    total_invitations = totals['deals_count']
+    active_deals = DealRollupService.count_statuses(totals, ACTIVE_DEAL_STATUSES)
+    completed_deals = totals['completed_count']
+    rejected_deals = DealRollupService.count_statuses(totals, ['rejected'])
+
+    total_earnings = totals['earnings']
+    pending_payments = totals['earnings_pending'] + totals['earnings_processing']
+    this_month_earnings = this_month['earnings'] if this_month else Decimal('0.00')
+
+    # Final fallback: if we have completed deals but no earnings this month,
     # show all completed deals as "this month" (for testing purposes)
-    if this_month_earnings == 0 and completed_deals_qs.exists():
-        this_month_earnings = completed_deals_qs.aggregate(
-            total=Coalesce(Sum('campaign__cash_amount'), Decimal('0.00'))
-        )['total'] or Decimal('0.00')
+    if this_month_earnings == 0 and completed_deals:
+        this_month_earnings = total_earnings
 
     # Average deal value
-    average_deal_value = completed_deals_qs.aggregate(
-        avg=Coalesce(Avg('campaign__cash_amount'), Decimal('0.00'))
-    )['avg'] or Decimal('0.00')
+    average_deal_value = total_earnings / completed_deals if completed_deals else Decimal('0.00')
 
     # Performance metrics
-    total_brands_worked_with = deals.filter(status='completed').values('campaign__brand').distinct().count()
+    total_brands_worked_with = len(totals['brand_ids'])
 
     # Calculate acceptance rate
-    responded_deals = deals.filter(responded_at__isnull=False).count()
-    acceptance_rate = (deals.filter(status__in=['accepted', 'active', 'content_submitted', 'under_review', 'approved',
-                                                'completed']).count() / responded_deals * 100) if responded_deals > 0 else 0
+    responded_deals = totals['responded_count']
+    acceptance_rate = (DealRollupService.count_statuses(totals, ACCEPTED_DEAL_STATUSES) / responded_deals * 100
+                       ) if responded_deals > 0 else 0
 
     # Top performing platform
-    top_platform = None
-    if profile.social_accounts.filter(is_active=True).exists():
-        top_platform = profile.social_accounts.filter(is_active=True).order_by('-followers_count').first().platform
-
-    # Recent activity (last 30 days)
-    thirty_days_ago = timezone.now() - timedelta(days=30)
-    recent_invitations = deals.filter(invited_at__gte=thirty_days_ago).count()
-    recent_completions = deals.filter(completed_at__gte=thirty_days_ago).count()
-
-    # Unread messages count
-    unread_messages = 0
-    for deal in deals.filter(status__in=['accepted', 'active', 'content_submitted', 'under_review']):
-        if hasattr(deal, 'conversation'):
-            unread_messages += deal.conversation.unread_count_for_influencer
+    top_platform = profile.social_accounts.filter(is_active=True).order_by('-followers_count').values_list(
+        'platform', flat=True
+    ).first()
+
+    # Time-dependent counts that the monthly rollups can't answer (one query)
+    thirty_days_ago = now - timedelta(days=30)
+    live_stats = Deal.objects.filter(influencer=profile).aggregate(
+        pending_responses=Count('id', filter=Q(
+            status__in=['invited', 'pending'], campaign__application_deadline__gt=now
+        )),
+        recent_invitations=Count('id', filter=Q(invited_at__gte=thirty_days_ago)),
+        recent_completions=Count('id', filter=Q(completed_at__gte=thirty_days_ago)),
+        unread_messages=Coalesce(
+            Sum('conversation__unread_count_for_influencer', filter=Q(status__in=ACTIVE_DEAL_STATUSES)), 0
+        ),
+    )
+    pending_responses = live_stats['pending_responses']
+    recent_invitations = live_stats['recent_invitations']
+    recent_completions = live_stats['recent_completions']
+    unread_messages = live_stats['unread_messages']
 
     stats_data = {
         'total_invitations': total_invitations,
@@ -241,8 +210,9 @@ def notifications_view(request):
     # Message notifications (unread messages)
     active_deals = Deal.objects.filter(
         influencer=profile,
-        status__in=['accepted', 'active', 'content_submitted', 'under_review']
-    ).select_related('campaign__brand')
+        status__in=['accepted', 'active', 'content_submitted', 'under_review'],
+        conversation__unread_count_for_influencer__gt=0
+    ).select_related('campaign__brand', 'conversation__last_message')
 
     for deal in active_deals:
         if hasattr(deal, 'conversation'):
@@ -297,44 +267,27 @@ def performance_metrics_view(request):
     except InfluencerProfile.DoesNotExist:
         return api_response(False, error='Influencer profile not found.', status_code=404)
 
-    deals = Deal.objects.filter(influencer=profile)
+    rows = DealRollupService.get_rows(profile.id)
+    totals = DealRollupService.summarize(rows)
 
     # Overall metrics
-    total_collaborations = deals.filter(status='completed').count()
-    total_brands = deals.filter(status='completed').values('campaign__brand').distinct().count()
-    total_earnings = deals.filter(
-        status='completed',
-        payment_status='paid'
-    ).aggregate(
-        total=Coalesce(Sum('campaign__cash_amount'), Decimal('0.00'))
-    )['total'] or Decimal('0.00')
+    total_collaborations = totals['completed_count']
+    total_brands = len(totals['brand_ids'])
+    total_earnings = totals['earnings_paid']
 
     # Performance by platform
-    platform_performance = []
-    for platform_choice in PLATFORM_CHOICES:
-        platform_code = platform_choice[0]
-        platform_name = platform_choice[1]
-
-        # Get social account for this platform
-        social_account = profile.social_accounts.filter(
-            platform=platform_code,
-            is_active=True
-        ).first()
+    accounts = {}
+    for account in profile.social_accounts.filter(is_active=True).order_by('id'):
+        accounts.setdefault(account.platform, account)
 
+    platform_performance = []
+    for platform_code, platform_name in PLATFORM_CHOICES:
+        social_account = accounts.get(platform_code)
         if social_account:
-            # Count deals that required this platform
-            platform_deals = deals.filter(
-                status='completed',
-                campaign__platforms_required__contains=[platform_code]
-            ).count()
-
-            platform_earnings = deals.filter(
-                status='completed',
-                payment_status='paid',
-                campaign__platforms_required__contains=[platform_code]
-            ).aggregate(
-                total=Coalesce(Sum('campaign__cash_amount'), Decimal('0.00'))
-            )['total'] or Decimal('0.00')
+            # Deals whose campaign required this platform
+            platform_totals = DealRollupService.summarize(rows, platform_code)
+            platform_deals = platform_totals['completed_count']
+            platform_earnings = platform_totals['earnings_paid']
 
             platform_performance.append({
                 'platform': platform_code,
@@ -351,13 +304,13 @@ def performance_metrics_view(request):
 
     # Brand performance
     brand_performance = []
-    brand_deals = deals.filter(status='completed').values('campaign__brand').annotate(
+    brand_deals = Deal.objects.filter(influencer=profile, status='completed').values('campaign__brand').annotate(
         brand_name=F('campaign__brand__name'),
         brand_logo=F('campaign__brand__logo'),
         collaboration_count=Count('id'),
         total_earnings=Coalesce(Sum('campaign__cash_amount'), Decimal('0.00')),
         avg_rating=Avg('brand_rating')
-    ).order_by('-total_earnings')
+    ).order_by('-total_earnings')[:10]
 
     for brand_data in brand_deals:
         brand_performance.append({
@@ -369,49 +322,22 @@ def performance_metrics_view(request):
         })
 
     # Monthly performance (last 12 months)
+    months = last_months(12)
+    monthly_rows = DealRollupService.by_month(rows)
     monthly_performance = []
-    for i in range(12):
-        month_start = (timezone.now().replace(day=1) - timedelta(days=32 * i)).replace(day=1)
-        month_end = (month_start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
-
-        month_deals = deals.filter(
-            completed_at__gte=month_start,
-            completed_at__lte=month_end,
-            status='completed'
-        )
-
-        month_earnings = month_deals.filter(payment_status='paid').aggregate(
-            total=Coalesce(Sum('campaign__cash_amount'), Decimal('0.00'))
-        )['total'] or Decimal('0.00')
-
+    for month_start in months:
+        month = monthly_rows.get(month_start)
         monthly_performance.append({
             'month': month_start.strftime('%Y-%m'),
             'month_name': month_start.strftime('%B %Y'),
-            'collaborations': month_deals.count(),
-            'earnings': month_earnings,
-            'new_brands': month_deals.values('campaign__brand').distinct().count()
+            'collaborations': month['completed_count'] if month else 0,
+            'earnings': month['earnings_paid'] if month else Decimal('0.00'),
+            'new_brands': len(month['brand_ids']) if month else 0
         })
 
     # Calculate growth metrics
-    current_month = timezone.now().replace(day=1)
-    last_month = (current_month - timedelta(days=1)).replace(day=1)
-
-    current_month_earnings = deals.filter(
-        completed_at__gte=current_month,
-        status='completed',
-        payment_status='paid'
-    ).aggregate(
-        total=Coalesce(Sum('campaign__cash_amount'), Decimal('0.00'))
-    )['total'] or Decimal('0.00')
-
-    last_month_earnings = deals.filter(
-        completed_at__gte=last_month,
-        completed_at__lt=current_month,
-        status='completed',
-        payment_status='paid'
-    ).aggregate(
-        total=Coalesce(Sum('campaign__cash_amount'), Decimal('0.00'))
-    )['total'] or Decimal('0.00')
+    current_month_earnings = monthly_performance[0]['earnings']
+    last_month_earnings = monthly_performance[1]['earnings']
 
     earnings_growth = 0
     if last_month_earnings > 0:
@@ -427,7 +353,7 @@ def performance_metrics_view(request):
             'earnings_growth_percentage': round(earnings_growth, 2)
         },
         'platform_performance': platform_performance,
-        'brand_performance': brand_performance[:10],  # Top 10 brands
+        'brand_performance': brand_performance,  # Top 10 brands
         'monthly_performance': monthly_performance
     }
 
@@ -482,52 +408,27 @@ def analytics_earnings_view(request):
     except InfluencerProfile.DoesNotExist:
         return api_response(False, error='Influencer profile not found.', status_code=404)
 
-    deals = Deal.objects.filter(influencer=profile).select_related('campaign__brand')
-
-    # Get completed deals (include all completed deals, not just paid ones)
-    completed_deals = deals.filter(status='completed')
-
-    # Total earnings - calculate manually to use total_value property
-    total_earnings = Decimal('0.00')
-    for deal in completed_deals:
-        total_earnings += Decimal(str(deal.campaign.total_value))
+    rows = DealRollupService.get_rows(profile.id)
 
-    # Monthly earnings for the last 12 months
-    from datetime import timedelta
+    # Total earnings over all completed deals (not just paid ones), at campaign total value
+    total_earnings = DealRollupService.summarize(rows)['earnings_total_value']
 
+    # Monthly earnings for the last 12 months, by completion month
+    monthly_rows = DealRollupService.by_month(rows)
     monthly_earnings = []
-    for i in range(12):
-        month_start = timezone.now().replace(day=1) - timedelta(days=30 * i)
-        month_end = month_start + timedelta(days=32)
-        month_end = month_end.replace(day=1) - timedelta(days=1)
-
-        # Calculate monthly earnings using total_value property
-        month_deals = completed_deals.filter(
-            completed_at__gte=month_start,
-            completed_at__lte=month_end
-        )
-
-        month_earnings = Decimal('0.00')
-        for deal in month_deals:
-            month_earnings += Decimal(str(deal.campaign.total_value))
-
-        # If no earnings from completed_at, try accepted_at
-        if month_earnings == 0:
-            month_deals = completed_deals.filter(
-                accepted_at__gte=month_start,
-                accepted_at__lte=month_end
-            )
-            for deal in month_deals:
-                month_earnings += Decimal(str(deal.campaign.total_value))
-
+    for month_start in last_months(12):
+        month = monthly_rows.get(month_start)
         monthly_earnings.append({
             'month': month_start.strftime('%Y-%m'),
-            'amount': float(month_earnings)
+            'amount': float(month['earnings_total_value']) if month else 0.0
         })
 
     monthly_earnings.reverse()  # Show oldest to newest
 
-    # Earnings by brand - calculate manually to use total_value property
+    # Earnings by brand and payment history - one pass over the completed deals
+    completed_deals = list(
+        Deal.objects.filter(influencer=profile, status='completed').select_related('campaign__brand')
+    )
     earnings_by_brand = []
     brand_earnings_dict = {}
 
@@ -537,10 +438,10 @@ def analytics_earnings_view(request):
             brand_earnings_dict[brand_name] = Decimal('0.00')
         brand_earnings_dict[brand_name] += Decimal(str(deal.campaign.total_value))
 
-    for brand_name, total_earnings in sorted(brand_earnings_dict.items(), key=lambda x: x[1], reverse=True):
+    for brand_name, brand_earnings in sorted(brand_earnings_dict.items(), key=lambda x: x[1], reverse=True):
         earnings_by_brand.append({
             'brand': {'name': brand_name},
-            'amount': float(total_earnings)
+            'amount': float(brand_earnings)
         })
 
     # Top brands
@@ -548,14 +449,16 @@ def analytics_earnings_view(request):
 
     # Payment history
     payment_history = []
-    for deal in completed_deals.order_by('-completed_at')[:10]:
-        if deal.completed_at:
-            payment_history.append({
-                'brand_name': deal.campaign.brand.name,
-                'campaign_title': deal.campaign.title,
-                'amount': float(deal.campaign.total_value),
-                'payment_date': deal.completed_at.isoformat()
-            })
+    recent_completed = sorted(
+        (deal for deal in completed_deals if deal.completed_at), key=lambda deal: deal.completed_at, reverse=True
+    )
+    for deal in recent_completed[:10]:
+        payment_history.append({
+            'brand_name': deal.campaign.brand.name,
+            'campaign_title': deal.campaign.title,
+            'amount': float(deal.campaign.total_value),
+            'payment_date': deal.completed_at.isoformat()
+        })
 
     # Growth metrics
     current_month_earnings = monthly_earnings[-1]['amount'] if monthly_earnings else 0
@@ -0,0 +1,34 @@
+from deals.models import Deal
+from deals.rollups import DealRollupService
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the per-influencer monthly deal rollups from deals'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--influencer-id',
+            type=int,
+            action='append',
+            dest='influencer_ids',
+            help='Only rebuild the given influencer (can be repeated)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=200,
+            help='Number of influencers to rebuild per transaction',
+        )
+
+    def handle(self, *args, **options):
+        influencer_ids = options['influencer_ids']
+        if not influencer_ids:
+            influencer_ids = list(Deal.objects.values_list('influencer_id', flat=True).distinct().order_by('influencer_id'))
+
+        self.stdout.write(f'Rebuilding deal rollups for {len(influencer_ids)} influencers...')
+        batch_size = options['batch_size']
+        rows = 0
+        for start in range(0, len(influencer_ids), batch_size):
+            rows += DealRollupService.refresh(influencer_ids[start:start + batch_size])
+        self.stdout.write(self.style.SUCCESS(f'Wrote {rows} rollup rows'))
@@ -0,0 +1,41 @@
+# Generated by Django 4.2.16 on 2026-10-16 20:25
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('influencers', '0022_influencer_search_text'),
+        ('deals', '0003_alter_deal_tracking_url'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InfluencerDealRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(help_text='First day of the month')),
+                ('platform', models.CharField(blank=True, default='', max_length=20)),
+                ('deals_count', models.IntegerField(default=0)),
+                ('status_counts', models.JSONField(blank=True, default=dict, help_text='Current status -> deal count')),
+                ('responded_count', models.IntegerField(default=0)),
+                ('completed_count', models.IntegerField(default=0)),
+                ('earnings', models.DecimalField(decimal_places=2, default=0, help_text='Campaign cash amount of completed deals', max_digits=12)),
+                ('earnings_total_value', models.DecimalField(decimal_places=2, default=0, help_text='Campaign total value (cash + products) of completed deals', max_digits=12)),
+                ('earnings_paid', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('earnings_pending', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('earnings_processing', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('earnings_failed', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('brand_ids', models.JSONField(blank=True, default=list, help_text='Distinct brands of completed deals')),
+                ('paid_in_month', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('influencer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='deal_rollups', to='influencers.influencerprofile')),
+            ],
+            options={
+                'db_table': 'influencer_deal_rollups',
+                'unique_together': {('influencer', 'month', 'platform')},
+            },
+        ),
+    ]
@@ -136,3 +136,52 @@ class Deal(models.Model):
             self.delivered_at = timestamp
         elif new_status == 'completed':
             self.completed_at = timestamp
+
+
+class InfluencerDealRollup(models.Model):
+    """
+    Materialized deal counts and earnings per influencer, month and platform.
+
+    platform '' is the all-platforms row; a deal also counts towards each
+    platform its campaign requires, so platform rows overlap and only the ''
+    rows add up to the influencer's totals. Each deal lands in up to three
+    months: counts by invited_at, completions and earnings by completed_at
+    (accepted_at, then invited_at, when unset) and paid_in_month by
+    payment_date. Kept up to date by DealRollupService.
+    """
+    influencer = models.ForeignKey(
+        'influencers.InfluencerProfile',
+        on_delete=models.CASCADE,
+        related_name='deal_rollups'
+    )
+    month = models.DateField(help_text='First day of the month')
+    platform = models.CharField(max_length=20, blank=True, default='')
+
+    # Deals invited in the month
+    deals_count = models.IntegerField(default=0)
+    status_counts = models.JSONField(default=dict, blank=True, help_text='Current status -> deal count')
+    responded_count = models.IntegerField(default=0)
+
+    # Deals completed in the month
+    completed_count = models.IntegerField(default=0)
+    earnings = models.DecimalField(max_digits=12, decimal_places=2, default=0,
+                                   help_text='Campaign cash amount of completed deals')
+    earnings_total_value = models.DecimalField(max_digits=12, decimal_places=2, default=0,
+                                               help_text='Campaign total value (cash + products) of completed deals')
+    earnings_paid = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    earnings_pending = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    earnings_processing = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    earnings_failed = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    brand_ids = models.JSONField(default=list, blank=True, help_text='Distinct brands of completed deals')
+
+    # Completed deals paid in the month
+    paid_in_month = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'influencer_deal_rollups'
+        unique_together = ['influencer', 'month', 'platform']
+
+    def __str__(self):
+        return f"{self.platform or 'all'} {self.month:%Y-%m} rollup for influencer {self.influencer_id}"
@@ -0,0 +1,182 @@
+"""
+Influencer deal rollups.
+
+Maintains the InfluencerDealRollup rows (influencer x month x platform) that
+the influencer dashboard, performance and earnings endpoints read instead of
+aggregating over deals on every request. A refresh recomputes all rows of the
+given influencers from their deals in one pass and replaces them, so repeated
+or concurrent refreshes can't drift the way added deltas would.
+
+Usage:
+    from deals.rollups import DealRollupService
+
+    DealRollupService.schedule_refresh(deal.influencer_id)  # after commit
+    rows = DealRollupService.get_rows(influencer.id)
+    totals = DealRollupService.summarize(rows)
+"""
+
+import logging
+from collections import defaultdict
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from common.models import PLATFORM_CHOICES
+from common.transaction_utils import on_commit_once
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Deal, InfluencerDealRollup
+
+logger = logging.getLogger(__name__)
+
+ALL_PLATFORMS = ''
+PLATFORMS = {code for code, _ in PLATFORM_CHOICES}
+
+COUNT_FIELDS = ('deals_count', 'responded_count', 'completed_count')
+AMOUNT_FIELDS = (
+    'earnings', 'earnings_total_value', 'earnings_paid', 'earnings_pending',
+    'earnings_processing', 'earnings_failed', 'paid_in_month',
+)
+PAYMENT_STATUS_FIELDS = {
+    'paid': 'earnings_paid',
+    'pending': 'earnings_pending',
+    'processing': 'earnings_processing',
+    'failed': 'earnings_failed',
+}
+
+# Deal and campaign columns a refresh reads (campaign ones feed Campaign.total_value)
+DEAL_FIELDS = (
+    'influencer_id', 'status', 'invited_at', 'responded_at', 'accepted_at', 'completed_at',
+    'payment_status', 'payment_date', 'campaign__brand_id', 'campaign__deal_type',
+    'campaign__cash_amount', 'campaign__product_value', 'campaign__products',
+    'campaign__platforms_required',
+)
+
+def month_start(value) -> date:
+    return value.date().replace(day=1)
+
+
+def last_months(count: int, now=None) -> List[date]:
+    """First days of the last `count` months, current month first."""
+    month = (now or timezone.now()).date().replace(day=1)
+    months = []
+    for _ in range(count):
+        months.append(month)
+        month = (month - timedelta(days=1)).replace(day=1)
+    return months
+
+
+def _empty_row() -> Dict:
+    row = {field: 0 for field in COUNT_FIELDS}
+    row.update({field: Decimal('0.00') for field in AMOUNT_FIELDS})
+    row['status_counts'] = {}
+    row['brand_ids'] = set()
+    return row
+
+
+class DealRollupService:
+    """Builds and reads per-influencer monthly deal rollups."""
+
+    @staticmethod
+    def compute_rows(deals: Iterable[Deal]) -> Dict[Tuple[int, date, str], Dict]:
+        """Rollup values keyed by (influencer_id, month, platform) for the given deals."""
+        rows = defaultdict(_empty_row)
+        for deal in deals:
+            campaign = deal.campaign
+            platforms = [ALL_PLATFORMS] + sorted(
+                platform for platform in set(campaign.platforms_required or [])
+                if isinstance(platform, str) and platform in PLATFORMS
+            )
+            for platform in platforms:
+                row = rows[(deal.influencer_id, month_start(deal.invited_at), platform)]
+                row['deals_count'] += 1
+                row['status_counts'][deal.status] = row['status_counts'].get(deal.status, 0) + 1
+                if deal.responded_at:
+                    row['responded_count'] += 1
+
+                if deal.status != 'completed':
+                    continue
+                completed_on = deal.completed_at or deal.accepted_at or deal.invited_at
+                row = rows[(deal.influencer_id, month_start(completed_on), platform)]
+                row['completed_count'] += 1
+                row['earnings'] += campaign.cash_amount
+                row['earnings_total_value'] += Decimal(str(campaign.total_value))
+                if deal.payment_status in PAYMENT_STATUS_FIELDS:
+                    row[PAYMENT_STATUS_FIELDS[deal.payment_status]] += campaign.cash_amount
+                row['brand_ids'].add(campaign.brand_id)
+
+                if deal.payment_status == 'paid' and deal.payment_date:
+                    rows[(deal.influencer_id, month_start(deal.payment_date), platform)]['paid_in_month'] += (
+                        campaign.cash_amount
+                    )
+        return rows
+
+    @staticmethod
+    def refresh(influencer_ids: Iterable[int]) -> int:
+        """Recompute and replace the rollup rows of the given influencers. Returns the row count."""
+        from influencers.models import InfluencerProfile
+
+        influencer_ids = sorted(set(influencer_ids))
+        if not influencer_ids:
+            return 0
+
+        with transaction.atomic():
+            # Serialize refreshes of the same influencer; the rows are deleted and re-inserted
+            list(InfluencerProfile.objects.select_for_update().filter(id__in=influencer_ids)
+                 .order_by('id').values_list('id', flat=True))
+            deals = Deal.objects.filter(influencer_id__in=influencer_ids).select_related('campaign').only(*DEAL_FIELDS)
+            rows = DealRollupService.compute_rows(deals.iterator(chunk_size=2000))
+
+            InfluencerDealRollup.objects.filter(influencer_id__in=influencer_ids).delete()
+            InfluencerDealRollup.objects.bulk_create([
+                InfluencerDealRollup(
+                    influencer_id=influencer_id,
+                    month=month,
+                    platform=platform,
+                    **{**values, 'brand_ids': sorted(values['brand_ids'])},
+                )
+                for (influencer_id, month, platform), values in rows.items()
+            ], batch_size=1000)
+        return len(rows)
+
+    @staticmethod
+    def schedule_refresh(*influencer_ids: int) -> None:
+        """
+        Refresh the influencers' rollups once the current transaction commits.
+
+        Every refresh queued in one transaction (e.g. a bulk status update)
+        runs as a single batched refresh.
+        """
+        on_commit_once('deal_rollups', influencer_ids, DealRollupService.refresh)
+
+    @staticmethod
+    def get_rows(influencer_id: int, since: Optional[date] = None) -> List[Dict]:
+        """Rollup rows of an influencer, every platform included, optionally from a month on."""
+        rows = InfluencerDealRollup.objects.filter(influencer_id=influencer_id)
+        if since is not None:
+            rows = rows.filter(month__gte=since)
+        return list(rows.values('month', 'platform', 'status_counts', 'brand_ids', *COUNT_FIELDS, *AMOUNT_FIELDS))
+
+    @staticmethod
+    def summarize(rows: List[Dict], platform: str = ALL_PLATFORMS) -> Dict:
+        """Totals of one platform's rows, with status_counts merged and brand_ids as a set."""
+        totals = _empty_row()
+        for row in rows:
+            if row['platform'] != platform:
+                continue
+            for field in (*COUNT_FIELDS, *AMOUNT_FIELDS):
+                totals[field] += row[field]
+            for deal_status, count in row['status_counts'].items():
+                totals['status_counts'][deal_status] = totals['status_counts'].get(deal_status, 0) + count
+            totals['brand_ids'].update(row['brand_ids'])
+        return totals
+
+    @staticmethod
+    def by_month(rows: List[Dict], platform: str = ALL_PLATFORMS) -> Dict[date, Dict]:
+        """One platform's rows keyed by month; months without deals are absent."""
+        return {row['month']: row for row in rows if row['platform'] == platform}
+
+    @staticmethod
+    def count_statuses(totals: Dict, statuses: Iterable[str]) -> int:
+        return sum(totals['status_counts'].get(deal_status, 0) for deal_status in statuses)
@@ -0,0 +1,27 @@
+"""
+Signal receivers that keep influencer deal rollups in sync.
+"""
+
+from campaigns.models import Campaign
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Deal
+from .rollups import DealRollupService
+
+# Campaign fields the rollups read
+ROLLUP_CAMPAIGN_FIELDS = {'brand', 'deal_type', 'cash_amount', 'product_value', 'products', 'platforms_required'}
+
+
+@receiver(post_save, sender=Deal)
+@receiver(post_delete, sender=Deal)
+def refresh_rollups_on_deal_change(sender, instance, **kwargs):
+    # Status (set_status_with_timestamp) and payment changes are saved through here
+    DealRollupService.schedule_refresh(instance.influencer_id)
+
+
+@receiver(post_save, sender=Campaign)
+def refresh_rollups_on_campaign_save(sender, instance, created=False, update_fields=None, **kwargs):
+    if created or (update_fields and not set(update_fields) & ROLLUP_CAMPAIGN_FIELDS):
+        return
+    DealRollupService.schedule_refresh(*instance.deals.values_list('influencer_id', flat=True))
@@ -1,5 +1,6 @@
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime
+from decimal import Decimal
 
 from common.api_response import api_response, format_serializer_errors
 from common.cache_utils import CacheManager
@@ -10,17 +11,19 @@ from common.decorators import (
     log_performance
 )
 from content.models import ContentSubmission
-from django.db.models import Q, Sum
-from django.db.models.functions import Coalesce
+from django.db.models import Q
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from influencers.models import InfluencerProfile, SocialMediaAccount
+from messaging.history import MessageCursorPagination
 from messaging.models import Conversation, Message
+from messaging.realtime import broadcast_new_message, mark_conversation_read
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import IsAuthenticated
 
 from .models import Deal
+from .rollups import DealRollupService, last_months
 from .serializers import (
     DealListSerializer, DealDetailSerializer, DealActionSerializer,
     DealTimelineSerializer, EarningsPaymentSerializer, CollaborationHistorySerializer,
@@ -54,7 +57,7 @@ def deals_list_view(request):
 
     # Get base queryset
     queryset = Deal.objects.filter(influencer=profile).select_related(
-        'campaign__brand'
+        'campaign__brand', 'conversation__last_message__sender_user'
     ).order_by('-invited_at')
 
     # Apply filters
@@ -303,7 +306,7 @@ def recent_deals_view(request):
     # Get recent deals (last 30 days or latest 10)
     recent_deals = Deal.objects.filter(
         influencer=profile
-    ).select_related('campaign__brand').order_by('-invited_at')[:10]
+    ).select_related('campaign__brand', 'conversation__last_message__sender_user').order_by('-invited_at')[:10]
 
     serializer = DealListSerializer(recent_deals, many=True, context={'request': request})
 
@@ -387,49 +390,29 @@ def earnings_tracking_view(request):
     except InfluencerProfile.DoesNotExist:
         return api_response(False, error='Influencer profile not found.', status_code=404)
 
-    # Get deals with earnings
-    deals = Deal.objects.filter(influencer=profile, status='completed')
+    # Earnings of completed deals by payment status, from the monthly rollups
+    rows = DealRollupService.get_rows(profile.id)
+    totals = DealRollupService.summarize(rows)
+    paid_earnings = totals['earnings_paid']
+    pending_earnings = totals['earnings_pending']
+    processing_earnings = totals['earnings_processing']
+    failed_earnings = totals['earnings_failed']
 
-    # Calculate earnings by status
-    from decimal import Decimal
-    paid_earnings = deals.filter(payment_status='paid').aggregate(
-        total=Coalesce(Sum('campaign__cash_amount'), Decimal('0.00'))
-    )['total'] or Decimal('0.00')
-
-    pending_earnings = deals.filter(payment_status='pending').aggregate(
-        total=Coalesce(Sum('campaign__cash_amount'), Decimal('0.00'))
-    )['total'] or Decimal('0.00')
-
-    processing_earnings = deals.filter(payment_status='processing').aggregate(
-        total=Coalesce(Sum('campaign__cash_amount'), Decimal('0.00'))
-    )['total'] or Decimal('0.00')
-
-    failed_earnings = deals.filter(payment_status='failed').aggregate(
-        total=Coalesce(Sum('campaign__cash_amount'), Decimal('0.00'))
-    )['total'] or Decimal('0.00')
-
-    # Monthly earnings breakdown (last 12 months)
+    # Monthly earnings breakdown (last 12 months), by payment date
+    monthly_rows = DealRollupService.by_month(rows)
     monthly_earnings = []
-    for i in range(12):
-        month_start = (timezone.now().replace(day=1) - timedelta(days=32 * i)).replace(day=1)
-        month_end = (month_start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
-
-        month_total = deals.filter(
-            payment_status='paid',
-            payment_date__gte=month_start,
-            payment_date__lte=month_end
-        ).aggregate(
-            total=Coalesce(Sum('campaign__cash_amount'), Decimal('0.00'))
-        )['total'] or Decimal('0.00')
-
+    for month_start in last_months(12):
+        month = monthly_rows.get(month_start)
         monthly_earnings.append({
             'month': month_start.strftime('%Y-%m'),
             'month_name': month_start.strftime('%B %Y'),
-            'earnings': month_total
+            'earnings': month['paid_in_month'] if month else Decimal('0.00')
         })
 
     # Recent payments
-    recent_payments = deals.filter(
+    recent_payments = Deal.objects.filter(
+        influencer=profile,
+        status='completed',
         payment_status='paid',
         payment_date__isnull=False
     ).order_by('-payment_date')[:10]
@@ -468,18 +451,24 @@ def deal_messages_view(request, deal_id):
 
     if request.method == 'GET':
         # Get all messages in this conversation
-        messages = Message.objects.filter(conversation=conversation).order_by('created_at')
+        messages = Message.objects.filter(conversation=conversation).select_related('sender_user').order_by('created_at')
 
         # Mark messages as read based on user type
-        if is_brand_user:
-            messages.filter(sender_type='influencer', read_by_brand=False).update(read_by_brand=True)
-        elif is_influencer:
-            messages.filter(sender_type='brand', read_by_influencer=False).update(read_by_influencer=True)
-
-        serialized_messages = MessageSerializer(messages, many=True).data
+        mark_conversation_read(conversation, 'brand' if is_brand_user else 'influencer')
+
+        # Opt-in cursor paging (limit/before/after); the page is returned oldest first like the full list
+        cursor_data = {}
+        if MessageCursorPagination.is_requested(request):
+            paginator = MessageCursorPagination(conversation)
+            page = paginator.paginate_queryset(messages, request)
+            serialized_messages = MessageSerializer(list(reversed(page)), many=True).data
+            cursor_data = paginator.get_cursor_data()
+        else:
+            serialized_messages = MessageSerializer(messages, many=True).data
 
         return api_response(True, {
             'messages': serialized_messages,
+            **cursor_data,
             'conversation_id': conversation.id,
             'deal_title': deal.campaign.title,
             'brand_name': deal.campaign.brand.name,
@@ -512,6 +501,8 @@ def deal_messages_view(request, deal_id):
             read_by_influencer=is_influencer  # Mark as read by sender
         )
 
+        broadcast_new_message(message, deal)
+
         # Serialize the message
         serialized_message = MessageSerializer(message).data
 
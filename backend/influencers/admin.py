@@ -1176,9 +1176,11 @@ class SocialMediaAccountAdmin(admin.ModelAdmin):
             try:
                 from communications.social_scraping_service import get_social_scraping_service
                 scraping_service = get_social_scraping_service()
+                from communications.scrape_request_registry import ScrapeRequestRegistry
                 message_id = scraping_service.queue_scrape_request(account, priority='high')
 
-                if message_id:
+                # No message id but a registry entry: coalesced into a request already in flight
+                if message_id or ScrapeRequestRegistry.get_state(account.platform, account.handle):
                     html = f"""
                     <!DOCTYPE html>
                     <html>
@@ -1192,7 +1194,7 @@ class SocialMediaAccountAdmin(admin.ModelAdmin):
                     <body>
                         <h2 class="success">✓ Sync Queued Successfully</h2>
                         <p>Account: {account.handle} ({account.platform})</p>
-                        <p>Message ID: {message_id}</p>
+                        <p>Message ID: {message_id or 'already in flight'}</p>
                         <p>This window will close automatically...</p>
                         <script>
                             setTimeout(function() {{ window.close(); }}, 2000);
@@ -1278,6 +1280,7 @@ class SocialMediaAccountAdmin(admin.ModelAdmin):
 
     def queue_sync_selected(self, request, queryset):
         """Bulk action to queue sync for selected accounts"""
+        from communications.scrape_request_registry import ScrapeRequestRegistry
         from communications.social_scraping_service import get_social_scraping_service
 
         success_count = 0
@@ -1296,7 +1299,7 @@ class SocialMediaAccountAdmin(admin.ModelAdmin):
 
             try:
                 message_id = scraping_service.queue_scrape_request(account, priority='high')
-                if message_id:
+                if message_id or ScrapeRequestRegistry.get_state(account.platform, account.handle):
                     success_count += 1
                 else:
                     error_count += 1
@@ -0,0 +1,135 @@
+import random
+import statistics
+import time
+
+from common.models import Industry
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from influencers.models import InfluencerProfile, InfluencerSearchDocument, SocialMediaAccount
+from influencers.services.search_backends import BasicSearchBackend, PostgresSearchBackend
+from influencers.services.search_index_service import SEARCH_VECTOR, InfluencerSearchIndexService
+from users.models import UserProfile
+
+FIRST_NAMES = ['Aarav', 'Priya', 'Rohan', 'Ananya', 'Vikram', 'Sneha', 'Arjun', 'Kavya', 'Rahul', 'Isha']
+LAST_NAMES = ['Sharma', 'Verma', 'Gupta', 'Iyer', 'Reddy', 'Nair', 'Kapoor', 'Mehta', 'Joshi', 'Singh']
+KEYWORDS = ['fitness', 'travel', 'food', 'fashion', 'tech', 'gaming', 'beauty', 'music', 'finance', 'comedy']
+PLATFORMS = ['instagram', 'youtube', 'twitter']
+
+DEFAULT_QUERIES = ['priya', 'sharm', 'priya sharma', '@bench_12', 'fitness', 'gaming travel', 'rahul']
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Benchmark influencer text search backends on a synthetic corpus (rolled back afterwards)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--size', type=int, default=100000, help='Number of synthetic influencers')
+        parser.add_argument('--runs', type=int, default=20, help='Timed runs per query and backend')
+        parser.add_argument('--batch-size', type=int, default=2000, help='Rows per bulk insert')
+        parser.add_argument('--query', action='append', dest='queries', help='Search term (can be repeated)')
+        parser.add_argument('--keep', action='store_true', help='Keep the synthetic corpus instead of rolling back')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('The search benchmark needs a PostgreSQL database')
+
+        queries = options['queries'] or DEFAULT_QUERIES
+        try:
+            with transaction.atomic():
+                self._generate_corpus(options['size'], options['batch_size'])
+                with connection.cursor() as cursor:
+                    cursor.execute('ANALYZE')
+
+                for query in queries:
+                    self._benchmark_query(query, options['runs'])
+
+                if not options['keep']:
+                    raise _Rollback()
+        except _Rollback:
+            self.stdout.write('Synthetic corpus rolled back')
+
+    def _generate_corpus(self, size, batch_size):
+        self.stdout.write(f'Generating {size} synthetic influencers...')
+        rng = random.Random(42)
+        industry, _ = Industry.objects.get_or_create(key='benchmark', defaults={'name': 'Benchmark'})
+        start = time.perf_counter()
+
+        for offset in range(0, size, batch_size):
+            count = min(batch_size, size - offset)
+            users = User.objects.bulk_create([
+                User(
+                    username=f'bench_user_{offset + i}',
+                    first_name=rng.choice(FIRST_NAMES),
+                    last_name=rng.choice(LAST_NAMES),
+                    email=f'bench_user_{offset + i}@bench.invalid',
+                )
+                for i in range(count)
+            ])
+            user_profiles = UserProfile.objects.bulk_create([
+                UserProfile(user=user, phone_number=f'7{offset + i:09d}')
+                for i, user in enumerate(users)
+            ])
+            profiles = InfluencerProfile.objects.bulk_create([
+                InfluencerProfile(
+                    user=user,
+                    user_profile=user_profile,
+                    industry=industry,
+                    bio=f"{' and '.join(rng.sample(KEYWORDS, 2))} creator",
+                    content_keywords=rng.sample(KEYWORDS, 3),
+                )
+                for user, user_profile in zip(users, user_profiles)
+            ])
+
+            accounts = []
+            for profile in profiles:
+                for platform in rng.sample(PLATFORMS, rng.randint(1, len(PLATFORMS))):
+                    accounts.append(SocialMediaAccount(
+                        influencer=profile,
+                        platform=platform,
+                        handle=f'bench_{profile.id}_{platform[:2]}',
+                        followers_count=rng.randint(100, 2000000),
+                        engagement_rate=round(rng.uniform(0, 15), 2),
+                    ))
+            SocialMediaAccount.objects.bulk_create(accounts)
+
+            accounts_by_influencer = {}
+            for account in accounts:
+                accounts_by_influencer.setdefault(account.influencer_id, []).append(account)
+            InfluencerSearchDocument.objects.bulk_create([
+                InfluencerSearchDocument(
+                    influencer=profile,
+                    **InfluencerSearchIndexService.compute_account_metrics(accounts_by_influencer[profile.id]),
+                    **InfluencerSearchIndexService.compute_search_text(profile, accounts_by_influencer[profile.id]),
+                )
+                for profile in profiles
+            ])
+
+        InfluencerSearchDocument.objects.filter(influencer__industry=industry).update(search_vector=SEARCH_VECTOR)
+        self.stdout.write(f'Corpus ready in {time.perf_counter() - start:.1f}s')
+
+    def _benchmark_query(self, query, runs):
+        base = InfluencerProfile.objects.all()
+        backends = [
+            (BasicSearchBackend(), '-id'),
+            (PostgresSearchBackend(), '-search_rank'),
+        ]
+
+        for backend, ordering in backends:
+            timings = []
+            for _ in range(runs):
+                start = time.perf_counter()
+                queryset = backend.apply(base, query)
+                total = queryset.count()
+                list(queryset.order_by(ordering, '-id').values_list('id', flat=True)[:20])
+                timings.append((time.perf_counter() - start) * 1000)
+
+            timings.sort()
+            p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+            self.stdout.write(
+                f'{query!r:20} {backend.name:9} matches={total:<7} '
+                f'median={statistics.median(timings):8.1f}ms p95={p95:8.1f}ms'
+            )
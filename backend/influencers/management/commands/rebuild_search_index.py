@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from influencers.models import InfluencerProfile
+from influencers.services.search_index_service import InfluencerSearchIndexService
+
+
+class Command(BaseCommand):
+    help = 'Rebuild influencer search documents used by influencer search'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--influencer-id',
+            type=int,
+            action='append',
+            dest='influencer_ids',
+            help='Only rebuild the given influencer (can be repeated)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Number of influencers to load per database round trip',
+        )
+
+    def handle(self, *args, **options):
+        queryset = InfluencerProfile.objects.all()
+        if options['influencer_ids']:
+            queryset = queryset.filter(id__in=options['influencer_ids'])
+
+        self.stdout.write('Rebuilding influencer search documents...')
+        rebuilt = InfluencerSearchIndexService.rebuild(queryset, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {rebuilt} search documents'))
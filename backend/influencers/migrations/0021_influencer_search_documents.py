@@ -0,0 +1,61 @@
+# Generated by Django 4.2.16 on 2026-10-16 19:18
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('influencers', '0020_influencerprofile_verification_rejection_reason_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InfluencerSearchDocument',
+            fields=[
+                ('influencer', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='search_document', serialize=False, to='influencers.influencerprofile')),
+                ('total_followers', models.BigIntegerField(default=0)),
+                ('average_engagement_rate', models.FloatField(default=0.0)),
+                ('average_likes', models.FloatField(default=0.0)),
+                ('average_comments', models.FloatField(default=0.0)),
+                ('average_video_views', models.FloatField(default=0.0)),
+                ('posts_count', models.IntegerField(default=0)),
+                ('last_posted_at', models.DateTimeField(blank=True, null=True)),
+                ('active_accounts_count', models.IntegerField(default=0)),
+                ('has_platform_verified', models.BooleanField(default=False)),
+                ('has_verified_account', models.BooleanField(default=False)),
+                ('rule_scores', models.JSONField(blank=True, default=dict)),
+                ('recommendation_score', models.FloatField(default=0.0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'influencer_search_documents',
+                'indexes': [models.Index(fields=['-recommendation_score', '-total_followers', 'influencer'], name='isd_recommendation_idx'), models.Index(fields=['total_followers'], name='influencer__total_f_907218_idx'), models.Index(fields=['average_engagement_rate'], name='influencer__average_b7871f_idx'), models.Index(fields=['last_posted_at'], name='influencer__last_po_b5d95c_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='InfluencerPlatformSearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('platform', models.CharField(choices=[('instagram', 'Instagram'), ('youtube', 'YouTube'), ('tiktok', 'TikTok'), ('twitter', 'Twitter'), ('facebook', 'Facebook'), ('linkedin', 'LinkedIn'), ('snapchat', 'Snapchat'), ('pinterest', 'Pinterest')], max_length=20)),
+                ('total_followers', models.BigIntegerField(default=0)),
+                ('average_engagement_rate', models.FloatField(default=0.0)),
+                ('average_likes', models.FloatField(default=0.0)),
+                ('average_comments', models.FloatField(default=0.0)),
+                ('average_video_views', models.FloatField(default=0.0)),
+                ('posts_count', models.IntegerField(default=0)),
+                ('last_posted_at', models.DateTimeField(blank=True, null=True)),
+                ('has_platform_verified', models.BooleanField(default=False)),
+                ('has_verified_account', models.BooleanField(default=False)),
+                ('rule_scores', models.JSONField(blank=True, default=dict)),
+                ('recommendation_score', models.FloatField(default=0.0)),
+                ('influencer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='platform_search_documents', to='influencers.influencerprofile')),
+            ],
+            options={
+                'db_table': 'influencer_platform_search_documents',
+                'indexes': [models.Index(fields=['platform', '-recommendation_score', '-total_followers'], name='ipsd_recommendation_idx')],
+                'unique_together': {('influencer', 'platform')},
+            },
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 4.2.16 on 2026-10-16 19:25
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import TrigramExtension
+import django.contrib.postgres.search
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('influencers', '0021_influencer_search_documents'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='influencersearchdocument',
+            name='search_bio',
+            field=models.TextField(blank=True, default=''),
+        ),
+        migrations.AddField(
+            model_name='influencersearchdocument',
+            name='search_handles',
+            field=models.TextField(blank=True, default='', help_text='Active social handles, each prefixed with a space for prefix matching'),
+        ),
+        migrations.AddField(
+            model_name='influencersearchdocument',
+            name='search_keywords',
+            field=models.TextField(blank=True, default='', help_text='Industry and keyword lists'),
+        ),
+        migrations.AddField(
+            model_name='influencersearchdocument',
+            name='search_names',
+            field=models.TextField(blank=True, default='', help_text='Full name and username'),
+        ),
+        migrations.AddField(
+            model_name='influencersearchdocument',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='influencersearchdocument',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='isd_search_vector_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='influencersearchdocument',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_names'], name='isd_search_names_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='influencersearchdocument',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_handles'], name='isd_search_handles_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+    ]
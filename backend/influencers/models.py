@@ -1,5 +1,7 @@
 from backend.storage_backends import private_media_storage, private_upload_path
 from common.models import Industry, ContentCategory, PLATFORM_CHOICES
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.db import models
 
@@ -514,3 +516,108 @@ class InfluencerCategoryScore(models.Model):
 
     def __str__(self):
         return f"{self.influencer.user.username} - {self.category_name} ({self.score}%)"
+
+
+class InfluencerSearchDocument(models.Model):
+    """
+    Denormalized search row for an influencer.
+
+    Holds the aggregated social metrics, verification flags and ranking rule
+    scores that the search endpoint used to compute with GROUP BY on every
+    request. Kept up to date by InfluencerSearchIndexService.
+    """
+    influencer = models.OneToOneField(
+        InfluencerProfile,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='search_document'
+    )
+
+    # Aggregates over active social accounts
+    total_followers = models.BigIntegerField(default=0)
+    average_engagement_rate = models.FloatField(default=0.0)
+    average_likes = models.FloatField(default=0.0)
+    average_comments = models.FloatField(default=0.0)
+    average_video_views = models.FloatField(default=0.0)
+    posts_count = models.IntegerField(default=0)
+    last_posted_at = models.DateTimeField(null=True, blank=True)
+    active_accounts_count = models.IntegerField(default=0)
+
+    # Verification flags
+    has_platform_verified = models.BooleanField(default=False)
+    has_verified_account = models.BooleanField(default=False)
+
+    # Ranking rule scores, keyed by RankingRule.annotation_name
+    rule_scores = models.JSONField(default=dict, blank=True)
+    recommendation_score = models.FloatField(default=0.0)
+
+    # Text search: source text per weight class and the tsvector built from it
+    search_names = models.TextField(blank=True, default='', help_text='Full name and username')
+    search_handles = models.TextField(
+        blank=True,
+        default='',
+        help_text='Active social handles, each prefixed with a space for prefix matching'
+    )
+    search_keywords = models.TextField(blank=True, default='', help_text='Industry and keyword lists')
+    search_bio = models.TextField(blank=True, default='')
+    search_vector = SearchVectorField(null=True, blank=True)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'influencer_search_documents'
+        indexes = [
+            models.Index(
+                fields=['-recommendation_score', '-total_followers', 'influencer'],
+                name='isd_recommendation_idx',
+            ),
+            models.Index(fields=['total_followers']),
+            models.Index(fields=['average_engagement_rate']),
+            models.Index(fields=['last_posted_at']),
+            GinIndex(fields=['search_vector'], name='isd_search_vector_idx'),
+            GinIndex(fields=['search_names'], name='isd_search_names_trgm_idx', opclasses=['gin_trgm_ops']),
+            GinIndex(fields=['search_handles'], name='isd_search_handles_trgm_idx', opclasses=['gin_trgm_ops']),
+        ]
+
+    def __str__(self):
+        return f"Search document for influencer {self.influencer_id} ({self.recommendation_score})"
+
+
+class InfluencerPlatformSearchDocument(models.Model):
+    """
+    Per-platform slice of an influencer's search document, used when a
+    search is restricted to a single platform.
+    """
+    influencer = models.ForeignKey(
+        InfluencerProfile,
+        on_delete=models.CASCADE,
+        related_name='platform_search_documents'
+    )
+    platform = models.CharField(max_length=20, choices=PLATFORM_CHOICES)
+
+    total_followers = models.BigIntegerField(default=0)
+    average_engagement_rate = models.FloatField(default=0.0)
+    average_likes = models.FloatField(default=0.0)
+    average_comments = models.FloatField(default=0.0)
+    average_video_views = models.FloatField(default=0.0)
+    posts_count = models.IntegerField(default=0)
+    last_posted_at = models.DateTimeField(null=True, blank=True)
+
+    has_platform_verified = models.BooleanField(default=False)
+    has_verified_account = models.BooleanField(default=False)
+
+    rule_scores = models.JSONField(default=dict, blank=True)
+    recommendation_score = models.FloatField(default=0.0)
+
+    class Meta:
+        db_table = 'influencer_platform_search_documents'
+        unique_together = ['influencer', 'platform']
+        indexes = [
+            models.Index(
+                fields=['platform', '-recommendation_score', '-total_followers'],
+                name='ipsd_recommendation_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.platform} search document for influencer {self.influencer_id}"
@@ -1518,12 +1518,45 @@ class InfluencerPublicProfileSerializer(serializers.ModelSerializer):
         }
 
 
+class InfluencerSearchListSerializer(serializers.ListSerializer):
+    """
+    List serializer for search result pages.
+
+    Loads the requesting brand's bookmarks for the whole page in one query so
+    that rows serialize without per-influencer lookups. Social accounts are read
+    from the queryset's prefetch_related('social_accounts') cache.
+    """
+
+    def to_representation(self, data):
+        iterable = data.all() if isinstance(data, models.manager.BaseManager) else data
+        influencers = list(iterable)
+        self.context['bookmarked_influencer_ids'] = self._load_bookmarked_ids(influencers)
+        return super().to_representation(influencers)
+
+    def _load_bookmarked_ids(self, influencers):
+        request = self.context.get('request')
+        brand_user = getattr(getattr(request, 'user', None), 'brand_user', None) if request else None
+        if not brand_user or not influencers:
+            return set()
+
+        from brands.models import BookmarkedInfluencer
+        return set(
+            BookmarkedInfluencer.objects.filter(
+                brand_id=brand_user.brand_id,
+                influencer_id__in=[influencer.id for influencer in influencers]
+            ).values_list('influencer_id', flat=True)
+        )
+
+
 class InfluencerSearchSerializer(serializers.ModelSerializer):
     """
     Serializer for influencer search results with comprehensive data.
 
     Supports platform-specific metrics when a platform filter is applied.
     Pass 'platforms_filter' in context to get metrics specific to those platforms.
+
+    Social account data is derived from the prefetched social_accounts, so list
+    serialization issues a constant number of queries per page.
     """
     username = serializers.CharField(source='user.username', read_only=True)
     full_name = serializers.SerializerMethodField()
@@ -1561,19 +1594,29 @@ class InfluencerSearchSerializer(serializers.ModelSerializer):
             'rate_per_post', 'is_bookmarked', 'platform_verified_platforms', 'verified_platforms',
             'avg_likes', 'avg_comments', 'avg_views', 'recommendation_score'
         ]
+        list_serializer_class = InfluencerSearchListSerializer
 
     def _get_platforms_filter(self):
         """Get the platform filter from context."""
         return self.context.get('platforms_filter', [])
 
+    def _get_active_accounts(self, obj):
+        """Active social accounts, read from the prefetch cache when available."""
+        return [account for account in obj.social_accounts.all() if account.is_active]
+
     def _get_filtered_accounts(self, obj):
-        """Get social accounts filtered by platform if filter is set."""
+        """Get active social accounts filtered by platform if filter is set."""
         platforms = self._get_platforms_filter()
-        accounts = obj.social_accounts.filter(is_active=True)
+        accounts = self._get_active_accounts(obj)
         if platforms:
-            accounts = accounts.filter(platform__in=platforms)
+            accounts = [account for account in accounts if account.platform in platforms]
         return accounts
 
+    @staticmethod
+    def _average(accounts, field):
+        values = [getattr(account, field) or 0 for account in accounts]
+        return sum(values) / len(values) if values else None
+
     def get_full_name(self, obj):
         """Get influencer's full name"""
         first_name = obj.user.first_name or ''
@@ -1613,9 +1656,10 @@ class InfluencerSearchSerializer(serializers.ModelSerializer):
         Lightweight list of active social accounts so the frontend can open the
         real Instagram/YouTube/etc profile URL (not derived from TickTime username).
         """
-        return list(
-            obj.social_accounts.filter(is_active=True).values('platform', 'handle', 'profile_url')
-        )
+        return [
+            {'platform': account.platform, 'handle': account.handle, 'profile_url': account.profile_url}
+            for account in self._get_active_accounts(obj)
+        ]
 
     def get_total_followers(self, obj):
         """
@@ -1628,8 +1672,7 @@ class InfluencerSearchSerializer(serializers.ModelSerializer):
 
         # Fallback: calculate from filtered accounts
         accounts = self._get_filtered_accounts(obj)
-        total = accounts.aggregate(total=models.Sum('followers_count'))['total']
-        return total or 0
+        return sum(account.followers_count or 0 for account in accounts)
 
     def get_avg_engagement(self, obj):
         """
@@ -1641,8 +1684,7 @@ class InfluencerSearchSerializer(serializers.ModelSerializer):
             return round(float(obj.average_engagement_rate_annotated), 2)
 
         # Fallback: calculate from filtered accounts
-        accounts = self._get_filtered_accounts(obj)
-        avg = accounts.aggregate(avg=models.Avg('engagement_rate'))['avg']
+        avg = self._average(self._get_filtered_accounts(obj), 'engagement_rate')
         return round(float(avg), 2) if avg else 0.0
 
     def get_avg_likes(self, obj):
@@ -1655,8 +1697,7 @@ class InfluencerSearchSerializer(serializers.ModelSerializer):
             return int(obj.average_likes_annotated)
 
         # Fallback: calculate from filtered accounts
-        accounts = self._get_filtered_accounts(obj)
-        avg = accounts.aggregate(avg=models.Avg('average_likes'))['avg']
+        avg = self._average(self._get_filtered_accounts(obj), 'average_likes')
         return int(avg) if avg else 0
 
     def get_avg_comments(self, obj):
@@ -1669,8 +1710,7 @@ class InfluencerSearchSerializer(serializers.ModelSerializer):
             return int(obj.average_comments_annotated)
 
         # Fallback: calculate from filtered accounts
-        accounts = self._get_filtered_accounts(obj)
-        avg = accounts.aggregate(avg=models.Avg('average_comments'))['avg']
+        avg = self._average(self._get_filtered_accounts(obj), 'average_comments')
         return int(avg) if avg else 0
 
     def get_avg_views(self, obj):
@@ -1683,31 +1723,22 @@ class InfluencerSearchSerializer(serializers.ModelSerializer):
             return int(obj.average_video_views_annotated)
 
         # Fallback: calculate from filtered accounts
-        accounts = self._get_filtered_accounts(obj)
-        avg = accounts.aggregate(avg=models.Avg('average_video_views'))['avg']
+        avg = self._average(self._get_filtered_accounts(obj), 'average_video_views')
         return int(avg) if avg else 0
 
     def get_platforms(self, obj):
         """Get list of active platforms"""
-        return list(obj.social_accounts.filter(is_active=True).values_list('platform', flat=True))
+        return [account.platform for account in self._get_active_accounts(obj)]
 
     def get_platform_verified_platforms(self, obj):
         """Get list of platforms where the influencer is verified on that platform (blue tick, etc.)."""
         accounts = self._get_filtered_accounts(obj)
-        return list(
-            accounts.filter(platform_verified=True)
-            .values_list('platform', flat=True)
-            .distinct()
-        )
+        return list(dict.fromkeys(account.platform for account in accounts if account.platform_verified))
 
     def get_verified_platforms(self, obj):
         """Get list of platforms where the influencer is verified by TickTime (SocialMediaAccount.verified)."""
         accounts = self._get_filtered_accounts(obj)
-        return list(
-            accounts.filter(verified=True)
-            .values_list('platform', flat=True)
-            .distinct()
-        )
+        return list(dict.fromkeys(account.platform for account in accounts if account.verified))
 
     def get_avg_rating(self, obj):
         """Get average rating as a number"""
@@ -1726,11 +1757,14 @@ class InfluencerSearchSerializer(serializers.ModelSerializer):
 
         # Fallback: calculate from filtered accounts
         accounts = self._get_filtered_accounts(obj)
-        total = accounts.aggregate(total=models.Sum('posts_count'))['total']
-        return total or 0
+        return sum(account.posts_count or 0 for account in accounts)
 
     def get_is_bookmarked(self, obj):
         """Check if influencer is bookmarked by the current brand"""
+        bookmarked_ids = self.context.get('bookmarked_influencer_ids')
+        if bookmarked_ids is not None:
+            return obj.id in bookmarked_ids
+
         request = self.context.get('request')
         if request and hasattr(request, 'user') and hasattr(request.user, 'brand_user'):
             from brands.models import BookmarkedInfluencer
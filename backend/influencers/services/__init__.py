@@ -7,6 +7,9 @@ This module contains service classes for influencer-related business logic.
 from .engagement import calculate_engagement_metrics
 from .recommendation import RecommendationService, RecommendationFilterService
 from .search_service import InfluencerSearchService
+from .search_index_service import InfluencerSearchIndexService
+from .search_cache_service import InfluencerSearchCacheService
+from .search_backends import get_search_backend
 from .profile_service import InfluencerProfileService
 from .social_account_service import SocialMediaAccountService
 from .bookmark_service import BookmarkService
@@ -20,6 +23,9 @@ __all__ = [
     'RecommendationService',
     'RecommendationFilterService',
     'InfluencerSearchService',
+    'InfluencerSearchIndexService',
+    'InfluencerSearchCacheService',
+    'get_search_backend',
     'InfluencerProfileService',
     'SocialMediaAccountService',
     'BookmarkService',
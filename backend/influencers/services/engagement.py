@@ -70,7 +70,14 @@ def calculate_engagement_metrics(account: SocialMediaAccount) -> Dict[str, float
     """
     Calculate engagement metrics for a social media account using its posts.
     """
-    posts = list(account.posts.all())
+    return calculate_posts_engagement_metrics(account.posts.all(), account.followers_count)
+
+
+def calculate_posts_engagement_metrics(posts: Iterable[SocialMediaPost], followers: int) -> Dict[str, float]:
+    """
+    Calculate engagement metrics from already loaded (or not yet saved) posts.
+    """
+    posts = list(posts)
     if not posts:
         return {
             'post_engagement_rate': 0.0,
@@ -91,7 +98,7 @@ def calculate_engagement_metrics(account: SocialMediaAccount) -> Dict[str, float
     video_posts = [post for post in posts if post.post_type and post.post_type.lower() in VIDEO_TYPES]
     image_posts = [post for post in posts if post not in video_posts]
 
-    followers = account.followers_count or 0
+    followers = followers or 0
     post_metrics = _calculate_group_metrics(image_posts, followers)
     video_metrics = _calculate_group_metrics(video_posts, followers)
 
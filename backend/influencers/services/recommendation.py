@@ -16,7 +16,9 @@ from dataclasses import dataclass
 from typing import Any, Dict, List, Optional
 
 from django.db import models
-from django.db.models import Avg, Case, Count, F, Q, Sum, Value, When
+from django.db.models import (
+    Avg, Case, Count, Exists, F, FilteredRelation, Max, OuterRef, Q, Subquery, Sum, Value, When,
+)
 from django.db.models.functions import Cast, Coalesce
 
 logger = logging.getLogger(__name__)
@@ -225,6 +227,77 @@ class RecommendationService:
 
         return queryset
 
+    def apply_indexed_recommendation(
+            self,
+            queryset,
+            platform: Optional[str] = None,
+            user_sort_by: Optional[str] = None,
+            user_sort_order: str = "desc",
+    ):
+        """
+        Rank a queryset using the precomputed search documents.
+
+        Reads metrics and the recommendation score from InfluencerSearchDocument
+        (or the per-platform row when a single platform is selected) instead of
+        aggregating social accounts, so no GROUP BY is needed. The annotation
+        names match apply_recommendation() so sorting, preference filters and
+        serializers work unchanged.
+
+        Args:
+            queryset: The base queryset of InfluencerProfile objects
+            platform: Optional single platform to rank by
+            user_sort_by: User-selected sort field (if None, uses recommendation only)
+            user_sort_order: Sort order ('asc' or 'desc')
+
+        Returns:
+            Annotated and ordered queryset
+        """
+        if platform and platform != 'all':
+            queryset = queryset.annotate(
+                platform_document=FilteredRelation(
+                    'platform_search_documents',
+                    condition=Q(platform_search_documents__platform=platform),
+                )
+            ).filter(platform_document__isnull=False)
+            source = 'platform_document'
+        else:
+            source = 'search_document'
+
+        queryset = queryset.annotate(
+            total_followers_annotated=F(f'{source}__total_followers'),
+            average_engagement_rate_annotated=F(f'{source}__average_engagement_rate'),
+            average_likes_annotated=F(f'{source}__average_likes'),
+            average_comments_annotated=F(f'{source}__average_comments'),
+            average_video_views_annotated=F(f'{source}__average_video_views'),
+            posts_count_annotated=F(f'{source}__posts_count'),
+            last_posted_at_annotated=F(f'{source}__last_posted_at'),
+            recommendation_score=F(f'{source}__recommendation_score'),
+        )
+
+        if user_sort_by == 'growth_rate':
+            # Not in the search documents; a correlated MAX keeps one row per
+            # influencer where ordering on social_accounts would join them
+            from influencers.models import SocialMediaAccount
+
+            accounts = SocialMediaAccount.objects.filter(influencer=OuterRef('pk'), is_active=True)
+            if platform and platform != 'all':
+                accounts = accounts.filter(platform=platform)
+            queryset = queryset.annotate(
+                follower_growth_rate_annotated=Subquery(
+                    accounts.values('influencer').annotate(rate=Max('follower_growth_rate')).values('rate')[:1]
+                )
+            )
+
+        return self._apply_sorting(
+            queryset,
+            user_sort_by,
+            user_sort_order,
+            sort_field_overrides={
+                'recently_active': 'last_posted_at_annotated',
+                'growth_rate': 'follower_growth_rate_annotated',
+            },
+        )
+
     def _annotate_platform_metrics(self, queryset, platforms_to_consider: List[str]):
         """
         Annotate the queryset with platform-specific metrics.
@@ -538,7 +611,13 @@ class RecommendationService:
 
         return queryset
 
-    def _apply_sorting(self, queryset, user_sort_by: Optional[str], user_sort_order: str):
+    def _apply_sorting(
+            self,
+            queryset,
+            user_sort_by: Optional[str],
+            user_sort_order: str,
+            sort_field_overrides: Optional[Dict[str, str]] = None,
+    ):
         """
         Apply sorting to the queryset.
 
@@ -562,10 +641,19 @@ class RecommendationService:
             'growth_rate': 'social_accounts__follower_growth_rate',
             'recommendation': 'recommendation_score',  # Explicit recommendation sort
         }
+        if sort_field_overrides:
+            sort_field_map.update(sort_field_overrides)
+
+        # Relevance needs the search_rank annotation from a text search backend
+        if user_sort_by == 'relevance':
+            if 'search_rank' in queryset.query.annotations:
+                return queryset.order_by('-search_rank', '-recommendation_score', '-id')
+            user_sort_by = None
 
         # Default: recommendation only
         if not user_sort_by or user_sort_by == 'recommendation':
-            return queryset.order_by('-recommendation_score', '-total_followers_annotated')
+            # id breaks ties so keyset (cursor) pagination has a total order
+            return queryset.order_by('-recommendation_score', '-total_followers_annotated', '-id')
 
         # User specified a sort field
         user_field = sort_field_map.get(user_sort_by, 'total_followers_annotated')
@@ -573,7 +661,7 @@ class RecommendationService:
 
         # Primary sort: user preference
         # Secondary sort: recommendation score (tie breaker)
-        return queryset.order_by(user_order, '-recommendation_score')
+        return queryset.order_by(user_order, '-recommendation_score', '-id')
 
 
 class RecommendationFilterService:
@@ -766,22 +854,17 @@ class RecommendationFilterService:
             queryset = queryset.filter(campaign_ready=True)
         if barter_ready:
             queryset = queryset.filter(barter_ready=True)
+        # Per-platform search documents exist only for platforms with an active
+        # account and are unique per influencer, so these need no DISTINCT.
         if instagram_verified:
             queryset = queryset.filter(
-                social_accounts__platform='instagram',
-                social_accounts__is_active=True,
-                social_accounts__platform_verified=True
-            ).distinct()
+                platform_search_documents__platform='instagram',
+                platform_search_documents__has_platform_verified=True
+            )
         if has_instagram:
-            queryset = queryset.filter(
-                social_accounts__platform='instagram',
-                social_accounts__is_active=True
-            ).distinct()
+            queryset = queryset.filter(platform_search_documents__platform='instagram')
         if has_youtube:
-            queryset = queryset.filter(
-                social_accounts__platform='youtube',
-                social_accounts__is_active=True
-            ).distinct()
+            queryset = queryset.filter(platform_search_documents__platform='youtube')
         return queryset
 
     @staticmethod
@@ -831,17 +914,29 @@ class RecommendationFilterService:
     def apply_performance_filters(queryset, min_avg_likes: int = None,
                                   min_avg_views: int = None, min_avg_comments: int = None,
                                   last_posted_within: int = None):
-        """Apply performance metric filters."""
+        """
+        Apply performance metric filters.
+
+        Each filter keeps influencers with at least one matching account. They
+        are EXISTS subqueries rather than joins on social_accounts so an
+        influencer with several matching accounts is returned once, without
+        needing DISTINCT.
+        """
         from datetime import datetime, timedelta
 
+        from influencers.models import SocialMediaAccount
+
+        def has_account(**conditions):
+            return Exists(SocialMediaAccount.objects.filter(influencer=OuterRef('pk'), **conditions))
+
         if min_avg_likes is not None:
-            queryset = queryset.filter(social_accounts__average_likes__gte=min_avg_likes)
+            queryset = queryset.filter(has_account(average_likes__gte=min_avg_likes))
         if min_avg_views is not None:
-            queryset = queryset.filter(social_accounts__average_video_views__gte=min_avg_views)
+            queryset = queryset.filter(has_account(average_video_views__gte=min_avg_views))
         if min_avg_comments is not None:
-            queryset = queryset.filter(social_accounts__average_comments__gte=min_avg_comments)
+            queryset = queryset.filter(has_account(average_comments__gte=min_avg_comments))
         if last_posted_within is not None:
             cutoff_date = datetime.now() - timedelta(days=last_posted_within)
-            queryset = queryset.filter(social_accounts__last_posted_at__gte=cutoff_date)
+            queryset = queryset.filter(has_account(last_posted_at__gte=cutoff_date))
         return queryset
 
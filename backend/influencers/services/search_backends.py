@@ -0,0 +1,95 @@
+"""
+Influencer Text Search Backends
+
+Backends that apply the free-text `search` param of influencer search.
+
+- BasicSearchBackend: the original OR of icontains predicates across the
+  profile, user, industry and social handles. Works on any database but cannot
+  use an index and needs DISTINCT because of the social account join.
+- PostgresSearchBackend: matches against InfluencerSearchDocument's tsvector
+  (prefix match on every term) and pg_trgm indexes (fuzzy names, handle
+  prefixes), and annotates `search_rank` for relevance sorting.
+
+The backend is chosen by settings.INFLUENCER_SEARCH_BACKEND.
+"""
+
+import logging
+import re
+
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramWordSimilarity
+from django.db import connection, models
+from django.db.models import F, Q
+
+from .recommendation import RecommendationFilterService
+
+logger = logging.getLogger(__name__)
+
+_LEXEME_RE = re.compile(r'\w+', re.UNICODE)
+
+
+class BasicSearchBackend:
+    """icontains-based search (the pre-index behaviour)."""
+
+    name = 'basic'
+
+    def apply(self, queryset, search: str):
+        return RecommendationFilterService.apply_search_filter(queryset, search)
+
+
+class PostgresSearchBackend:
+    """Full-text + trigram search over InfluencerSearchDocument."""
+
+    name = 'postgres'
+
+    @staticmethod
+    def build_prefix_query(search: str):
+        """
+        tsquery that requires every term, each as a prefix ("jo smi" -> 'jo':* & 'smi':*).
+        Returns None when the search has no word characters.
+        """
+        lexemes = _LEXEME_RE.findall(search.lower())
+        if not lexemes:
+            return None
+        return SearchQuery(' & '.join(f"{lexeme}:*" for lexeme in lexemes), search_type='raw', config='simple')
+
+    def apply(self, queryset, search: str):
+        search = search.strip()
+        if not search:
+            return queryset
+
+        handle = search.lstrip('@').lower()
+        prefix_query = self.build_prefix_query(search)
+
+        # Handles are stored as " handle1 handle2"; the trigram index serves this ILIKE
+        match = Q(search_document__search_handles__icontains=f' {handle}')
+        match |= Q(search_document__search_names__trigram_word_similar=search)
+        if prefix_query is not None:
+            match |= Q(search_document__search_vector=prefix_query)
+
+        name_similarity = TrigramWordSimilarity(search, 'search_document__search_names')
+        if prefix_query is not None:
+            search_rank = SearchRank(F('search_document__search_vector'), prefix_query) + name_similarity
+        else:
+            search_rank = name_similarity
+
+        return queryset.filter(match).annotate(
+            search_rank=models.ExpressionWrapper(search_rank, output_field=models.FloatField())
+        )
+
+
+_backends = {}
+
+
+def get_search_backend():
+    """
+    Return the configured text search backend. Falls back to the basic backend
+    when the database is not PostgreSQL.
+    """
+    name = getattr(settings, 'INFLUENCER_SEARCH_BACKEND', 'postgres')
+    if name == 'postgres' and connection.vendor != 'postgresql':
+        name = 'basic'
+
+    if name not in _backends:
+        _backends[name] = PostgresSearchBackend() if name == 'postgres' else BasicSearchBackend()
+    return _backends[name]
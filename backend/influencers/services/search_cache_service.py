@@ -0,0 +1,152 @@
+"""
+Influencer Search Cache Service
+
+Caches the ranked list of influencer ids produced by a search so that paging,
+re-sorting back and forth and returning from a profile don't re-run the ranking
+query. Only the rows on the requested page are loaded from the database.
+
+Entries are keyed by a hash of the normalized search params (without paging)
+and by version counters. The counters are bumped when influencer data changes
+(global) or when a brand's deals change (per brand, used by campaign exclusion),
+which orphans the old entries instead of deleting them.
+"""
+
+import logging
+from typing import Dict, List, Optional
+
+from common.cache_utils import CacheManager
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .search_service import InfluencerSearchService
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on ids stored per entry; deeper pages fall back to the database
+MAX_CACHED_RESULTS = 5000
+
+GLOBAL_VERSION_KEY = 'influencer_search_version'
+BRAND_VERSION_KEY = 'influencer_search_brand_version'
+
+
+class InfluencerSearchCacheService:
+    """Ranked result cache for influencer search."""
+
+    @staticmethod
+    def invalidate() -> None:
+        """Invalidate every cached search once the current transaction commits."""
+        transaction.on_commit(lambda: CacheManager.bump_version(GLOBAL_VERSION_KEY))
+
+    @staticmethod
+    def invalidate_brand(brand_id: int) -> None:
+        """Invalidate a brand's campaign-exclusion searches once the transaction commits."""
+        if not brand_id:
+            return
+        key = CacheManager.get_cache_key(BRAND_VERSION_KEY, brand_id)
+        transaction.on_commit(lambda: CacheManager.bump_version(key))
+
+    @staticmethod
+    def get_cache_key(params: dict, brand, include_ordering: bool = True) -> str:
+        """Cache key for a search, scoped to the current data versions."""
+        signature = InfluencerSearchService.get_filter_signature(params, brand, include_ordering=include_ordering)
+        parts = [CacheManager.get_version(GLOBAL_VERSION_KEY)]
+        if params.get('campaign_id') and brand:
+            brand_key = CacheManager.get_cache_key(BRAND_VERSION_KEY, brand.id)
+            parts.append(CacheManager.get_version(brand_key))
+        return CacheManager.get_cache_key('influencer_search_results', *parts, signature)
+
+    @staticmethod
+    def get_ranking(queryset, params: dict, brand) -> Dict:
+        """
+        Return the cached ranking for a search, computing it on a miss.
+
+        The ranking is {'entries': [[id, recommendation_score, total_followers], ...],
+        'complete': bool}; 'complete' is False when the result set was larger than
+        MAX_CACHED_RESULTS and only the head of the ranking is stored.
+        """
+        cache_key = InfluencerSearchCacheService.get_cache_key(params, brand)
+        ranking = cache.get(cache_key)
+        if ranking is not None:
+            return ranking
+
+        rows = list(
+            queryset.values_list('id', 'recommendation_score', 'total_followers_annotated')[:MAX_CACHED_RESULTS + 1]
+        )
+        ranking = {
+            'entries': [[row[0], float(row[1] or 0), int(row[2] or 0)] for row in rows[:MAX_CACHED_RESULTS]],
+            'complete': len(rows) <= MAX_CACHED_RESULTS,
+        }
+        timeout = getattr(settings, 'CACHE_TIMEOUTS', {}).get('INFLUENCER_SEARCH_RESULTS', 300)
+        cache.set(cache_key, ranking, timeout)
+        return ranking
+
+    @staticmethod
+    def hydrate(queryset, influencer_ids: List[int]) -> List:
+        """Load the given influencers from the ranked queryset, preserving id order."""
+        if not influencer_ids:
+            return []
+        rows = {row.id: row for row in queryset.filter(id__in=influencer_ids)}
+        return [rows[influencer_id] for influencer_id in influencer_ids if influencer_id in rows]
+
+    @staticmethod
+    def paginate(queryset, params: dict, brand):
+        """
+        Paginate a ranked search queryset from the cached ranking.
+
+        Mirrors InfluencerSearchService.paginate_by_page/paginate_by_cursor and
+        falls back to them for pages beyond the cached head of a large result set.
+        """
+        ranking = InfluencerSearchCacheService.get_ranking(queryset, params, brand)
+        entries = ranking['entries']
+        complete = ranking['complete']
+        page_size = params['page_size']
+
+        if complete:
+            total_count = len(entries)
+        else:
+            total_count = InfluencerSearchService.get_total_count(queryset, params, brand)
+
+        if InfluencerSearchService.supports_cursor(params):
+            position = InfluencerSearchService.decode_cursor(params['cursor'])
+            start = InfluencerSearchCacheService._index_after(entries, position)
+            if not complete and start + page_size >= len(entries):
+                return InfluencerSearchService.paginate_by_cursor(queryset, params, total_count)
+
+            page_entries = entries[start:start + page_size]
+            has_next = start + page_size < len(entries)
+            next_cursor = None
+            if has_next and page_entries:
+                last_id, last_score, last_followers = page_entries[-1]
+                next_cursor = InfluencerSearchService.encode_position(last_score, last_followers, last_id)
+
+            rows = InfluencerSearchCacheService.hydrate(queryset, [entry[0] for entry in page_entries])
+            return rows, {
+                'mode': 'cursor',
+                'page_size': page_size,
+                'total_count': total_count,
+                'has_next': has_next,
+                'has_previous': position is not None,
+                'next_cursor': next_cursor,
+            }
+
+        offset, pagination = InfluencerSearchService.get_page_window(params, total_count)
+        if not complete and offset + page_size > len(entries):
+            return InfluencerSearchService.paginate_by_page(queryset, params, total_count)
+
+        page_ids = [entry[0] for entry in entries[offset:offset + page_size]]
+        return InfluencerSearchCacheService.hydrate(queryset, page_ids), pagination
+
+    @staticmethod
+    def _index_after(entries: List[List], position: Optional[tuple]) -> int:
+        """
+        Index of the first entry ranked after the cursor position, for the
+        default (recommendation_score, total_followers, id) descending order.
+        """
+        if position is None:
+            return 0
+        score, followers, last_id = position
+        for index, (entry_id, entry_score, entry_followers) in enumerate(entries):
+            if (entry_score, entry_followers, entry_id) < (score, followers, last_id):
+                return index
+        return len(entries)
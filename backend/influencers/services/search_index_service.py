@@ -0,0 +1,312 @@
+"""
+Influencer Search Index Service
+
+Maintains the denormalized InfluencerSearchDocument / InfluencerPlatformSearchDocument
+rows that influencer search filters and sorts on. The rule scores computed here
+mirror the Case() annotations in RecommendationService so that the indexed ranking
+matches the on-the-fly ranking.
+
+Usage:
+    from influencers.services.search_index_service import InfluencerSearchIndexService
+
+    InfluencerSearchIndexService.refresh(influencer)
+    InfluencerSearchIndexService.schedule_refresh(influencer.id)  # after commit
+"""
+
+import logging
+from collections import defaultdict
+from datetime import timedelta
+from typing import Dict, Iterable, List, Optional
+
+from common.transaction_utils import on_commit_once
+from django.contrib.postgres.search import SearchVector
+from django.db import connection, transaction
+from django.utils import timezone
+
+from ..models import InfluencerPlatformSearchDocument, InfluencerProfile, InfluencerSearchDocument
+from .search_cache_service import InfluencerSearchCacheService
+
+logger = logging.getLogger(__name__)
+
+ACTIVITY_WINDOW_DAYS = 30
+
+# tsvector over the document's search text; 'simple' config because names,
+# handles and keywords should not be stemmed
+SEARCH_VECTOR = (
+    SearchVector('search_names', weight='A', config='simple') +
+    SearchVector('search_handles', weight='A', config='simple') +
+    SearchVector('search_keywords', weight='B', config='simple') +
+    SearchVector('search_bio', weight='C', config='simple')
+)
+
+PLATFORM_DOCUMENT_FIELDS = (
+    'total_followers', 'average_engagement_rate', 'average_likes', 'average_comments',
+    'average_video_views', 'posts_count', 'last_posted_at', 'has_platform_verified',
+    'has_verified_account', 'rule_scores', 'recommendation_score',
+)
+
+class InfluencerSearchIndexService:
+    """
+    Builds and stores search documents for influencers.
+
+    Profile-level rule scores (verification, rating, completeness, collaborations)
+    are shared between the influencer document and its per-platform rows; the
+    account-level scores (platform verified, engagement, followers, activity) are
+    computed per slice of accounts.
+    """
+
+    @staticmethod
+    def compute_account_metrics(accounts: Iterable) -> Dict:
+        """Aggregate metrics over a set of active social accounts."""
+        accounts = list(accounts)
+        count = len(accounts)
+
+        def average(values):
+            return float(sum(values)) / count if count else 0.0
+
+        last_posted = [a.last_posted_at for a in accounts if a.last_posted_at]
+
+        return {
+            'total_followers': sum(a.followers_count or 0 for a in accounts),
+            'average_engagement_rate': average([float(a.engagement_rate or 0) for a in accounts]),
+            'average_likes': average([a.average_likes or 0 for a in accounts]),
+            'average_comments': average([a.average_comments or 0 for a in accounts]),
+            'average_video_views': average([a.average_video_views or 0 for a in accounts]),
+            'posts_count': sum(a.posts_count or 0 for a in accounts),
+            'last_posted_at': max(last_posted) if last_posted else None,
+            'has_platform_verified': any(a.platform_verified for a in accounts),
+            'has_verified_account': any(a.verified for a in accounts),
+        }
+
+    @staticmethod
+    def compute_profile_scores(influencer) -> Dict[str, float]:
+        """Rule scores that only depend on the influencer profile."""
+        user_profile = influencer.user_profile
+        email_verified = bool(user_profile and user_profile.email_verified)
+        phone_verified = bool(user_profile and user_profile.phone_verified)
+
+        if email_verified and phone_verified:
+            email_phone_score = 80.0
+        elif email_verified or phone_verified:
+            email_phone_score = 40.0
+        else:
+            email_phone_score = 0.0
+
+        avg_rating = float(influencer.avg_rating or 0)
+
+        if influencer.bio and influencer.industry_id:
+            profile_complete_score = 15.0
+        elif influencer.bio:
+            profile_complete_score = 8.0
+        else:
+            profile_complete_score = 0.0
+
+        collaborations = influencer.collaboration_count or 0
+        if collaborations >= 20:
+            collab_score = 10.0
+        elif collaborations >= 10:
+            collab_score = 8.0
+        elif collaborations >= 5:
+            collab_score = 6.0
+        elif collaborations >= 1:
+            collab_score = 4.0
+        else:
+            collab_score = 0.0
+
+        return {
+            'score_ticktime_verified': 100.0 if influencer.profile_verified else 0.0,
+            'score_email_phone_verified': email_phone_score,
+            'score_rating': avg_rating * 12.0 if avg_rating > 0 else 0.0,
+            'score_profile_complete': profile_complete_score,
+            'score_collab_experience': collab_score,
+        }
+
+    @staticmethod
+    def compute_search_text(influencer, accounts: Iterable) -> Dict[str, str]:
+        """Source text for the document's search columns."""
+        user = influencer.user
+        names = [user.first_name, user.last_name, user.username]
+
+        keywords = [influencer.industry.name] if influencer.industry_id else []
+        for keyword_list in (influencer.content_keywords, influencer.bio_keywords):
+            if isinstance(keyword_list, list):
+                keywords.extend(str(keyword) for keyword in keyword_list if keyword)
+
+        return {
+            'search_names': ' '.join(name for name in names if name),
+            # Leading space per handle so "ILIKE '% prefix%'" matches any handle's start
+            'search_handles': ''.join(f' {account.handle.lower()}' for account in accounts if account.handle),
+            'search_keywords': ' '.join(keywords),
+            'search_bio': influencer.bio or '',
+        }
+
+    @staticmethod
+    def compute_account_scores(metrics: Dict, now=None) -> Dict[str, float]:
+        """Rule scores that depend on aggregated account metrics."""
+        now = now or timezone.now()
+
+        engagement = metrics['average_engagement_rate']
+        if engagement >= 20:
+            engagement_score = 40.0
+        elif engagement > 0:
+            engagement_score = engagement * 2.0
+        else:
+            engagement_score = 0.0
+
+        followers = metrics['total_followers']
+        follower_tiers = (
+            (10000000, 30.0),
+            (1000000, 27.0),
+            (500000, 24.0),
+            (100000, 20.0),
+            (50000, 16.0),
+            (10000, 12.0),
+            (1000, 8.0),
+            (1, 4.0),
+        )
+        followers_score = next((score for threshold, score in follower_tiers if followers >= threshold), 0.0)
+
+        last_posted_at = metrics['last_posted_at']
+        recently_active = bool(last_posted_at and last_posted_at >= now - timedelta(days=ACTIVITY_WINDOW_DAYS))
+
+        return {
+            'score_platform_verified': 50.0 if metrics['has_platform_verified'] else 0.0,
+            'score_engagement': engagement_score,
+            'score_followers': followers_score,
+            'score_account_verified': 25.0 if metrics['has_verified_account'] else 0.0,
+            'score_activity': 20.0 if recently_active else 0.0,
+        }
+
+    @staticmethod
+    def refresh(influencer) -> Optional[InfluencerSearchDocument]:
+        """
+        Rebuild the search document and per-platform rows for one influencer.
+
+        Accepts an InfluencerProfile or its primary key. Returns None when the
+        influencer no longer exists.
+        """
+        if not isinstance(influencer, InfluencerProfile):
+            influencer = InfluencerProfile.objects.select_related(
+                'user', 'user_profile', 'industry'
+            ).filter(pk=influencer).first()
+            if influencer is None:
+                return None
+
+        now = timezone.now()
+        accounts = list(influencer.social_accounts.filter(is_active=True))
+        profile_scores = InfluencerSearchIndexService.compute_profile_scores(influencer)
+
+        accounts_by_platform = defaultdict(list)
+        for account in accounts:
+            accounts_by_platform[account.platform].append(account)
+
+        metrics = InfluencerSearchIndexService.compute_account_metrics(accounts)
+        rule_scores = {**profile_scores, **InfluencerSearchIndexService.compute_account_scores(metrics, now)}
+        document_values = {
+            **metrics,
+            'active_accounts_count': len(accounts),
+            'rule_scores': rule_scores,
+            'recommendation_score': sum(rule_scores.values()),
+            **InfluencerSearchIndexService.compute_search_text(influencer, accounts),
+        }
+
+        platform_values = {}
+        for platform, platform_accounts in accounts_by_platform.items():
+            platform_metrics = InfluencerSearchIndexService.compute_account_metrics(platform_accounts)
+            platform_scores = {
+                **profile_scores,
+                **InfluencerSearchIndexService.compute_account_scores(platform_metrics, now),
+            }
+            platform_values[platform] = {
+                **platform_metrics,
+                'rule_scores': platform_scores,
+                'recommendation_score': sum(platform_scores.values()),
+            }
+
+        # Most refreshes (e.g. routine re-scrapes) change nothing; skip the
+        # writes and keep cached search results valid in that case.
+        existing_document = InfluencerSearchDocument.objects.filter(
+            influencer=influencer
+        ).values(*document_values).first()
+        existing_platforms = {
+            row.pop('platform'): row
+            for row in InfluencerPlatformSearchDocument.objects.filter(
+                influencer=influencer
+            ).values('platform', *PLATFORM_DOCUMENT_FIELDS)
+        }
+        if existing_document == document_values and existing_platforms == platform_values:
+            return InfluencerSearchDocument(influencer=influencer, **document_values)
+
+        with transaction.atomic():
+            document, _ = InfluencerSearchDocument.objects.update_or_create(
+                influencer=influencer,
+                defaults=document_values,
+            )
+            InfluencerPlatformSearchDocument.objects.filter(influencer=influencer).delete()
+            InfluencerPlatformSearchDocument.objects.bulk_create([
+                InfluencerPlatformSearchDocument(influencer=influencer, platform=platform, **values)
+                for platform, values in platform_values.items()
+            ])
+            if connection.vendor == 'postgresql':
+                InfluencerSearchDocument.objects.filter(pk=document.pk).update(search_vector=SEARCH_VECTOR)
+
+        InfluencerSearchCacheService.invalidate()
+        return document
+
+    @staticmethod
+    def schedule_refresh(influencer_id: int) -> None:
+        """
+        Refresh the influencer's document once the current transaction commits.
+
+        Several saves inside one transaction (e.g. a scrape updating the account
+        and the profile) collapse into a single refresh.
+        """
+        if not influencer_id:
+            return
+        on_commit_once('influencer_search_index', [influencer_id], InfluencerSearchIndexService._refresh_each)
+
+    @staticmethod
+    def _refresh_each(influencer_ids: List[int]) -> None:
+        for influencer_id in influencer_ids:
+            try:
+                InfluencerSearchIndexService.refresh(influencer_id)
+            except Exception as exc:
+                logger.error(f"Failed to refresh search document for influencer {influencer_id}: {exc}")
+
+    @staticmethod
+    def rebuild(queryset=None, batch_size: int = 500) -> int:
+        """Rebuild documents for every influencer in the queryset (all by default)."""
+        if queryset is None:
+            queryset = InfluencerProfile.objects.all()
+
+        queryset = queryset.select_related('user', 'user_profile', 'industry')
+        rebuilt = 0
+        for influencer in queryset.iterator(chunk_size=batch_size):
+            InfluencerSearchIndexService.refresh(influencer)
+            rebuilt += 1
+        return rebuilt
+
+    @staticmethod
+    def refresh_expired_activity() -> int:
+        """
+        Re-score documents whose recent-activity bonus has lapsed.
+
+        The activity rule is time based, so documents that last posted just
+        outside the window still carry the bonus until they are refreshed.
+        """
+        cutoff = timezone.now() - timedelta(days=ACTIVITY_WINDOW_DAYS)
+        influencer_ids: List[int] = list(
+            InfluencerSearchDocument.objects.filter(
+                last_posted_at__lt=cutoff,
+                rule_scores__score_activity__gt=0,
+            ).values_list('influencer_id', flat=True)
+        )
+        platform_ids = InfluencerPlatformSearchDocument.objects.filter(
+            last_posted_at__lt=cutoff,
+            rule_scores__score_activity__gt=0,
+        ).values_list('influencer_id', flat=True)
+        influencer_ids = sorted(set(influencer_ids) | set(platform_ids))
+
+        for influencer_id in influencer_ids:
+            InfluencerSearchIndexService.refresh(influencer_id)
+        return len(influencer_ids)
@@ -4,19 +4,34 @@ Influencer Search Service
 This module contains business logic for influencer search, filtering, and ranking.
 """
 
+import base64
+import binascii
+import hashlib
+import json
 import logging
+import math
 from decimal import Decimal
 from functools import reduce
+from typing import Optional, Tuple
 
+from common.cache_utils import CacheManager
+from django.conf import settings
+from django.core.cache import cache
 from django.db import models
 from django.db.models import Q, Case, When, Value, F, ExpressionWrapper
 from django.db.models.functions import Coalesce
 
 from .recommendation import RecommendationFilterService
+from .search_backends import get_search_backend
 
 logger = logging.getLogger(__name__)
 
 
+# Params that only control paging and ordering; they never change the result set
+PAGING_PARAMS = ('page', 'page_size', 'pagination', 'cursor', 'sort_by', 'sort_order')
+ORDERING_PARAMS = ('sort_by', 'sort_order')
+
+
 class InfluencerSearchService:
     """Service for handling influencer search business logic."""
 
@@ -47,6 +62,9 @@ class InfluencerSearchService:
             'search': request.GET.get('search', '').strip(),
             'page': parse_int(request.GET.get('page'), 1),
             'page_size': parse_int(request.GET.get('page_size'), 50),
+            # 'page' (default) or 'cursor' for keyset pagination
+            'pagination': request.GET.get('pagination', 'page'),
+            'cursor': request.GET.get('cursor', '').strip(),
 
             # Platform filters
             'platform': request.GET.get('platform', 'all'),
@@ -127,16 +145,13 @@ class InfluencerSearchService:
 
         # Text search
         if params['search']:
-            queryset = RecommendationFilterService.apply_search_filter(queryset, params['search'])
+            queryset = get_search_backend().apply(queryset, params['search'])
 
         # Platform filters
         if params['preferred_platforms']:
             queryset = RecommendationFilterService.apply_platform_filter(queryset, params['preferred_platforms'])
         elif params['platform'] and params['platform'] != 'all':
-            queryset = queryset.filter(
-                social_accounts__platform=params['platform'],
-                social_accounts__is_active=True
-            ).distinct()
+            queryset = queryset.filter(platform_search_documents__platform=params['platform'])
 
         # Location filters
         queryset = RecommendationFilterService.apply_location_filter(
@@ -431,3 +446,132 @@ class InfluencerSearchService:
         # This ensures the user's sort_order parameter is respected
 
         return queryset
+
+    @staticmethod
+    def get_filter_signature(params: dict, brand, include_ordering: bool = False) -> str:
+        """
+        Stable hash of the filters in a search, ignoring paging (and ordering
+        unless include_ordering is set).
+
+        List filters are order-insensitive, and the brand only matters when a
+        campaign exclusion is applied.
+        """
+        ignored = PAGING_PARAMS if not include_ordering else tuple(
+            key for key in PAGING_PARAMS if key not in ORDERING_PARAMS
+        )
+        filters = {}
+        for key, value in params.items():
+            if key in ignored:
+                continue
+            filters[key] = sorted(value) if isinstance(value, list) else value
+        if params.get('campaign_id'):
+            filters['brand_id'] = brand.id if brand else None
+
+        payload = json.dumps(filters, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def get_total_count(queryset, params: dict, brand) -> int:
+        """
+        Count the search results, cached per filter signature for a short TTL.
+        The key carries the search cache versions, so data changes invalidate it.
+        """
+        from .search_cache_service import InfluencerSearchCacheService
+
+        results_key = InfluencerSearchCacheService.get_cache_key(params, brand, include_ordering=False)
+        cache_key = CacheManager.get_cache_key('influencer_search_count', results_key)
+
+        total_count = cache.get(cache_key)
+        if total_count is None:
+            total_count = queryset.count()
+            timeout = getattr(settings, 'CACHE_TIMEOUTS', {}).get('INFLUENCER_SEARCH_COUNT', 120)
+            cache.set(cache_key, total_count, timeout)
+        return total_count
+
+    @staticmethod
+    def supports_cursor(params: dict) -> bool:
+        """Cursor pagination is keyed on the default recommendation ordering."""
+        return params['pagination'] == 'cursor' and params['sort_by'] in ('', 'recommendation')
+
+    @staticmethod
+    def encode_cursor(influencer) -> str:
+        """Encode the keyset position of the last influencer on a page."""
+        return InfluencerSearchService.encode_position(
+            influencer.recommendation_score,
+            influencer.total_followers_annotated,
+            influencer.id,
+        )
+
+    @staticmethod
+    def encode_position(recommendation_score, total_followers, influencer_id: int) -> str:
+        """Encode a (recommendation_score, total_followers, id) keyset position as a cursor."""
+        position = [float(recommendation_score or 0), int(total_followers or 0), influencer_id]
+        return base64.urlsafe_b64encode(json.dumps(position).encode('utf-8')).decode('ascii')
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> Optional[Tuple[float, int, int]]:
+        """Decode a cursor; returns None if it is missing or malformed."""
+        if not cursor:
+            return None
+        try:
+            score, followers, last_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+            return float(score), int(followers), int(last_id)
+        except (binascii.Error, UnicodeError, ValueError, TypeError):
+            return None
+
+    @staticmethod
+    def paginate_by_cursor(queryset, params: dict, total_count: int):
+        """
+        Keyset pagination on (recommendation_score, total_followers_annotated, id),
+        all descending, matching the default recommendation ordering.
+        """
+        page_size = params['page_size']
+        position = InfluencerSearchService.decode_cursor(params['cursor'])
+        if position:
+            score, followers, last_id = position
+            queryset = queryset.filter(
+                Q(recommendation_score__lt=score) |
+                Q(recommendation_score=score, total_followers_annotated__lt=followers) |
+                Q(recommendation_score=score, total_followers_annotated=followers, id__lt=last_id)
+            )
+
+        rows = list(queryset[:page_size + 1])
+        has_next = len(rows) > page_size
+        rows = rows[:page_size]
+
+        return rows, {
+            'mode': 'cursor',
+            'page_size': page_size,
+            'total_count': total_count,
+            'has_next': has_next,
+            'has_previous': position is not None,
+            'next_cursor': InfluencerSearchService.encode_cursor(rows[-1]) if has_next and rows else None,
+        }
+
+    @staticmethod
+    def paginate_by_page(queryset, params: dict, total_count: int):
+        """
+        Page-number pagination using a precomputed total count, so the page
+        query is not preceded by another COUNT(*). Out-of-range pages are
+        clamped like Paginator.get_page().
+        """
+        offset, pagination = InfluencerSearchService.get_page_window(params, total_count)
+        rows = list(queryset[offset:offset + params['page_size']])
+        return rows, pagination
+
+    @staticmethod
+    def get_page_window(params: dict, total_count: int):
+        """Return the row offset and pagination metadata for a page-number request."""
+        page_size = params['page_size']
+        total_pages = max(1, math.ceil(total_count / page_size)) if page_size > 0 else 1
+        page = min(max(params['page'], 1), total_pages)
+        offset = (page - 1) * page_size
+
+        return offset, {
+            'page': params['page'],
+            'page_size': page_size,
+            'total_pages': total_pages,
+            'total_count': total_count,
+            'has_next': page < total_pages,
+            'has_previous': page > 1,
+        }
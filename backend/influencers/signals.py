@@ -0,0 +1,69 @@
+"""
+Signal receivers that keep influencer search documents and cached search
+results in sync.
+"""
+
+from deals.models import Deal
+from django.contrib.auth.models import User
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from users.models import UserProfile
+
+from .models import InfluencerProfile, SocialMediaAccount
+from .services.search_cache_service import InfluencerSearchCacheService
+from .services.search_index_service import InfluencerSearchIndexService
+
+# Profile fields written by background syncs that no search filter reads
+NON_SEARCH_PROFILE_FIELDS = {'average_interaction', 'average_views', 'updated_at'}
+
+
+@receiver(post_save, sender=InfluencerProfile)
+def refresh_search_document_on_profile_save(sender, instance, update_fields=None, **kwargs):
+    InfluencerSearchIndexService.schedule_refresh(instance.pk)
+    # Location, gender, flags etc. are filtered on the profile itself
+    if not update_fields or not set(update_fields) <= NON_SEARCH_PROFILE_FIELDS:
+        InfluencerSearchCacheService.invalidate()
+
+
+@receiver(m2m_changed, sender=InfluencerProfile.categories.through)
+def invalidate_search_on_categories_change(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        InfluencerSearchCacheService.invalidate()
+
+
+@receiver(post_save, sender=UserProfile)
+def refresh_search_document_on_user_profile_save(sender, instance, **kwargs):
+    # Email/phone verification flags live on the shared user profile
+    influencer_id = InfluencerProfile.objects.filter(user_profile=instance).values_list('id', flat=True).first()
+    if influencer_id:
+        InfluencerSearchIndexService.schedule_refresh(influencer_id)
+
+
+@receiver(post_save, sender=User)
+def refresh_search_document_on_user_save(sender, instance, created=False, update_fields=None, **kwargs):
+    # Names are part of the search text; logins only touch last_login
+    if created or (update_fields and set(update_fields) <= {'last_login'}):
+        return
+    influencer_id = InfluencerProfile.objects.filter(user=instance).values_list('id', flat=True).first()
+    if influencer_id:
+        InfluencerSearchIndexService.schedule_refresh(influencer_id)
+
+
+@receiver(post_save, sender=SocialMediaAccount)
+@receiver(post_delete, sender=SocialMediaAccount)
+def refresh_search_document_on_account_change(sender, instance, **kwargs):
+    InfluencerSearchIndexService.schedule_refresh(instance.influencer_id)
+
+
+@receiver(post_save, sender=Deal)
+def refresh_search_document_on_deal_save(sender, instance, created=False, **kwargs):
+    if instance.status == 'completed':
+        InfluencerSearchIndexService.schedule_refresh(instance.influencer_id)
+    if created:
+        # New deals change which influencers a campaign search excludes
+        InfluencerSearchCacheService.invalidate_brand(instance.campaign.brand_id)
+
+
+@receiver(post_delete, sender=Deal)
+def invalidate_brand_search_on_deal_delete(sender, instance, **kwargs):
+    InfluencerSearchCacheService.invalidate_brand(instance.campaign.brand_id)
@@ -1,13 +1,16 @@
 import logging
 
 from celery import shared_task
-from communications.social_scraping_service import get_social_scraping_service, ScraperError
+from communications.social_scraping_service import get_social_scraping_service
 from django.utils import timezone
 from common.models import CeleryTask
 from influencers.models import SocialMediaAccount
 
 logger = logging.getLogger(__name__)
 
+# Accounts loaded, fetched and persisted per batch by sync_all_social_accounts
+SYNC_BATCH_SIZE = 200
+
 
 @shared_task(bind=True)
 def sync_all_social_accounts(self):
@@ -33,56 +36,23 @@ def sync_all_social_accounts(self):
     scraping_service = get_social_scraping_service()
 
     # Get ALL accounts - fetch immediately regardless of last_synced_at
-    all_accounts = SocialMediaAccount.objects.all()
+    all_accounts = SocialMediaAccount.objects.select_related(
+        'influencer__user_profile'
+    ).order_by('id')
 
     total_accounts = all_accounts.count()
-    queued_count = 0
-    synced_count = 0
-    error_count = 0
 
     logger.info(f"Starting background sync for {total_accounts} social media accounts (fetching immediately for all)")
 
     try:
-        for account in all_accounts:
-            try:
-                # Always queue a background scrape so workers can keep things fresh
-                message_id = scraping_service.queue_scrape_request(account, priority='high')
-                if message_id:
-                    queued_count += 1
-                else:
-                    error_count += 1
-                    logger.warning(f"Failed to queue scrape request for {account.handle} ({account.platform})")
-
-                # Fetch data immediately from scraper backend - force=True ensures instant fetch
-                # regardless of when the account was last synced
-                try:
-                    scraping_service.sync_account(account, force=True)
-                    synced_count += 1
-                    logger.debug(f"Successfully synced {account.handle} ({account.platform})")
-                except ScraperError as exc:
-                    # ScraperError usually means user not found / bad data – log but don't fail the whole batch
-                    logger.warning(
-                        f'Scraper error while syncing {account.handle} ({account.platform}): {exc}'
-                    )
-                except Exception as exc:
-                    error_count += 1
-                    logger.error(
-                        f'Error syncing {account.handle} ({account.platform}): {exc}',
-                        exc_info=True
-                    )
-            except Exception as e:
-                error_count += 1
-                logger.error(
-                    f'Error queueing sync for {account.handle}: {str(e)}',
-                    exc_info=True
-                )
-
-        result = {
-            'total': total_accounts,
-            'queued': queued_count,
-            'synced': synced_count,
-            'errors': error_count,
-        }
+        # Fetches run concurrently; each batch of results is saved in one transaction
+        result = scraping_service.sync_accounts(
+            all_accounts.iterator(chunk_size=SYNC_BATCH_SIZE),
+            batch_size=SYNC_BATCH_SIZE,
+        )
+        queued_count = result['queued']
+        synced_count = result['synced']
+        error_count = result['errors']
 
         logger.info(
             f"Background sync completed: {queued_count} queued, {synced_count} synced, "
@@ -106,3 +76,16 @@ def sync_all_social_accounts(self):
         task_record.completed_at = timezone.now()
         task_record.save(update_fields=['status', 'error', 'completed_at', 'updated_at'])
         raise
+
+
+@shared_task
+def refresh_expired_search_documents():
+    """
+    Periodic task that drops the recent-activity bonus from search documents
+    whose last post has aged out of the activity window.
+    """
+    from influencers.services.search_index_service import InfluencerSearchIndexService
+
+    refreshed = InfluencerSearchIndexService.refresh_expired_activity()
+    logger.info(f"Refreshed {refreshed} influencer search documents with expired activity")
+    return refreshed
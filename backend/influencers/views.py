@@ -364,9 +364,11 @@ def influencer_search_view(request):
     6. Follower Count
 
     To change ranking priorities, edit RANKING_RULES in the RecommendationService.
-    """
-    from django.core.paginator import Paginator
 
+    Pagination defaults to page numbers (?page=N). Pass ?pagination=cursor to use
+    keyset pagination with the default ranking; follow pagination.next_cursor
+    via ?pagination=cursor&cursor=<value> for subsequent pages.
+    """
     from .services.recommendation import RecommendationService
 
     # Check if user has a brand profile
@@ -383,49 +385,66 @@ def influencer_search_view(request):
     search_service = InfluencerSearchService()
     params = search_service.parse_search_params(request)
 
+    # Determine platforms for recommendation scoring
+    platforms_to_consider = params['preferred_platforms'] or (
+        [params['platform']] if params['platform'] and params['platform'] != 'all' else []
+    )
+    # Single-platform and all-platform searches rank from the precomputed search
+    # documents; multi-platform selections still aggregate per request.
+    use_search_documents = len(platforms_to_consider) <= 1
+
     # Start with base queryset
     queryset = InfluencerProfile.objects.select_related(
         'user', 'user_profile', 'industry'
     ).prefetch_related(
         'social_accounts'
-    ).filter(
-        user__is_active=True,
-        social_accounts__is_active=True
-    ).distinct()
+    )
+    if use_search_documents:
+        queryset = queryset.filter(
+            user__is_active=True,
+            search_document__active_accounts_count__gt=0
+        )
+    else:
+        queryset = queryset.filter(
+            user__is_active=True,
+            social_accounts__is_active=True
+        ).distinct()
 
     # Apply filters using the filter service
     queryset = search_service.apply_search_filters(queryset, params, brand)
 
-    # Determine platforms for recommendation scoring
-    platforms_to_consider = params['preferred_platforms'] or (
-        [params['platform']] if params['platform'] and params['platform'] != 'all' else []
-    )
-
     # Apply recommendation scoring and sorting
     recommendation_service = RecommendationService()
-    queryset = recommendation_service.apply_recommendation(
-        queryset,
-        platform_filter=params['platform'],
-        preferred_platforms=params['preferred_platforms'],
-        user_sort_by=params['sort_by'],
-        user_sort_order=params['sort_order'],
-    )
+    if use_search_documents:
+        queryset = recommendation_service.apply_indexed_recommendation(
+            queryset,
+            platform=platforms_to_consider[0] if platforms_to_consider else None,
+            user_sort_by=params['sort_by'],
+            user_sort_order=params['sort_order'],
+        )
+    else:
+        queryset = recommendation_service.apply_recommendation(
+            queryset,
+            platform_filter=params['platform'],
+            preferred_platforms=params['preferred_platforms'],
+            user_sort_by=params['sort_by'],
+            user_sort_order=params['sort_order'],
+        )
 
     # Apply preference scoring for soft filters (industry, categories, etc.)
     queryset = search_service.apply_preference_scoring(queryset, params)
 
-    # Debug logging
-    logger.info(f"Influencer search - Total found: {queryset.count()}")
-
-    # Pagination
-    paginator = Paginator(queryset, params['page_size'])
-    page_obj = paginator.get_page(params['page'])
+    # Pagination is served from the cached ranking (ids + scores) for these
+    # filters; only the rows on the requested page are loaded.
+    from .services.search_cache_service import InfluencerSearchCacheService
+    page_items, pagination = InfluencerSearchCacheService.paginate(queryset, params, brand)
+    logger.info(f"Influencer search - Total found: {pagination['total_count']}")
 
     # Serialize results
     try:
         from .serializers import InfluencerSearchSerializer
         serializer = InfluencerSearchSerializer(
-            page_obj,
+            page_items,
             many=True,
             context={
                 'request': request,
@@ -437,14 +456,7 @@ def influencer_search_view(request):
         return Response({
             'status': 'success',
             'results': results,
-            'pagination': {
-                'page': params['page'],
-                'page_size': params['page_size'],
-                'total_pages': paginator.num_pages,
-                'total_count': paginator.count,
-                'has_next': page_obj.has_next(),
-                'has_previous': page_obj.has_previous(),
-            }
+            'pagination': pagination,
         }, status=status.HTTP_200_OK)
     except Exception as e:
         logger.error(f"Error in influencer search serialization: {e}")
@@ -6,13 +6,16 @@ from .models import Conversation, Message
 @admin.register(Conversation)
 class ConversationAdmin(admin.ModelAdmin):
     list_display = ['deal_info', 'last_message_preview', 'unread_count_for_influencer', 'updated_at']
+    list_select_related = ['deal__campaign', 'deal__influencer__user', 'last_message']
     search_fields = ['deal__campaign__title', 'deal__influencer__user__username']
     readonly_fields = [
         'deal',
         'created_at',
         'updated_at',
         'last_message',
+        'messages_count',
         'unread_count_for_influencer',
+        'unread_count_for_brand',
     ]
 
     def deal_info(self, obj):
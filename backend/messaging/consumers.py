@@ -4,17 +4,44 @@ from channels.db import database_sync_to_async
 from channels.generic.websocket import AsyncWebsocketConsumer
 from deals.models import Deal
 from django.contrib.auth.models import AnonymousUser
-from influencers.models import InfluencerProfile
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import AuthenticationFailed
 from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
 from rest_framework_simplejwt.tokens import UntypedToken
 
 from .models import Conversation, Message
+from .realtime import (
+    deal_group_name, mark_offline, mark_online, new_message_event, online_user_ids, read_until_event,
+    recipient_user_ids, user_group_name
+)
 from .serializers import MessageSerializer
 
 
+def get_user_from_scope_token(scope):
+    """
+    Authenticate user from JWT token in query string.
+    """
+    try:
+        token = scope['query_string'].decode().split('token=')[1].split('&')[0]
+        UntypedToken(token)
+
+        # Get user from token
+        from rest_framework_simplejwt.authentication import JWTAuthentication
+        jwt_auth = JWTAuthentication()
+        validated_token = jwt_auth.get_validated_token(token)
+        return jwt_auth.get_user(validated_token)
+    except (IndexError, InvalidToken, TokenError, AuthenticationFailed):
+        return AnonymousUser()
+
+
 class MessagingConsumer(AsyncWebsocketConsumer):
     """
     WebSocket consumer for real-time messaging between influencers and brands.
+
+    The user, their side of the deal, the deal, its conversation and the
+    recipients on the other side are resolved once at connect and kept on the
+    connection, so each message costs a single database hop.
     """
 
     async def connect(self):
@@ -22,19 +49,10 @@ class MessagingConsumer(AsyncWebsocketConsumer):
         Handle WebSocket connection.
         """
         self.deal_id = self.scope['url_route']['kwargs']['deal_id']
-        self.room_group_name = f'deal_{self.deal_id}'
-
-        # Authenticate user
-        user = await self.get_user_from_token()
-        if user is None or user.is_anonymous:
-            await self.close()
-            return
-
-        self.user = user
+        self.room_group_name = deal_group_name(self.deal_id)
 
-        # Check if user has access to this deal
-        has_access = await self.check_deal_access()
-        if not has_access:
+        # Authenticate user and check deal access
+        if not await self.resolve_connection():
             await self.close()
             return
 
@@ -70,6 +88,8 @@ class MessagingConsumer(AsyncWebsocketConsumer):
                 await self.handle_typing(text_data_json)
             elif message_type == 'read_status':
                 await self.handle_read_status(text_data_json)
+            elif message_type == 'read_until':
+                await self.handle_read_until(text_data_json)
 
         except json.JSONDecodeError:
             await self.send(text_data=json.dumps({
@@ -84,11 +104,10 @@ class MessagingConsumer(AsyncWebsocketConsumer):
         if not content:
             return
 
-        # Create message in database
-        message = await self.create_message(content)
-        if message:
-            # Serialize message
-            message_data = await self.serialize_message(message)
+        # Create and serialize the message, and find online recipients, in one hop
+        created = await self.create_message(content)
+        if created:
+            message_data, notification, online_recipient_ids = created
 
             # Send message to room group
             await self.channel_layer.group_send(
@@ -99,6 +118,10 @@ class MessagingConsumer(AsyncWebsocketConsumer):
                 }
             )
 
+            # Notify the other side's online users outside this deal
+            for user_id in online_recipient_ids:
+                await self.channel_layer.group_send(user_group_name(user_id), notification)
+
     async def handle_typing(self, data):
         """
         Handle typing indicator.
@@ -112,7 +135,7 @@ class MessagingConsumer(AsyncWebsocketConsumer):
                 'type': 'typing_status',
                 'user_id': self.user.id,
                 'is_typing': is_typing,
-                'sender_type': await self.get_sender_type()
+                'sender_type': self.sender_type
             }
         )
 
@@ -130,10 +153,25 @@ class MessagingConsumer(AsyncWebsocketConsumer):
                 {
                     'type': 'read_status_update',
                     'message_id': message_id,
-                    'reader_type': await self.get_sender_type()
+                    'reader_type': self.sender_type
                 }
             )
 
+    async def handle_read_until(self, data):
+        """
+        Mark everything up to a message (or timestamp) as read in one update and
+        broadcast a single read_until event.
+        """
+        count, until = await self.mark_read_until(
+            message_id=data.get('message_id'),
+            until=data.get('until')
+        )
+        if count:
+            await self.channel_layer.group_send(
+                self.room_group_name,
+                read_until_event(self.sender_type, until, count, data.get('message_id'))
+            )
+
     async def chat_message(self, event):
         """
         Send message to WebSocket.
@@ -167,100 +205,187 @@ class MessagingConsumer(AsyncWebsocketConsumer):
             'reader_type': event['reader_type']
         }))
 
-    @database_sync_to_async
-    def get_user_from_token(self):
+    async def read_until_update(self, event):
         """
-        Authenticate user from JWT token in query string.
+        Send bulk read receipt to WebSocket.
         """
-        try:
-            token = self.scope['query_string'].decode().split('token=')[1].split('&')[0]
-            UntypedToken(token)
-
-            # Get user from token
-            from rest_framework_simplejwt.authentication import JWTAuthentication
-            jwt_auth = JWTAuthentication()
-            validated_token = jwt_auth.get_validated_token(token)
-            user = jwt_auth.get_user(validated_token)
-
-            return user
-        except (IndexError, InvalidToken, TokenError):
-            return AnonymousUser()
+        await self.send(text_data=json.dumps({
+            'type': 'read_until',
+            'reader_type': event['reader_type'],
+            'until': event['until'],
+            'message_id': event['message_id'],
+            'count': event['count']
+        }))
 
     @database_sync_to_async
-    def check_deal_access(self):
+    def resolve_connection(self):
         """
-        Check if user has access to the deal.
+        Authenticate the user and load their side of the deal, the deal, its
+        conversation and the recipients on the other side. Returns False when
+        the user cannot access the deal.
         """
+        user = get_user_from_scope_token(self.scope)
+        if user is None or user.is_anonymous:
+            return False
+
         try:
-            # Check if user is an influencer with access to this deal
-            if hasattr(self.user, 'influencer_profile'):
-                return Deal.objects.filter(
+            # Influencers can access their own deals
+            if hasattr(user, 'influencer_profile'):
+                sender_type = 'influencer'
+                deal = Deal.objects.select_related('campaign').get(
                     id=self.deal_id,
-                    influencer=self.user.influencer_profile
-                ).exists()
+                    influencer=user.influencer_profile
+                )
 
-            # For brands, we would check brand access here
-            # This is for influencer-side implementation
-            return False
+            # Brand users can access deals of their brand's campaigns
+            elif hasattr(user, 'brand_user'):
+                sender_type = 'brand'
+                deal = Deal.objects.select_related('influencer').get(
+                    id=self.deal_id,
+                    campaign__brand__brand_users__user=user,
+                    campaign__brand__brand_users__is_active=True
+                )
 
-        except Exception:
+            else:
+                return False
+
+        except Deal.DoesNotExist:
             return False
 
+        self.user = user
+        self.sender_type = sender_type
+        self.deal = deal
+        self.conversation, created = Conversation.objects.get_or_create(deal=deal)
+        self.recipient_ids = recipient_user_ids(sender_type, deal)
+        return True
+
     @database_sync_to_async
     def create_message(self, content):
         """
-        Create a new message in the database.
+        Create a new message in the database. Returns the serialized message, the
+        new_message notification and the online recipients, or None on failure.
         """
         try:
-            deal = Deal.objects.get(
-                id=self.deal_id,
-                influencer=self.user.influencer_profile
-            )
-
-            conversation, created = Conversation.objects.get_or_create(deal=deal)
-
             message = Message.objects.create(
-                conversation=conversation,
-                sender_type='influencer',
+                conversation=self.conversation,
+                sender_type=self.sender_type,
                 sender_user=self.user,
                 content=content
             )
-
-            # Update conversation timestamp
-            conversation.save()
-
-            return message
-
         except Exception:
             return None
 
+        message_data = MessageSerializer(message).data
+        return (
+            message_data,
+            new_message_event(message, self.deal.id, message_data),
+            online_user_ids(self.recipient_ids),
+        )
+
     @database_sync_to_async
-    def serialize_message(self, message):
+    def mark_message_as_read(self, message_id):
         """
-        Serialize message for WebSocket transmission.
+        Mark message as read by current user.
         """
-        serializer = MessageSerializer(message)
-        return serializer.data
+        try:
+            message = Message.objects.get(id=message_id, conversation=self.conversation)
+            message.mark_as_read(self.sender_type)
+        except (Message.DoesNotExist, ValueError):
+            pass
 
     @database_sync_to_async
-    def get_sender_type(self):
+    def mark_read_until(self, message_id=None, until=None):
         """
-        Get sender type for current user.
+        Mark the deal conversation read up to a message or timestamp.
+        Returns (messages marked, cutoff).
         """
-        if hasattr(self.user, 'influencer_profile'):
-            return 'influencer'
-        return 'brand'
+        cutoff = None
+        if message_id:
+            try:
+                message_id = int(message_id)
+            except (TypeError, ValueError):
+                return 0, None
+            cutoff = Message.objects.filter(
+                id=message_id,
+                conversation=self.conversation
+            ).values_list('created_at', flat=True).first()
+            if cutoff is None:
+                return 0, None
+        elif until:
+            try:
+                cutoff = parse_datetime(str(until))
+            except ValueError:
+                cutoff = None
+            if cutoff is None:
+                return 0, None
+            if timezone.is_naive(cutoff):
+                cutoff = timezone.make_aware(cutoff)
+
+        cutoff = cutoff or timezone.now()
+        return self.conversation.mark_read_until(self.sender_type, cutoff), cutoff
+
+
+class UserNotificationsConsumer(AsyncWebsocketConsumer):
+    """
+    Per-user WebSocket for conversation list updates. Joins the user's group and
+    registers presence, so new messages are only pushed to users who are online.
+    """
 
-    @database_sync_to_async
-    def mark_message_as_read(self, message_id):
+    async def connect(self):
         """
-        Mark message as read by current user.
+        Handle WebSocket connection.
+        """
+        user = await database_sync_to_async(get_user_from_scope_token)(self.scope)
+        if user is None or user.is_anonymous:
+            await self.close()
+            return
+
+        self.user = user
+        self.user_group_name = user_group_name(user.id)
+
+        await self.channel_layer.group_add(
+            self.user_group_name,
+            self.channel_name
+        )
+        await database_sync_to_async(mark_online)(self.user.id)
+
+        await self.accept()
+
+    async def disconnect(self, close_code):
+        """
+        Handle WebSocket disconnection.
+        """
+        if not hasattr(self, 'user_group_name'):
+            return
+
+        await database_sync_to_async(mark_offline)(self.user.id)
+        await self.channel_layer.group_discard(
+            self.user_group_name,
+            self.channel_name
+        )
+
+    async def receive(self, text_data):
+        """
+        Handle keep-alive pings from WebSocket.
         """
         try:
-            message = Message.objects.get(id=message_id)
-            if hasattr(self.user, 'influencer_profile'):
-                message.mark_as_read('influencer')
-            else:
-                message.mark_as_read('brand')
-        except Message.DoesNotExist:
-            pass
+            data = json.loads(text_data)
+        except json.JSONDecodeError:
+            await self.send(text_data=json.dumps({
+                'error': 'Invalid JSON format'
+            }))
+            return
+
+        if data.get('type') == 'ping':
+            await self.send(text_data=json.dumps({'type': 'pong'}))
+
+    async def new_message(self, event):
+        """
+        Send new message notification to WebSocket.
+        """
+        await self.send(text_data=json.dumps({
+            'type': 'new_message',
+            'deal_id': event['deal_id'],
+            'conversation_id': event['conversation_id'],
+            'message': event['message']
+        }))
@@ -0,0 +1,146 @@
+"""
+Message history filtering and keyset pagination.
+
+Messages are paged newest first over the (conversation_id, created_at, id)
+index: `before=<id>` returns older messages, `after=<id>` newer ones. No COUNT
+is run, and date filters are ranges on created_at so the index still applies.
+Text search is an icontains filter served by the trigram index on UPPER(content).
+"""
+
+from datetime import datetime, time, timedelta
+
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Message
+
+
+def _parse_date(value):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except (TypeError, ValueError):
+        return None
+
+
+def _start_of_day(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def apply_message_filters(messages, params):
+    """
+    Apply the message list filters (search, date_from, date_to, sender_type,
+    attachments_only). Returns the filtered queryset and the filters applied.
+    """
+    search_query = params.get('search')
+    if search_query:
+        messages = messages.filter(content__icontains=search_query)
+
+    # Whole-day ranges on created_at rather than created_at__date, which can't use the index
+    date_from = _parse_date(params.get('date_from'))
+    if date_from:
+        messages = messages.filter(created_at__gte=_start_of_day(date_from))
+
+    date_to = _parse_date(params.get('date_to'))
+    if date_to:
+        messages = messages.filter(created_at__lt=_start_of_day(date_to + timedelta(days=1)))
+
+    sender_filter = params.get('sender_type')
+    if sender_filter in ['influencer', 'brand']:
+        messages = messages.filter(sender_type=sender_filter)
+
+    attachments_only = params.get('attachments_only')
+    if attachments_only and attachments_only.lower() == 'true':
+        messages = messages.exclude(file_attachment='')
+
+    return messages, {
+        'search': search_query,
+        'date_from': date_from,
+        'date_to': date_to,
+        'sender_type': sender_filter,
+        'attachments_only': attachments_only
+    }
+
+
+class MessageCursorPagination:
+    """
+    Keyset pagination for a conversation's messages, newest first.
+
+    Query params: `limit` (default 50, capped at 100) and at most one of
+    `before` / `after` holding a message id from a previous page.
+    """
+    default_limit = 50
+    max_limit = 100
+
+    def __init__(self, conversation):
+        self.conversation = conversation
+        self.has_older = False
+        self.has_newer = False
+        self.page = []
+
+    @staticmethod
+    def is_requested(request):
+        """Cursor params were sent (used by endpoints that also keep their old paging)."""
+        return any(param in request.GET for param in ('before', 'after', 'limit'))
+
+    def get_limit(self, request):
+        try:
+            limit = int(request.GET.get('limit', self.default_limit))
+        except (TypeError, ValueError):
+            limit = self.default_limit
+        return max(1, min(limit, self.max_limit))
+
+    def _anchor(self, message_id):
+        try:
+            return Message.objects.filter(
+                id=int(message_id),
+                conversation=self.conversation
+            ).values('created_at', 'id').first()
+        except (TypeError, ValueError):
+            return None
+
+    def paginate_queryset(self, queryset, request):
+        """Return the page of messages, newest first, for the cursor in the request."""
+        limit = self.get_limit(request)
+        after = request.GET.get('after')
+        before = request.GET.get('before')
+
+        anchor = None
+        if after or before:
+            anchor = self._anchor(after or before)
+            if anchor is None:
+                # Unknown cursor: an empty page rather than silently restarting from the newest
+                self.page = []
+                return self.page
+
+        # (created_at, id) row comparisons, written with a plain range on created_at so
+        # the index scan starts at the cursor instead of filtering from the thread's end
+        if after:
+            newer = Q(created_at__gte=anchor['created_at']) & (
+                Q(created_at__gt=anchor['created_at']) | Q(id__gt=anchor['id'])
+            )
+            rows = list(queryset.filter(newer).order_by('created_at', 'id')[:limit + 1])
+            self.has_newer = len(rows) > limit
+            self.has_older = True
+            self.page = list(reversed(rows[:limit]))
+            return self.page
+
+        if before:
+            older = Q(created_at__lte=anchor['created_at']) & (
+                Q(created_at__lt=anchor['created_at']) | Q(id__lt=anchor['id'])
+            )
+            queryset = queryset.filter(older)
+            self.has_newer = True
+
+        rows = list(queryset.order_by('-created_at', '-id')[:limit + 1])
+        self.has_older = len(rows) > limit
+        self.page = rows[:limit]
+        return self.page
+
+    def get_cursor_data(self):
+        """Cursor fields for the response: ids to pass as before/after for the next page."""
+        return {
+            'has_older': self.has_older,
+            'has_newer': self.has_newer,
+            'before': self.page[-1].id if self.page and self.has_older else None,
+            'after': self.page[0].id if self.page else None,
+        }
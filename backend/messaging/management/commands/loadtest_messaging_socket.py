@@ -0,0 +1,162 @@
+import asyncio
+import json
+import statistics
+import time
+import uuid
+
+from brands.models import Brand, BrandUser
+from campaigns.models import Campaign
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from common.models import Industry
+from deals.models import Deal
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+from influencers.models import InfluencerProfile
+from messaging.routing import websocket_urlpatterns
+from rest_framework_simplejwt.tokens import AccessToken
+from users.models import UserProfile
+
+IN_MEMORY_CHANNEL_LAYERS = {'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}}
+
+
+def _percentile(values, percent):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))]
+
+
+class Command(BaseCommand):
+    help = (
+        'Open N deal sockets in-process with the channels test client, send M messages on each and '
+        'report msgs/sec and latency. Synthetic users and deals are deleted afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sockets', type=int, default=50, help='Number of concurrent sockets')
+        parser.add_argument('--messages', type=int, default=20, help='Messages sent per socket')
+        parser.add_argument('--deals', type=int, default=10, help='Deals the sockets are spread over')
+        parser.add_argument('--timeout', type=float, default=30, help='Seconds to wait for a message echo')
+        parser.add_argument('--configured-layer', action='store_true',
+                            help='Use the configured CHANNEL_LAYERS instead of an in-memory layer')
+
+    def handle(self, *args, **options):
+        if options['sockets'] < 1 or options['messages'] < 1 or options['deals'] < 1:
+            raise CommandError('--sockets, --messages and --deals must be positive')
+
+        run_id = uuid.uuid4().hex[:8]
+        fixtures = self._create_fixtures(run_id, options['deals'])
+        try:
+            if options['configured_layer']:
+                results = asyncio.run(self._run(fixtures, options))
+            else:
+                with override_settings(CHANNEL_LAYERS=IN_MEMORY_CHANNEL_LAYERS):
+                    results = asyncio.run(self._run(fixtures, options))
+        finally:
+            self._delete_fixtures(fixtures)
+
+        self._report(results, options)
+
+    def _create_fixtures(self, run_id, deal_count):
+        industry, _ = Industry.objects.get_or_create(key='benchmark', defaults={'name': 'Benchmark'})
+        brand_user = User.objects.create(username=f'loadtest_brand_{run_id}')
+        brand = Brand.objects.create(name=f'Load Test {run_id}', industry=industry,
+                                     contact_email=f'{run_id}@loadtest.invalid')
+        BrandUser.objects.create(user=brand_user, brand=brand, role='owner')
+        campaign = Campaign.objects.create(brand=brand, title='Load test', description='-', deal_type='cash')
+
+        influencer_users = []
+        deals = []
+        for i in range(deal_count):
+            user = User.objects.create(username=f'loadtest_inf_{run_id}_{i}')
+            user_profile = UserProfile.objects.create(user=user, phone_number=f'8{int(run_id, 16) % 10000:04d}{i:05d}')
+            influencer = InfluencerProfile.objects.create(user=user, user_profile=user_profile, industry=industry)
+            influencer_users.append(user)
+            deals.append(Deal.objects.create(campaign=campaign, influencer=influencer))
+
+        # One socket spec per side of every deal
+        socket_specs = []
+        for deal, user in zip(deals, influencer_users):
+            socket_specs.append((deal.id, str(AccessToken.for_user(user))))
+            socket_specs.append((deal.id, str(AccessToken.for_user(brand_user))))
+
+        return {'brand': brand, 'users': [brand_user] + influencer_users, 'sockets': socket_specs}
+
+    @staticmethod
+    def _delete_fixtures(fixtures):
+        fixtures['brand'].delete()
+        User.objects.filter(id__in=[user.id for user in fixtures['users']]).delete()
+
+    async def _run(self, fixtures, options):
+        application = URLRouter(websocket_urlpatterns)
+        socket_specs = [
+            fixtures['sockets'][i % len(fixtures['sockets'])] for i in range(options['sockets'])
+        ]
+
+        connect_latencies = []
+        sockets = []
+        for deal_id, token in socket_specs:
+            communicator = WebsocketCommunicator(application, f'/ws/deals/{deal_id}/messages/?token={token}')
+            start = time.perf_counter()
+            connected, _ = await communicator.connect(timeout=options['timeout'])
+            if not connected:
+                raise CommandError(f'Socket for deal {deal_id} was rejected')
+            connect_latencies.append(time.perf_counter() - start)
+            sockets.append(communicator)
+
+        latencies = []
+        start = time.perf_counter()
+        await asyncio.gather(*[
+            self._drive_socket(index, communicator, options, latencies)
+            for index, communicator in enumerate(sockets)
+        ])
+        elapsed = time.perf_counter() - start
+
+        for communicator in sockets:
+            await communicator.disconnect()
+
+        return {'connect': connect_latencies, 'latencies': latencies, 'elapsed': elapsed}
+
+    @staticmethod
+    async def _drive_socket(index, communicator, options, latencies):
+        """Send messages one at a time, timing each until its own broadcast comes back."""
+        pending = {}
+
+        async def receive():
+            while True:
+                frame = json.loads(await communicator.receive_from(timeout=options['timeout']))
+                if frame.get('type') != 'message':
+                    continue
+                waiter = pending.pop(frame['message']['content'], None)
+                if waiter:
+                    waiter.set_result(time.perf_counter())
+
+        receiver = asyncio.ensure_future(receive())
+        try:
+            for i in range(options['messages']):
+                content = f'loadtest {index}-{i}'
+                echo = asyncio.get_running_loop().create_future()
+                pending[content] = echo
+                sent_at = time.perf_counter()
+                await communicator.send_to(text_data=json.dumps({'type': 'message', 'content': content}))
+                received_at = await asyncio.wait_for(asyncio.shield(echo), options['timeout'])
+                latencies.append(received_at - sent_at)
+        finally:
+            receiver.cancel()
+
+    def _report(self, results, options):
+        latencies = [latency * 1000 for latency in results['latencies']]
+        connects = [latency * 1000 for latency in results['connect']]
+        total = len(latencies)
+
+        self.stdout.write(
+            f"{options['sockets']} sockets x {options['messages']} messages over {options['deals']} deals: "
+            f"{total} messages in {results['elapsed']:.2f}s -> {total / results['elapsed']:,.1f} msgs/sec"
+        )
+        self.stdout.write(
+            f'message latency: median={statistics.median(latencies):.1f}ms '
+            f'p99={_percentile(latencies, 99):.1f}ms max={max(latencies):.1f}ms'
+        )
+        self.stdout.write(
+            f'connect latency: median={statistics.median(connects):.1f}ms p99={_percentile(connects, 99):.1f}ms'
+        )
@@ -0,0 +1,65 @@
+from django.core.management.base import BaseCommand
+from django.db import models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from messaging.models import Conversation, Message
+
+COUNTER_FIELDS = ('last_message_id', 'messages_count', 'unread_count_for_influencer', 'unread_count_for_brand')
+
+
+def _message_count(**filters):
+    counts = Message.objects.filter(conversation=OuterRef('pk'), **filters).order_by().values(
+        'conversation'
+    ).annotate(count=Count('id')).values('count')
+    return Coalesce(Subquery(counts, output_field=models.IntegerField()), 0)
+
+
+def _expected_counters():
+    return {
+        'messages_count': _message_count(),
+        'unread_count_for_influencer': _message_count(sender_type='brand', read_by_influencer=False),
+        'unread_count_for_brand': _message_count(sender_type='influencer', read_by_brand=False),
+        'last_message': Subquery(
+            Message.objects.filter(conversation=OuterRef('pk')).order_by('-id').values('id')[:1]
+        ),
+    }
+
+
+class Command(BaseCommand):
+    help = 'Recompute conversation message/unread counters and last message pointers that have drifted'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Conversations checked per query')
+        parser.add_argument('--dry-run', action='store_true', help='Report drifted conversations without fixing them')
+
+    def handle(self, *args, **options):
+        expected = {f'expected_{name}': expression for name, expression in _expected_counters().items()}
+        batch_size = options['batch_size']
+        checked = drifted = 0
+        last_id = 0
+
+        while True:
+            rows = list(
+                Conversation.objects.filter(id__gt=last_id).order_by('id').annotate(**expected).values(
+                    'id', *COUNTER_FIELDS, *expected.keys()
+                )[:batch_size]
+            )
+            if not rows:
+                break
+            last_id = rows[-1]['id']
+            checked += len(rows)
+
+            drifted_ids = [
+                row['id'] for row in rows
+                if row['last_message_id'] != row['expected_last_message']
+                or any(row[name] != row[f'expected_{name}'] for name in COUNTER_FIELDS[1:])
+            ]
+            drifted += len(drifted_ids)
+            if drifted_ids and not options['dry_run']:
+                # Recompute in the UPDATE itself so messages written since the check are counted
+                Conversation.objects.filter(id__in=drifted_ids).update(**_expected_counters())
+
+        action = 'Found' if options['dry_run'] else 'Repaired'
+        self.stdout.write(self.style.SUCCESS(
+            f'Checked {checked} conversations. {action} {drifted} with drifted counters.'
+        ))
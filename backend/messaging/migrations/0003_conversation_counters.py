@@ -0,0 +1,57 @@
+# Generated by Django 4.2.16 on 2026-10-16 19:55
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+import django.db.models.deletion
+
+
+def populate_counters(apps, schema_editor):
+    Conversation = apps.get_model('messaging', 'Conversation')
+    Message = apps.get_model('messaging', 'Message')
+
+    def message_count(**filters):
+        counts = Message.objects.filter(conversation=OuterRef('pk'), **filters).order_by().values(
+            'conversation'
+        ).annotate(count=Count('id')).values('count')
+        return Coalesce(Subquery(counts, output_field=models.IntegerField()), 0)
+
+    Conversation.objects.update(
+        messages_count=message_count(),
+        unread_count_for_influencer=message_count(sender_type='brand', read_by_influencer=False),
+        unread_count_for_brand=message_count(sender_type='influencer', read_by_brand=False),
+        last_message=Subquery(
+            Message.objects.filter(conversation=OuterRef('pk')).order_by('-id').values('id')[:1]
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('messaging', '0002_alter_message_file_attachment'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='conversation',
+            name='last_message',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='messaging.message'),
+        ),
+        migrations.AddField(
+            model_name='conversation',
+            name='messages_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='conversation',
+            name='unread_count_for_brand',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='conversation',
+            name='unread_count_for_influencer',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
@@ -1,15 +1,39 @@
-from django.db import models
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.db import models, transaction
+from django.db.models import Case, F, Q, Value, When
+from django.db.models.functions import Coalesce, Greatest, Upper
 from django.utils import timezone
 
 from backend.storage_backends import private_media_storage, private_upload_path
 
 
+# reader type -> (sender type of the messages they read, read flag, conversation unread counter)
+READ_RECEIPT_FIELDS = {
+    'influencer': ('brand', 'read_by_influencer', 'unread_count_for_influencer'),
+    'brand': ('influencer', 'read_by_brand', 'unread_count_for_brand'),
+}
+
+
 class Conversation(models.Model):
     """
     Conversation model for managing communication between
     brands and influencers for specific deals.
+
+    The last message pointer and message/unread counters are denormalized and
+    kept up to date by Message.save, Message.mark_as_read and mark_read_until.
+    `reconcile_conversation_counters` repairs drift.
     """
     deal = models.OneToOneField('deals.Deal', on_delete=models.CASCADE, related_name='conversation')
+    last_message = models.ForeignKey(
+        'messaging.Message',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    messages_count = models.PositiveIntegerField(default=0)
+    unread_count_for_influencer = models.PositiveIntegerField(default=0)
+    unread_count_for_brand = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -19,26 +43,34 @@ class Conversation(models.Model):
     def __str__(self):
         return f"Conversation for {self.deal}"
 
-    @property
-    def last_message(self):
-        """Get the most recent message in this conversation"""
-        return self.messages.order_by('-created_at').first()
-
-    @property
-    def unread_count_for_influencer(self):
-        """Count unread messages for the influencer"""
-        return self.messages.filter(
-            sender_type='brand',
-            read_by_influencer=False
-        ).count()
-
-    @property
-    def unread_count_for_brand(self):
-        """Count unread messages for the brand"""
-        return self.messages.filter(
-            sender_type='influencer',
-            read_by_brand=False
-        ).count()
+    def mark_read_until(self, reader_type, until=None):
+        """
+        Mark the other party's messages sent up to `until` (default: now) as read
+        by `reader_type`, in a single UPDATE. Returns the number of messages marked.
+        """
+        if reader_type not in READ_RECEIPT_FIELDS:
+            raise ValueError(f"Unknown reader type: {reader_type}")
+        sender_type, read_field, unread_counter = READ_RECEIPT_FIELDS[reader_type]
+
+        now = timezone.now()
+        with transaction.atomic():
+            count = Message.objects.filter(
+                conversation_id=self.pk,
+                created_at__lte=until or now,
+                sender_type=sender_type,
+                **{read_field: False}
+            ).update(**{
+                read_field: True,
+                'read_at': Coalesce(F('read_at'), Value(now)),
+            })
+            if count:
+                Conversation.objects.filter(pk=self.pk).update(**{
+                    unread_counter: Greatest(F(unread_counter) - count, 0)
+                })
+
+        if count:
+            self.refresh_from_db(fields=[unread_counter])
+        return count
 
 
 class Message(models.Model):
@@ -75,7 +107,10 @@ class Message(models.Model):
     class Meta:
         db_table = 'messages'
         indexes = [
-            models.Index(fields=['conversation']),
+            # Keyset pagination of a conversation's history (messaging.history)
+            models.Index(fields=['conversation', 'created_at', 'id'], name='messages_conv_created_id_idx'),
+            # Serves content__icontains, which compares UPPER(content)
+            GinIndex(OpClass(Upper('content'), name='gin_trgm_ops'), name='messages_content_trgm_idx'),
             models.Index(fields=['sender_type']),
             models.Index(fields=['created_at']),
             models.Index(fields=['read_by_influencer']),
@@ -85,14 +120,48 @@ class Message(models.Model):
     def __str__(self):
         return f"Message from {self.sender_type} in {self.conversation.deal}"
 
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if adding:
+                self._record_on_conversation()
+
+    def _record_on_conversation(self):
+        """Bump the conversation's counters and last message pointer for a new message."""
+        fields = {
+            'messages_count': F('messages_count') + 1,
+            # Messages committed out of order must not move the pointer backwards
+            'last_message': Case(
+                When(Q(last_message__isnull=True) | Q(last_message_id__lt=self.pk), then=Value(self.pk)),
+                default=F('last_message'),
+                output_field=models.BigIntegerField(),
+            ),
+            'updated_at': timezone.now(),
+        }
+        for sender_type, read_field, unread_counter in READ_RECEIPT_FIELDS.values():
+            if self.sender_type == sender_type and not getattr(self, read_field):
+                fields[unread_counter] = F(unread_counter) + 1
+        Conversation.objects.filter(pk=self.conversation_id).update(**fields)
+
     def mark_as_read(self, reader_type):
         """Mark message as read by influencer or brand"""
-        if reader_type == 'influencer':
-            self.read_by_influencer = True
-        elif reader_type == 'brand':
-            self.read_by_brand = True
-
+        if reader_type not in READ_RECEIPT_FIELDS:
+            raise ValueError(f"Unknown reader type: {reader_type}")
+        sender_type, read_field, unread_counter = READ_RECEIPT_FIELDS[reader_type]
+        now = timezone.now()
+
+        with transaction.atomic():
+            # Conditional update so concurrent readers only decrement the counter once
+            marked = Message.objects.filter(pk=self.pk, **{read_field: False}).update(**{
+                read_field: True,
+                'read_at': Coalesce(F('read_at'), Value(now)),
+            })
+            if marked and self.sender_type == sender_type:
+                Conversation.objects.filter(pk=self.conversation_id).update(**{
+                    unread_counter: Greatest(F(unread_counter) - 1, 0)
+                })
+
+        setattr(self, read_field, True)
         if not self.read_at:
-            self.read_at = timezone.now()
-
-        self.save(update_fields=['read_by_influencer', 'read_by_brand', 'read_at'])
+            self.read_at = now
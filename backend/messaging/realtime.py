@@ -0,0 +1,150 @@
+"""
+Read receipts and WebSocket broadcasts for deal conversations.
+
+Deal sockets join the `deal_<id>` group; per-user notification sockets join
+`user_<id>` and register presence in the cache. Synchronous code (REST views,
+tasks) pushes events to both through the helpers here.
+"""
+
+import logging
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from common.cache_utils import CacheManager
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+def deal_group_name(deal_id):
+    return f'deal_{deal_id}'
+
+
+def user_group_name(user_id):
+    return f'user_{user_id}'
+
+
+def _presence_key(user_id):
+    return CacheManager.get_cache_key('ws_presence', user_id)
+
+
+def _presence_timeout():
+    return getattr(settings, 'CACHE_TIMEOUTS', {}).get('WS_PRESENCE', 86400)
+
+
+def mark_online(user_id):
+    """Count one more open notification socket for the user."""
+    key = _presence_key(user_id)
+    if not cache.add(key, 1, _presence_timeout()):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, _presence_timeout())
+        cache.touch(key, _presence_timeout())
+
+
+def mark_offline(user_id):
+    """Count one fewer open notification socket; the key goes away with the last one."""
+    key = _presence_key(user_id)
+    try:
+        if cache.decr(key) <= 0:
+            cache.delete(key)
+    except ValueError:
+        pass
+
+
+def online_user_ids(user_ids):
+    """The subset of user_ids with at least one open notification socket."""
+    keys = {_presence_key(user_id): user_id for user_id in user_ids}
+    present = cache.get_many(list(keys))
+    return [keys[key] for key, count in present.items() if count and count > 0]
+
+
+def read_until_event(reader_type, until, count, message_id=None):
+    """Group event announcing that `reader_type` has read everything up to `until`."""
+    return {
+        'type': 'read_until_update',
+        'reader_type': reader_type,
+        'until': until.isoformat(),
+        'message_id': message_id,
+        'count': count,
+    }
+
+
+def broadcast_to_deal(deal_id, event):
+    """Send an event to the deal's WebSocket group; failures are logged, not raised."""
+    channel_layer = get_channel_layer()
+    if channel_layer is None:
+        return
+    try:
+        async_to_sync(channel_layer.group_send)(deal_group_name(deal_id), event)
+    except Exception as e:
+        logger.warning(f"Failed to broadcast {event.get('type')} to deal {deal_id}: {e}")
+
+
+def mark_conversation_read(conversation, reader_type, until=None, message_id=None):
+    """
+    Mark the conversation read by `reader_type` up to `until` (default: now) and
+    broadcast one read_until event when anything changed. Returns the number of
+    messages marked.
+    """
+    until = until or timezone.now()
+    count = conversation.mark_read_until(reader_type, until)
+    if count:
+        broadcast_to_deal(conversation.deal_id, read_until_event(reader_type, until, count, message_id))
+    return count
+
+
+def recipient_user_ids(sender_type, deal):
+    """Users on the other side of the deal from a message sent by `sender_type`."""
+    if sender_type == 'brand':
+        return [deal.influencer.user_id]
+
+    from brands.models import BrandUser
+    return list(BrandUser.objects.filter(
+        brand_id=deal.campaign.brand_id,
+        is_active=True
+    ).values_list('user_id', flat=True))
+
+
+def new_message_event(message, deal_id, message_data):
+    return {
+        'type': 'new_message',
+        'deal_id': deal_id,
+        'conversation_id': message.conversation_id,
+        'message': message_data,
+    }
+
+
+def broadcast_new_message(message, deal):
+    """
+    Push a message created outside the socket (REST) to the deal group, and a
+    new_message notification to the recipients that are online. Runs after the
+    surrounding transaction commits.
+    """
+    from .serializers import MessageSerializer
+
+    def send():
+        message_data = MessageSerializer(message).data
+        broadcast_to_deal(deal.id, {'type': 'chat_message', 'message': message_data})
+        notify_users(
+            recipient_user_ids(message.sender_type, deal),
+            new_message_event(message, deal.id, message_data)
+        )
+
+    transaction.on_commit(send)
+
+
+def notify_users(user_ids, event):
+    """Send an event to the per-user groups of the users that are online."""
+    channel_layer = get_channel_layer()
+    if channel_layer is None:
+        return
+    for user_id in online_user_ids(user_ids):
+        try:
+            async_to_sync(channel_layer.group_send)(user_group_name(user_id), event)
+        except Exception as e:
+            logger.warning(f"Failed to notify user {user_id} of {event.get('type')}: {e}")
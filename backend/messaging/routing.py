@@ -4,4 +4,5 @@ from . import consumers
 
 websocket_urlpatterns = [
     re_path(r'ws/deals/(?P<deal_id>\d+)/messages/$', consumers.MessagingConsumer.as_asgi()),
+    re_path(r'ws/messages/$', consumers.UserNotificationsConsumer.as_asgi()),
 ]
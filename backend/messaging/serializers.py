@@ -82,7 +82,7 @@ class ConversationSerializer(serializers.ModelSerializer):
 
     def get_messages_count(self, obj):
         """Get total messages count in conversation."""
-        return obj.messages.count()
+        return obj.messages_count
 
     def get_brand_logo(self, obj):
         """Get brand logo URL."""
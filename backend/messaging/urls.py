@@ -10,6 +10,8 @@ urlpatterns = [
     # Unified conversation messages endpoint (brand or influencer)
     path('conversations/<int:conversation_id>/messages/', views.conversation_messages_view,
          name='conversation_messages'),
+    # Mark a conversation read up to a message (single bulk update)
+    path('conversations/<int:conversation_id>/read/', views.conversation_read_view, name='conversation_read'),
     # Removed - moved to deals app to avoid conflicts
     path('deals/<int:deal_id>/messages/<int:message_id>/', views.message_detail_view, name='message_detail'),
     # Get total unread messages count
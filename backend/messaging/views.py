@@ -1,10 +1,13 @@
-from datetime import datetime, timedelta
+from datetime import timedelta
 
 from common.decorators import user_rate_limit, cache_response, log_performance
 from deals.models import Deal
 from deals.views import DealPagination
+from django.db.models import Sum
+from django.db.models.functions import Coalesce
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from influencers.models import InfluencerProfile
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
@@ -12,6 +15,8 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
 from .models import Conversation, Message
+from .history import MessageCursorPagination, apply_message_filters
+from .realtime import broadcast_new_message, mark_conversation_read
 from .serializers import MessageSerializer, ConversationSerializer
 
 
@@ -33,9 +38,10 @@ def conversations_list_view(request):
     conversations = Conversation.objects.filter(
         deal__influencer=profile
     ).select_related(
-        'deal__campaign__brand'
-    ).prefetch_related(
-        'messages'
+        'deal__campaign__brand',
+        'deal__influencer__user',
+        'deal__influencer__user_profile',
+        'last_message__sender_user'
     ).order_by('-updated_at')
 
     # Apply filters
@@ -45,10 +51,7 @@ def conversations_list_view(request):
 
     unread_only = request.GET.get('unread_only')
     if unread_only and unread_only.lower() == 'true':
-        conversations = conversations.filter(
-            messages__sender_type='brand',
-            messages__read_by_influencer=False
-        ).distinct()
+        conversations = conversations.filter(unread_count_for_influencer__gt=0)
 
     # Pagination
     paginator = DealPagination()
@@ -98,49 +101,26 @@ def deal_messages_view(request, deal_id):
     conversation, created = Conversation.objects.get_or_create(deal=deal)
 
     if request.method == 'GET':
-        messages = conversation.messages.all().order_by('-created_at')
-
-        # Apply search filter
-        search_query = request.GET.get('search')
-        if search_query:
-            messages = messages.filter(content__icontains=search_query)
-
-        # Apply date filters
-        date_from = request.GET.get('date_from')
-        date_to = request.GET.get('date_to')
-        if date_from:
-            try:
-                date_from = datetime.strptime(date_from, '%Y-%m-%d').date()
-                messages = messages.filter(created_at__date__gte=date_from)
-            except ValueError:
-                pass
-
-        if date_to:
-            try:
-                date_to = datetime.strptime(date_to, '%Y-%m-%d').date()
-                messages = messages.filter(created_at__date__lte=date_to)
-            except ValueError:
-                pass
-
-        # Filter by sender type
-        sender_filter = request.GET.get('sender_type')
-        if sender_filter in ['influencer', 'brand']:
-            messages = messages.filter(sender_type=sender_filter)
-
-        # Filter messages with attachments only
-        attachments_only = request.GET.get('attachments_only')
-        if attachments_only and attachments_only.lower() == 'true':
-            messages = messages.exclude(file_attachment='')
+        messages = conversation.messages.select_related('sender_user').order_by('-created_at')
+
+        # Apply search, date range, sender and attachment filters
+        messages, filters_applied = apply_message_filters(messages, request.GET)
 
         # Mark messages as read by influencer
-        unread_messages = messages.filter(
-            sender_type='brand',
-            read_by_influencer=False
-        )
-        for message in unread_messages:
-            message.mark_as_read('influencer')
+        mark_conversation_read(conversation, 'influencer')
+
+        # Cursor pagination when before/after/limit is sent; numbered pages stay the default
+        if MessageCursorPagination.is_requested(request):
+            paginator = MessageCursorPagination(conversation)
+            page = paginator.paginate_queryset(messages, request)
+            serializer = MessageSerializer(page, many=True, context={'request': request})
+            return Response({
+                'status': 'success',
+                'messages': serializer.data,
+                **paginator.get_cursor_data(),
+                'filters_applied': filters_applied
+            }, status=status.HTTP_200_OK)
 
-        # Pagination
         paginator = DealPagination()
         page = paginator.paginate_queryset(messages, request)
 
@@ -154,13 +134,7 @@ def deal_messages_view(request, deal_id):
                 'next': response.data['next'],
                 'previous': response.data['previous'],
 
-                'filters_applied': {
-                    'search': search_query,
-                    'date_from': date_from,
-                    'date_to': date_to,
-                    'sender_type': sender_filter,
-                    'attachments_only': attachments_only
-                }
+                'filters_applied': filters_applied
             }
             return response
 
@@ -170,13 +144,7 @@ def deal_messages_view(request, deal_id):
             'messages': serializer.data,
             'total_count': messages.count(),
 
-            'filters_applied': {
-                'search': search_query,
-                'date_from': date_from,
-                'date_to': date_to,
-                'sender_type': sender_filter,
-                'attachments_only': attachments_only
-            }
+            'filters_applied': filters_applied
         }, status=status.HTTP_200_OK)
 
     elif request.method == 'POST':
@@ -190,10 +158,7 @@ def deal_messages_view(request, deal_id):
                 sender_type='influencer',
                 sender_user=request.user
             )
-
-            # Update conversation timestamp
-            conversation.updated_at = timezone.now()
-            conversation.save()
+            broadcast_new_message(message, deal)
 
             return Response({
                 'status': 'success',
@@ -320,22 +285,21 @@ def conversation_messages_view(request, conversation_id):
         return Response({'status': 'error', 'message': 'Unauthorized.'}, status=status.HTTP_401_UNAUTHORIZED)
 
     if request.method == 'GET':
-        messages = conversation.messages.all().order_by('-created_at')
+        messages = conversation.messages.select_related('sender_user').order_by('-created_at')
 
         # Optional filters
-        search_query = request.GET.get('search')
-        if search_query:
-            messages = messages.filter(content__icontains=search_query)
+        messages, _ = apply_message_filters(messages, request.GET)
 
         # Mark as read based on role
-        if is_influencer:
-            unread = messages.filter(sender_type='brand', read_by_influencer=False)
-            for m in unread:
-                m.mark_as_read('influencer')
-        else:
-            unread = messages.filter(sender_type='influencer', read_by_brand=False)
-            for m in unread:
-                m.mark_as_read('brand')
+        mark_conversation_read(conversation, 'influencer' if is_influencer else 'brand')
+
+        # Cursor pagination when before/after/limit is sent; numbered pages stay the default
+        if MessageCursorPagination.is_requested(request):
+            paginator = MessageCursorPagination(conversation)
+            page = paginator.paginate_queryset(messages, request)
+            serializer = MessageSerializer(page, many=True, context={'request': request})
+            return Response({'status': 'success', 'messages': serializer.data, **paginator.get_cursor_data()},
+                            status=status.HTTP_200_OK)
 
         paginator = DealPagination()
         page = paginator.paginate_queryset(messages, request)
@@ -360,8 +324,7 @@ def conversation_messages_view(request, conversation_id):
     if serializer.is_valid():
         sender_type = 'influencer' if is_influencer else 'brand'
         message = serializer.save(conversation=conversation, sender_type=sender_type, sender_user=request.user)
-        conversation.updated_at = timezone.now()
-        conversation.save()
+        broadcast_new_message(message, conversation.deal)
         return Response({'status': 'success', 'message': 'Message sent successfully.',
                          'message_data': MessageSerializer(message, context={'request': request}).data},
                         status=status.HTTP_201_CREATED)
@@ -370,6 +333,63 @@ def conversation_messages_view(request, conversation_id):
                     status=status.HTTP_400_BAD_REQUEST)
 
 
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def conversation_read_view(request, conversation_id):
+    """
+    Mark a conversation read up to a message for the authenticated user's side.
+    Accepts `message_id` or an ISO `until` timestamp; defaults to now.
+    """
+    conversation = get_object_or_404(Conversation.objects.select_related('deal__campaign__brand', 'deal__influencer'),
+                                     id=conversation_id)
+
+    is_influencer = hasattr(request.user, 'influencer_profile')
+    is_brand = hasattr(request.user, 'brand_user')
+
+    if is_influencer:
+        if conversation.deal.influencer != request.user.influencer_profile:
+            return Response({'status': 'error', 'message': 'Not authorized to access this conversation.'},
+                            status=status.HTTP_403_FORBIDDEN)
+        reader_type = 'influencer'
+    elif is_brand:
+        if conversation.deal.campaign.brand != request.user.brand_user.brand:
+            return Response({'status': 'error', 'message': 'Not authorized to access this conversation.'},
+                            status=status.HTTP_403_FORBIDDEN)
+        reader_type = 'brand'
+    else:
+        return Response({'status': 'error', 'message': 'Unauthorized.'}, status=status.HTTP_401_UNAUTHORIZED)
+
+    message_id = request.data.get('message_id')
+    until = None
+    if message_id:
+        try:
+            message_id = int(message_id)
+        except (TypeError, ValueError):
+            return Response({'status': 'error', 'message': 'Invalid message_id.'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        message = get_object_or_404(Message.objects.only('created_at'), id=message_id, conversation=conversation)
+        until = message.created_at
+    elif request.data.get('until'):
+        try:
+            until = parse_datetime(str(request.data['until']))
+        except ValueError:
+            until = None
+        if until is None:
+            return Response({'status': 'error', 'message': 'Invalid until timestamp.'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if timezone.is_naive(until):
+            until = timezone.make_aware(until)
+
+    until = until or timezone.now()
+    marked = mark_conversation_read(conversation, reader_type, until=until, message_id=message_id)
+
+    return Response({
+        'status': 'success',
+        'marked_read': marked,
+        'until': until
+    }, status=status.HTTP_200_OK)
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def unread_count_view(request):
@@ -383,12 +403,10 @@ def unread_count_view(request):
     if is_influencer:
         try:
             profile = request.user.influencer_profile
-            # Count unread messages where sender is brand
-            unread_count = Message.objects.filter(
-                conversation__deal__influencer=profile,
-                sender_type='brand',
-                read_by_influencer=False
-            ).count()
+            # Sum the per-conversation unread counters for brand messages
+            unread_count = Conversation.objects.filter(
+                deal__influencer=profile
+            ).aggregate(total=Coalesce(Sum('unread_count_for_influencer'), 0))['total']
 
             return Response({
                 'status': 'success',
@@ -408,12 +426,10 @@ def unread_count_view(request):
                 'message': 'Brand user not found.'
             }, status=status.HTTP_404_NOT_FOUND)
 
-        # Count unread messages where sender is influencer
-        unread_count = Message.objects.filter(
-            conversation__deal__campaign__brand=brand_user.brand,
-            sender_type='influencer',
-            read_by_brand=False
-        ).count()
+        # Sum the per-conversation unread counters for influencer messages
+        unread_count = Conversation.objects.filter(
+            deal__campaign__brand=brand_user.brand
+        ).aggregate(total=Coalesce(Sum('unread_count_for_brand'), 0))['total']
 
         return Response({
             'status': 'success',